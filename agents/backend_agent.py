@@ -1,13 +1,7 @@
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
+from utils.llm import AgentLLM
 
-load_dotenv()
-
-
-gemini = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.4, google_api_key=os.getenv("GOOGLE_API_KEY"))
+gemini = AgentLLM("backend_agent", temperature=0.4)
 
 backend_prompt = PromptTemplate(
     input_variables=["requirements"],
@@ -25,4 +19,10 @@ backend_agent = backend_prompt | gemini
 def generate_backend_code(requirements: str) -> str:
     """Calls the backend agent and returns generated FastAPI code."""
     result = backend_agent.invoke({"requirements": requirements})
-    return result.content.strip()
\ No newline at end of file
+    return result.content.strip()
+
+
+async def agenerate_backend_code(requirements: str) -> str:
+    """Async version of generate_backend_code."""
+    result = await backend_agent.ainvoke({"requirements": requirements})
+    return result.content.strip()
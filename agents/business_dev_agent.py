@@ -1,12 +1,9 @@
 # agents/business_dev_agent.py
 
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
+from utils.llm import AgentLLM
 
-load_dotenv()
-gemini = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.4, google_api_key=os.getenv("GOOGLE_API_KEY"))
+gemini = AgentLLM("business_dev_agent", temperature=0.4)
 
 bizdev_prompt = PromptTemplate(
     input_variables=["requirements"],
@@ -36,3 +33,7 @@ business_dev_agent = bizdev_prompt | gemini
 def run_business_dev_agent(requirements):
     result = business_dev_agent.invoke({"requirements": requirements})
     return {"Business_Development_Plan": result.content.strip()}
+
+async def arun_business_dev_agent(requirements):
+    result = await business_dev_agent.ainvoke({"requirements": requirements})
+    return {"Business_Development_Plan": result.content.strip()}
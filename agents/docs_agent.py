@@ -1,12 +1,7 @@
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
+from utils.llm import AgentLLM
 
-load_dotenv()
-
-gemini = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.4, google_api_key=os.getenv("GOOGLE_API_KEY"))
+gemini = AgentLLM("docs_agent", temperature=0.4)
 
 docs_prompt = PromptTemplate(
     input_variables=["code"],
@@ -1,18 +1,9 @@
 # agents/frontend_agent.py
 
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
+from utils.llm import AgentLLM
 
-load_dotenv()
-
-gemini = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.4,
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+gemini = AgentLLM("frontend_agent", temperature=0.4)
 
 frontend_prompt = PromptTemplate(
     input_variables=["requirements"],
@@ -30,12 +21,18 @@ Make sure:
     """
 )
 
-frontend_chain = LLMChain(llm=gemini, prompt=frontend_prompt)
+frontend_chain = frontend_prompt | gemini
 
 def generate_frontend_code(requirements: str) -> str:
     """Calls the frontend LLM agent to generate code."""
     result = frontend_chain.invoke({"requirements": requirements})
-    return result["text"].strip()
+    return result.content.strip()
+
+
+async def agenerate_frontend_code(requirements: str) -> str:
+    """Async version of generate_frontend_code."""
+    result = await frontend_chain.ainvoke({"requirements": requirements})
+    return result.content.strip()
 
 
 frontend_agent = generate_frontend_code
@@ -1,24 +1,19 @@
 # agents/frontend_subagents.py
 
-from langchain.chains import LLMChain
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
+from utils.llm import AgentLLM
 
-load_dotenv()
-
-gemini = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.3,
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+gemini = AgentLLM("frontend_subagents", temperature=0.3)
 
 fix_prompt = PromptTemplate(
-    input_variables=["code"],
+    input_variables=["code", "error", "language"],
     template="""
 You're a strict code reviewer and debugger.
-Fix any syntax, logic, or Tailwind errors in the following React + Tailwind code.
+Fix the following {language} code. These problems were found when checking it:
+
+{error}
+
+Fix them and any other syntax, logic, or Tailwind errors you notice, without changing what the code does.
 
 Only return clean, corrected code with no explanation.
 
@@ -27,8 +22,12 @@ Code:
 """
 )
 
-fix_chain = LLMChain(llm=gemini, prompt=fix_prompt)
+fix_chain = fix_prompt | gemini
+
+def fix_code(code: str, error: str = "None reported.", language: str = "React + Tailwind") -> str:
+    result = fix_chain.invoke({"code": code, "error": error, "language": language})
+    return result.content.strip()
 
-def fix_code(code: str) -> str:
-    result = fix_chain.invoke({"code": code})
-    return result["text"].strip()
+async def afix_code(code: str, error: str = "None reported.", language: str = "React + Tailwind") -> str:
+    result = await fix_chain.ainvoke({"code": code, "error": error, "language": language})
+    return result.content.strip()
@@ -0,0 +1,130 @@
+# agents/marketing_agent/bundle_agent.py
+
+import asyncio
+import json
+import re
+
+from langchain.prompts import PromptTemplate
+from utils.llm import AgentLLM
+
+from agents.marketing_agent.email_agent import email_chain
+from agents.marketing_agent.slogan_agent import slogan_chain
+from agents.marketing_agent.socialmedia_agent import socialmedia_agent
+from agents.marketing_agent.strategy_agent import hashtag_agent, post_agent
+from agents.marketing_agent.visual_agent import visual_chain
+
+gemini = AgentLLM("marketing_bundle", temperature=0.5)
+
+# field -> (type, description); the prompt and the validator are both built from this.
+MARKETING_SCHEMA = {
+    "email_copy": (str, "a compelling cold email to attract potential customers"),
+    "slogans": (list, "3 catchy product slogans that appeal to modern consumers"),
+    "social_posts": (str, "a LinkedIn post and an Instagram post promoting the product"),
+    "visual_concept": (str, "a visual branding concept: logo style, color palette and imagery"),
+    "hashtags": (list, "5 viral and relevant hashtags, each starting with #"),
+    "post_ideas": (list, "3 high-performing digital post ideas (can be multimodal)"),
+}
+
+bundle_prompt = PromptTemplate(
+    input_variables=["requirements", "fields"],
+    template="""
+You are the marketing team of a tech startup: copywriter, social media strategist and creative director.
+
+Product:
+{requirements}
+
+Return ONLY a JSON object, with no markdown fences and no commentary, with exactly these keys:
+{fields}
+
+Strings may contain Markdown. Lists must be JSON arrays of strings.
+"""
+)
+
+bundle_chain = bundle_prompt | gemini
+
+
+def _schema_text() -> str:
+    return "\n".join(
+        f'- "{field}": {"array of strings" if kind is list else "string"}, {description}'
+        for field, (kind, description) in MARKETING_SCHEMA.items()
+    )
+
+
+def _lines(text: str) -> list:
+    items = [re.sub(r"^\s*(?:[-*•]|\d+[.)])\s*", "", line).strip().strip('"') for line in text.splitlines()]
+    return [item for item in items if item]
+
+
+# Per-field fallbacks: (chain, converts the reply text to the field's type).
+FALLBACKS = {
+    "email_copy": (email_chain, str.strip),
+    "slogans": (slogan_chain, _lines),
+    "social_posts": (socialmedia_agent, str.strip),
+    "visual_concept": (visual_chain, str.strip),
+    "hashtags": (hashtag_agent, lambda text: re.findall(r"#\w+", text)),
+    "post_ideas": (post_agent, _lines),
+}
+
+
+def parse_bundle(text: str):
+    """
+    Parses and validates a bundle reply against MARKETING_SCHEMA.
+    Returns (valid_fields, invalid_field_names).
+    """
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    try:
+        data = json.loads(match.group(0)) if match else {}
+    except json.JSONDecodeError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+
+    valid = {}
+    for field, (kind, _) in MARKETING_SCHEMA.items():
+        value = data.get(field)
+        if kind is list and isinstance(value, str):
+            value = _lines(value)
+        if kind is list and isinstance(value, list):
+            value = [str(item).strip() for item in value if str(item).strip()]
+        if isinstance(value, kind) and value and (kind is list or value.strip()):
+            valid[field] = value.strip() if kind is str else value
+    if "hashtags" in valid:
+        valid["hashtags"] = [tag if tag.startswith("#") else f"#{tag.replace(' ', '')}" for tag in valid["hashtags"]]
+    return valid, [field for field in MARKETING_SCHEMA if field not in valid]
+
+
+def generate_marketing_bundle(requirements: str) -> dict:
+    """
+    Generates every marketing asset in one structured call. Fields that are
+    missing or fail validation are generated by their own agent instead.
+    """
+    reply = bundle_chain.invoke({"requirements": requirements, "fields": _schema_text()})
+    bundle, invalid = parse_bundle(reply.content)
+    for field in invalid:
+        chain, convert = FALLBACKS[field]
+        bundle[field] = convert(chain.invoke({"requirements": requirements}).content)
+    return {field: bundle[field] for field in MARKETING_SCHEMA}
+
+
+async def agenerate_marketing_bundle(requirements: str) -> dict:
+    """Async version of generate_marketing_bundle; fallbacks run concurrently."""
+    reply = await bundle_chain.ainvoke({"requirements": requirements, "fields": _schema_text()})
+    bundle, invalid = parse_bundle(reply.content)
+    replies = await asyncio.gather(*(FALLBACKS[field][0].ainvoke({"requirements": requirements}) for field in invalid))
+    for field, result in zip(invalid, replies):
+        bundle[field] = FALLBACKS[field][1](result.content)
+    return {field: bundle[field] for field in MARKETING_SCHEMA}
+
+
+def format_bundle(bundle: dict) -> dict:
+    """
+    Renders a bundle as the text artifacts the pipeline writes and displays.
+    """
+    return {
+        "email_copy": bundle["email_copy"],
+        "slogans": "\n".join(f"- {slogan}" for slogan in bundle["slogans"]),
+        "social_copy": bundle["social_posts"],
+        "visual_campaign": bundle["visual_concept"],
+        "hashtags": " ".join(bundle["hashtags"]),
+        "post_ideas": "\n".join(f"{number}. {idea}" for number, idea in enumerate(bundle["post_ideas"], start=1)),
+    }
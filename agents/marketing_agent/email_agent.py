@@ -1,12 +1,7 @@
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
+from utils.llm import AgentLLM
 
-gemini = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash", 
-    temperature=0.5, 
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+gemini = AgentLLM("email_agent", temperature=0.5)
 
 prompt = PromptTemplate(
     input_variables=["requirements"],
@@ -23,4 +18,10 @@ email_chain = prompt | gemini
 def email_agent(requirements: str) -> str:
     """Returns a cold email based on product idea."""
     result = email_chain.invoke({"requirements": requirements})
-    return result["text"].strip()
+    return result.content.strip()
+
+async def aemail_agent(requirements: str) -> str:
+    """Async version of email_agent."""
+    result = await email_chain.ainvoke({"requirements": requirements})
+    return result.content.strip()
+
@@ -1,15 +1,7 @@
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
+from utils.llm import AgentLLM
 
-load_dotenv()
-
-gemini = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash", 
-    temperature=0.4, 
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+gemini = AgentLLM("slogan_agent", temperature=0.4)
 
 slogan_chain = PromptTemplate(
     input_variables=["requirements"],
@@ -23,4 +15,9 @@ Product:
 
 def slogan_agent(requirements: str) -> str:
     """Generate a product slogan."""
-    return slogan_chain.invoke({"requirements": requirements})["text"].strip()
+    return slogan_chain.invoke({"requirements": requirements}).content.strip()
+
+async def aslogan_agent(requirements: str) -> str:
+    """Async version of slogan_agent."""
+    return (await slogan_chain.ainvoke({"requirements": requirements})).content.strip()
+
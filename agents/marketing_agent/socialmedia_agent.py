@@ -1,8 +1,7 @@
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
+from utils.llm import AgentLLM
 
-gemini = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7, google_api_key=os.getenv("GOOGLE_API_KEY"))
+gemini = AgentLLM("socialmedia_agent", temperature=0.7, cache=False)  # variety matters more than reuse here
 
 prompt = PromptTemplate(
     input_variables=["requirements"],
@@ -1,12 +1,13 @@
-# agents/marketing_agent.py
+# agents/marketing_agent/strategy_agent.py
+
+import asyncio
 
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from dotenv import load_dotenv
-import os
+from utils.llm import AgentLLM
 
-load_dotenv()
-gemini = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.5, google_api_key=os.getenv("GOOGLE_API_KEY"))
+gemini = AgentLLM("marketing_agent", temperature=0.5)
+# The full strategy document is routed apart from the short hashtag and post copy.
+strategy_gemini = AgentLLM("marketing_strategy_agent", temperature=0.5)
 
 # Main marketing strategy generator
 marketing_strategy_prompt = PromptTemplate(
@@ -45,7 +46,7 @@ post_ideas_prompt = PromptTemplate(
 )
 
 # Define agents
-marketing_agent = marketing_strategy_prompt | gemini
+marketing_agent = marketing_strategy_prompt | strategy_gemini
 slogan_agent = slogan_prompt | gemini
 hashtag_agent = hashtag_prompt | gemini
 post_agent = post_ideas_prompt | gemini
@@ -62,3 +63,19 @@ def run_marketing_agents(requirements):
         "Hashtags": hashtags.content.strip(),
         "Post_Ideas": post_ideas.content.strip(),
     }
+
+async def arun_marketing_agents(requirements):
+    inputs = {"requirements": requirements}
+    main_strategy, slogan, hashtags, post_ideas = await asyncio.gather(
+        marketing_agent.ainvoke(inputs),
+        slogan_agent.ainvoke(inputs),
+        hashtag_agent.ainvoke(inputs),
+        post_agent.ainvoke(inputs),
+    )
+
+    return {
+        "Marketing_Strategy": main_strategy.content.strip(),
+        "Slogan": slogan.content.strip(),
+        "Hashtags": hashtags.content.strip(),
+        "Post_Ideas": post_ideas.content.strip(),
+    }
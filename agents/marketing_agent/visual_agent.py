@@ -1,15 +1,7 @@
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
+from utils.llm import AgentLLM
 
-load_dotenv()
-
-gemini = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash", 
-    temperature=0.5, 
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+gemini = AgentLLM("visual_agent", temperature=0.5)
 
 visual_prompt = PromptTemplate(
     input_variables=["requirements"],
@@ -25,4 +17,9 @@ visual_chain = visual_prompt | gemini
 
 def visual_agent(requirements: str) -> str:
     """Returns a visual concept idea for the product."""
-    return visual_chain.invoke({"requirements": requirements})["text"].strip()
+    return visual_chain.invoke({"requirements": requirements}).content.strip()
+
+async def avisual_agent(requirements: str) -> str:
+    """Async version of visual_agent."""
+    return (await visual_chain.ainvoke({"requirements": requirements})).content.strip()
+
@@ -0,0 +1,76 @@
+# agents/registry.py
+
+import importlib
+import threading
+
+# name -> "module:attribute". Nothing here is imported until first use.
+AGENTS = {
+    "prd_agent": "agents.prd_agent:prd_agent",
+    "userstories_agent": "agents.userstories_agent:userstories_agent",
+    "frontend_chain": "agents.frontend_agent:frontend_chain",
+    "generate_frontend_code": "agents.frontend_agent:generate_frontend_code",
+    "agenerate_frontend_code": "agents.frontend_agent:agenerate_frontend_code",
+    "fix_code": "agents.frontend_subagents:fix_code",
+    "backend_agent": "agents.backend_agent:backend_agent",
+    "generate_backend_code": "agents.backend_agent:generate_backend_code",
+    "agenerate_backend_code": "agents.backend_agent:agenerate_backend_code",
+    "testing_agent": "agents.testing_agent:testing_agent",
+    "docs_agent": "agents.docs_agent:docs_agent",
+    "revision_chain": "agents.revision_agent:revision_chain",
+    "business_dev_agent": "agents.business_dev_agent:business_dev_agent",
+    "arun_business_dev_agent": "agents.business_dev_agent:arun_business_dev_agent",
+    "sales_agent": "agents.sales_agent:sales_agent",
+    "arun_sales_agent": "agents.sales_agent:arun_sales_agent",
+    "email_chain": "agents.marketing_agent.email_agent:email_chain",
+    "aemail_agent": "agents.marketing_agent.email_agent:aemail_agent",
+    "slogan_chain": "agents.marketing_agent.slogan_agent:slogan_chain",
+    "aslogan_agent": "agents.marketing_agent.slogan_agent:aslogan_agent",
+    "socialmedia_agent": "agents.marketing_agent.socialmedia_agent:socialmedia_agent",
+    "visual_chain": "agents.marketing_agent.visual_agent:visual_chain",
+    "avisual_agent": "agents.marketing_agent.visual_agent:avisual_agent",
+    "run_marketing_agents": "agents.marketing_agent.strategy_agent:run_marketing_agents",
+    "arun_marketing_agents": "agents.marketing_agent.strategy_agent:arun_marketing_agents",
+    "generate_marketing_bundle": "agents.marketing_agent.bundle_agent:generate_marketing_bundle",
+    "agenerate_marketing_bundle": "agents.marketing_agent.bundle_agent:agenerate_marketing_bundle",
+    "format_bundle": "agents.marketing_agent.bundle_agent:format_bundle",
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def get_agent(name: str):
+    """Imports and returns the registered agent, loading its module on first use."""
+    agent = _loaded.get(name)
+    if agent is None:
+        if name not in AGENTS:
+            raise KeyError(f"Unknown agent '{name}', expected one of {sorted(AGENTS)}")
+        with _lock:
+            agent = _loaded.get(name)
+            if agent is None:
+                module_name, attribute = AGENTS[name].split(":")
+                agent = getattr(importlib.import_module(module_name), attribute)
+                _loaded[name] = agent
+    return agent
+
+
+class LazyAgent:
+    """Placeholder that behaves like the registered agent once it is used."""
+
+    def __init__(self, name: str):
+        if name not in AGENTS:
+            raise KeyError(f"Unknown agent '{name}', expected one of {sorted(AGENTS)}")
+        self.name = name
+
+    def __repr__(self):
+        return f"LazyAgent({self.name!r})"
+
+    def __getattr__(self, attribute):
+        return getattr(get_agent(self.name), attribute)
+
+    def __call__(self, *args, **kwargs):
+        return get_agent(self.name)(*args, **kwargs)
+
+
+def lazy_agent(name: str) -> LazyAgent:
+    return LazyAgent(name)
@@ -0,0 +1,31 @@
+# agents/revision_agent.py
+
+from langchain.prompts import PromptTemplate
+from utils.llm import AgentLLM
+
+gemini = AgentLLM("revision_agent", temperature=0.3)
+
+revision_prompt = PromptTemplate(
+    input_variables=["kind", "feedback", "outline", "parts"],
+    template="""
+You are revising a {kind} that a reviewer has otherwise approved.
+
+Reviewer feedback:
+{feedback}
+
+Outline of the whole document, for context only (do not rewrite it):
+{outline}
+
+Rewrite ONLY the parts below so that they address the feedback. Keep everything
+the feedback does not ask to change exactly as it is, and keep names, signatures
+and headings stable unless the feedback asks otherwise.
+
+Return every part in full, in the same order, each starting with its marker line
+exactly as given (for example <<<PART 1>>>). Return nothing else: no explanations
+and no text outside the parts.
+
+{parts}
+"""
+)
+
+revision_chain = revision_prompt | gemini
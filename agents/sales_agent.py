@@ -1,12 +1,9 @@
 # agents/sales_agent.py
 
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
+from utils.llm import AgentLLM
 
-load_dotenv()
-gemini = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.4, google_api_key=os.getenv("GOOGLE_API_KEY"))
+gemini = AgentLLM("sales_agent", temperature=0.4)
 
 sales_prompt = PromptTemplate(
     input_variables=["requirements"],
@@ -31,3 +28,7 @@ sales_agent = sales_prompt | gemini
 def run_sales_agent(requirements):
     result = sales_agent.invoke({"requirements": requirements})
     return {"Sales_Strategy": result.content.strip()}
+
+async def arun_sales_agent(requirements):
+    result = await sales_agent.ainvoke({"requirements": requirements})
+    return {"Sales_Strategy": result.content.strip()}
@@ -1,16 +1,8 @@
 from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from utils.llm import AgentLLM
 
 # Gemini LLM instance
-gemini = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    temperature=0.4,
-    google_api_key=os.getenv("GOOGLE_API_KEY")
-)
+gemini = AgentLLM("userstories_agent", temperature=0.4)
 
 # Final PromptTemplate for neat, clean Agile-style output
 user_stories_prompt = PromptTemplate(
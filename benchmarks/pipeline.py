@@ -0,0 +1,195 @@
+# File: benchmarks/pipeline.py
+"""
+Offline performance benchmark for the agent pipeline. Every LLM call goes to
+the deterministic FakeChatModel (utils/fake_llm.py), so results are free and
+repeatable. Three scenarios are run at increasing concurrency:
+
+    pipeline    run_full_pipeline end to end with auto-approval
+    marketing   the async business + marketing fan-out used by the Streamlit app
+    tech        the Streamlit tech path: streamed PRD, backend and frontend
+
+    python benchmarks/pipeline.py                      # compare with benchmarks/baseline.json
+    python benchmarks/pipeline.py --save-baseline      # record a new baseline
+    python benchmarks/pipeline.py --levels 1 4 --scenarios marketing
+
+Fails (exit 1) when throughput drops, or p95 latency or peak memory grows,
+by more than --tolerance relative to the stored baseline, or when there is
+no baseline to compare with. Each scenario runs once before it is measured,
+so one-time imports and agent loading don't count toward the first level.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+IDEA = {
+    "idea": "nocode tool to generate synthetic data for anti-money laundering ML models",
+    "target_user": "ML engineers at banks",
+    "platform": "Web",
+    "pain_point": "Real transaction data cannot leave the bank",
+}
+
+os.environ.setdefault("AGENTIFIED_LLM", "fake")
+os.environ.setdefault("AGENTIFIED_FAKE_LATENCY", "lognormal:0.3:0.3")
+os.environ.setdefault("AGENTIFIED_FAKE_TOKENS_PER_SEC", "2000")
+os.environ["AGENTIFIED_CACHE"] = "0"
+os.environ.setdefault("AGENTIFIED_RPM", "0")
+sys.path.insert(0, ROOT)
+
+
+def _pipeline_job(index: int):
+    from utils.hitl import auto_approve
+    from workflows.full_build import run_full_pipeline
+
+    output = run_full_pipeline(
+        IDEA["idea"],
+        target_user=IDEA["target_user"],
+        platform=IDEA["platform"],
+        pain_point=IDEA["pain_point"],
+        approve=auto_approve,
+        build_dir="build",
+        stream=False,
+        verbose=False,
+    )
+    if not isinstance(output, dict):
+        raise RuntimeError(output)
+
+
+def _marketing_job(index: int):
+    from agents.registry import get_agent
+    from utils.runner import run_async
+
+    requirements = f"{IDEA['idea']} (variant {index})"
+
+    async def fan_out():
+        return await asyncio.gather(
+            get_agent("arun_business_dev_agent")(requirements),
+            get_agent("arun_sales_agent")(requirements),
+            get_agent("aemail_agent")(requirements),
+            get_agent("aslogan_agent")(requirements),
+            get_agent("socialmedia_agent").ainvoke({"requirements": requirements}),
+            get_agent("avisual_agent")(requirements),
+        )
+
+    run_async(fan_out())
+
+
+def _tech_job(index: int):
+    from agents.registry import get_agent
+    from utils.streaming import stream_text
+
+    stream_text(get_agent("prd_agent"), {**IDEA, "idea": f"{IDEA['idea']} (variant {index})"})
+    requirements = {"requirements": f"{IDEA['idea']} (variant {index})"}
+    stream_text(get_agent("backend_agent"), requirements)
+    stream_text(get_agent("frontend_chain"), requirements)
+
+
+SCENARIOS = {
+    "pipeline": _pipeline_job,
+    "marketing": _marketing_job,
+    "tech": _tech_job,
+}
+
+
+def _percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_level(job, concurrency: int, jobs: int) -> dict:
+    latencies = []
+
+    def timed(index):
+        start = time.perf_counter()
+        job(index)
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(jobs)))
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "jobs": jobs,
+        "throughput_per_min": round(jobs / wall * 60, 2),
+        "p50_seconds": round(statistics.median(latencies), 3),
+        "p95_seconds": round(_percentile(latencies, 0.95), 3),
+        "peak_memory_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if current["throughput_per_min"] < previous["throughput_per_min"] * (1 - tolerance):
+            regressions.append(f"{key}: throughput {current['throughput_per_min']}/min < {previous['throughput_per_min']}/min")
+        if current["p95_seconds"] > previous["p95_seconds"] * (1 + tolerance):
+            regressions.append(f"{key}: p95 {current['p95_seconds']}s > {previous['p95_seconds']}s")
+        if current["peak_memory_mb"] > previous["peak_memory_mb"] * (1 + tolerance):
+            regressions.append(f"{key}: peak memory {current['peak_memory_mb']}MB > {previous['peak_memory_mb']}MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--levels", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--jobs-per-level", type=int, default=None, help="Defaults to 2x the concurrency (min 4)")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    baseline_path = os.path.abspath(args.baseline)
+    # Checkpoints, metrics logs and build output go to a scratch directory.
+    os.chdir(tempfile.mkdtemp(prefix="agentified-bench-"))
+
+    results = {}
+    print(f"{'Scenario':<10} {'Conc':>4} {'Jobs':>4} {'Jobs/min':>9} {'p50':>7} {'p95':>7} {'Peak MB':>8}")
+    for scenario in args.scenarios:
+        SCENARIOS[scenario](-1)
+        for concurrency in args.levels:
+            jobs = args.jobs_per_level or max(4, concurrency * 2)
+            row = run_level(SCENARIOS[scenario], concurrency, jobs)
+            results[f"{scenario}@{concurrency}"] = row
+            print(
+                f"{scenario:<10} {concurrency:>4} {jobs:>4} {row['throughput_per_min']:>9} "
+                f"{row['p50_seconds']:>6}s {row['p95_seconds']:>6}s {row['peak_memory_mb']:>8}"
+            )
+
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        print(f"\nNo baseline at {baseline_path}; run with --save-baseline to record one.")
+        sys.exit(1)
+    with open(baseline_path, encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# File: benchmarks/startup.py
+"""
+Measures how long it takes to import the CLI entry point and the pipeline,
+i.e. the time before `python main.py` can show its first prompt.
+
+    python benchmarks/startup.py --runs 5 --max-seconds 1.0
+
+Exits non-zero when the median import time exceeds --max-seconds or when
+importing pulls in langchain eagerly.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in sys.modules if m.split(".")[0] in ("langchain", "langchain_core", "langchain_google_genai"))
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy}}))
+"""
+
+
+def measure(module: str, runs: int):
+    samples, heavy = [], []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        heavy = result["heavy_modules"]
+    return statistics.median(samples), max(samples), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.0)
+    parser.add_argument("--modules", nargs="+", default=["main", "workflows.full_build"])
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        median, worst, heavy = measure(module, args.runs)
+        status = "ok"
+        if median > args.max_seconds:
+            status, failed = f"too slow (> {args.max_seconds:.2f}s)", True
+        if heavy:
+            status, failed = f"eagerly imports {', '.join(heavy[:3])}", True
+        print(f"{module:<25} median {median * 1000:7.1f} ms   worst {worst * 1000:7.1f} ms   {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
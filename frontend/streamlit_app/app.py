@@ -1,5 +1,6 @@
 import sys
 import os
+import time
 import streamlit as st
 import asyncio
 
@@ -7,20 +8,170 @@ import asyncio
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
 
-from agents.prd_agent import prd_agent
-from agents.frontend_agent import render_ui
-from agents.backend_agent import backend_agent
-from agents.business_dev_agent import business_dev_agent
-from agents.sales_agent import sales_agent
-from agents.marketing_agent.email_agent import email_agent
-from agents.marketing_agent.slogan_agent import slogan_agent
-from agents.marketing_agent.socialmedia_agent import socialmedia_agent
-from agents.marketing_agent.visual_agent import visual_agent
+from agents.registry import get_agent
+from utils import tracing
+from utils.formatters import StreamCleaner, clean_output
+from utils.jobs import FAILED, JobManager
+from utils.logger import current_run, metrics, run_scope, stage_scope
+from utils.runner import run_async
+from utils.session_store import SessionArtifactStore, SessionLease
+from utils.streaming import stream_text
+from workflows.checkpoints import CheckpointStore, new_run_id
+from workflows.full_build import MARKETING_MODE
+from workflows.inbox import ReviewInbox, pending_reviews
+
+POLL_SECONDS = 0.5
+MEMORY_BUDGET_MB = float(os.getenv("AGENTIFIED_SESSION_MEMORY_MB", "64"))
+# Sessions whose lease is never collected are released after this long without a rerun.
+SESSION_TTL = float(os.getenv("AGENTIFIED_SESSION_TTL", "3600"))
 
 st.set_page_config(page_title="Agentified Startup Builder", layout="wide")
 st.title("🚀 Agentified Startup Builder")
 st.markdown("### Build a business from just an idea, with AI agents acting as your founding team.")
 
+st.session_state.setdefault("run_id", new_run_id())
+# Tag every LLM call made during this script run with the session's run id for the metrics panel.
+current_run.set(st.session_state.run_id)
+
+
+@st.cache_resource
+def job_manager():
+    """Background jobs shared by every session, so identical requests are generated once."""
+    return JobManager(max_workers=int(os.getenv("AGENTIFIED_MAX_WORKERS", "4")))
+
+
+@st.cache_resource
+def artifacts():
+    """
+    Generated texts of finished jobs, shared by every session within one memory
+    budget; least recently viewed ones are spilled to disk. A job's texts are
+    dropped, and the job forgotten, once no session shows it anymore.
+    """
+    return SessionArtifactStore(int(MEMORY_BUDGET_MB * 1024 * 1024), on_evict=job_manager().forget)
+
+
+@st.cache_resource
+def agent(name):
+    """Agent chains and their clients, loaded once per server process."""
+    return get_agent(name)
+
+
+def stream_job(job, stage, chain, inputs, language=None):
+    """
+    Streams a chain inside a background job, publishing the cleaned text so
+    far as the job's progress for that stage. The finished text is moved to
+    the artifact store. With a code language ("python", "jsx"), only code
+    blocks in that language are kept.
+    """
+    cleaner = StreamCleaner(code_only=language is not None, code_language=language)
+
+    def publish(token):
+        if cleaner.feed(token):
+            job.update(stage, cleaner.text)
+
+    with stage_scope(stage):
+        _, job.first_token[stage] = stream_text(chain, inputs, on_token=publish)
+    cleaner.close()
+    keep(job, {stage: cleaner.text})
+
+
+def keep(job, texts: dict):
+    """Moves a job's finished texts out of its progress into the artifact store."""
+    for name, text in texts.items():
+        artifacts().put(job.key, name, text)
+        job.update(name, "")
+    return list(texts)
+
+
+def prd_job(job, run_id, chain, inputs):
+    with tracing.trace("prd"), run_scope(run_id):
+        stream_job(job, "prd", chain, inputs)
+
+
+def tech_job(job, run_id, backend_chain, frontend_chain, idea):
+    requirements = {"requirements": idea}
+    with tracing.trace("tech"), run_scope(run_id):
+        stream_job(job, "backend", backend_chain, requirements, language="python")
+        stream_job(job, "frontend", frontend_chain, requirements, language="jsx")
+
+
+def business_job(job, run_id, agents, idea):
+
+    async def run_fused(requirements):
+        # One structured call for every marketing asset (see agents/marketing_agent/bundle_agent.py).
+        biz, sales, bundle = await asyncio.gather(
+            agents["arun_business_dev_agent"](requirements),
+            agents["arun_sales_agent"](requirements),
+            agents["agenerate_marketing_bundle"](requirements),
+        )
+        assets = agents["format_bundle"](bundle)
+        return {
+            "biz": biz["Business_Development_Plan"],
+            "sales": sales["Sales_Strategy"],
+            "email": assets["email_copy"],
+            "slogan": assets["slogans"],
+            "social": assets["social_copy"],
+            "visual": assets["visual_campaign"],
+            "hashtags": assets["hashtags"],
+            "post_ideas": assets["post_ideas"],
+        }
+
+    async def run_all_agents(requirements):
+        biz, sales, email, slogan, social, visual = await asyncio.gather(
+            agents["arun_business_dev_agent"](requirements),
+            agents["arun_sales_agent"](requirements),
+            agents["aemail_agent"](requirements),
+            agents["aslogan_agent"](requirements),
+            agents["socialmedia_agent"].ainvoke({"requirements": requirements}),
+            agents["avisual_agent"](requirements),
+        )
+        return {
+            "biz": biz["Business_Development_Plan"],
+            "sales": sales["Sales_Strategy"],
+            "email": email,
+            "slogan": slogan,
+            "social": clean_output(social),
+            "visual": visual,
+        }
+
+    with tracing.trace("business"), run_scope(run_id):
+        return keep(job, run_async((run_all_agents if MARKETING_MODE == "separate" else run_fused)(idea)))
+
+
+def watch(key):
+    """Returns the job for key, attaching its artifacts to this session."""
+    job = jobs.get(key)
+    if job is not None:
+        artifacts().attach(st.session_state.run_id, key)
+    return job
+
+
+def show_progress(job, stage, language=None):
+    text = job.snapshot().get(stage) or artifacts().get(job.key, stage) or ""
+    if not text:
+        st.info("⏳ Waiting for the first tokens...")
+    elif language:
+        st.code(text, language=language)
+    else:
+        st.markdown(text)
+    seconds = job.first_token.get(stage)
+    if seconds is not None:
+        st.caption(f"⏱️ First token after {seconds:.1f}s")
+
+
+def show_failure(job):
+    if job.status == FAILED:
+        st.error(f"❌ Generation failed: {job.error}. Submit again to retry.")
+        return True
+    return False
+
+
+jobs = job_manager()
+if "artifact_lease" not in st.session_state:
+    st.session_state.artifact_lease = SessionLease(artifacts(), st.session_state.run_id)
+artifacts().touch(st.session_state.run_id)
+artifacts().sweep(SESSION_TTL)
+
 with st.form("product_form"):
     st.subheader("🧠 Enter Your Product Idea")
     idea = st.text_area("Describe your product idea")
@@ -30,76 +181,152 @@ with st.form("product_form"):
     submitted = st.form_submit_button("Generate PRD")
 
 if submitted:
-    with st.spinner("Generating Product Requirements Document..."):
-        st.session_state.idea = idea
-        st.session_state.prd = prd_agent.invoke({
-            "idea": idea,
-            "target_user": target_user,
-            "platform": platform,
-            "pain_point": pain_point
-        })["text"]
-
-    st.success("✅ PRD generated successfully!")
-    st.download_button("📄 Download PRD", st.session_state.prd, file_name="PRD.md")
-
-    # Show pipeline choices
-    st.markdown("### Choose a pipeline to proceed:")
-    col1, col2 = st.columns(2)
-    with col1:
-        if st.button("💻 Run Tech Pipeline"):
-            with st.spinner("Generating backend and frontend code..."):
-                st.session_state.backend = backend_agent(st.session_state.idea)
-                st.session_state.frontend_code = render_ui(st.session_state.idea)
-            st.success("✅ Tech components generated!")
-
-            st.subheader("🧩 Backend Code")
-            st.code(st.session_state.backend, language="python")
-
-            st.subheader("🎨 Frontend UI")
-            st.code(st.session_state.frontend_code, language="html")
-
-    with col2:
-        if st.button("📈 Run Business + Marketing Pipeline"):
-
-            async def run_all_agents():
-                tasks = [
-                    asyncio.to_thread(business_dev_agent, st.session_state.idea),
-                    asyncio.to_thread(sales_agent, st.session_state.idea),
-                    asyncio.to_thread(email_agent, st.session_state.idea),
-                    asyncio.to_thread(slogan_agent, st.session_state.idea),
-                    asyncio.to_thread(socialmedia_agent, st.session_state.idea),
-                    asyncio.to_thread(visual_agent, st.session_state.idea),
-                ]
-                return await asyncio.gather(*tasks)
-
-            with st.spinner("Generating business strategies and marketing content..."):
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                biz, sales, email, slogan, social, visual = loop.run_until_complete(run_all_agents())
-
-                st.session_state.biz = biz
-                st.session_state.sales = sales
-                st.session_state.email = email
-                st.session_state.slogan = slogan
-                st.session_state.social = social
-                st.session_state.visual = visual
-
-            st.success("✅ Business & Marketing content generated!")
-
-            st.subheader("📊 Business Strategy")
-            st.markdown(st.session_state.biz)
-
-            st.subheader("💸 Sales Copy")
-            st.markdown(st.session_state.sales)
-
-            st.subheader("✉️ Cold Email")
-            st.markdown(st.session_state.email)
-
-            st.subheader("🧠 Slogan")
-            st.markdown(f"> _{st.session_state.slogan}_")
-
-            st.subheader("📱 Social Media Post")
-            st.markdown(st.session_state.social)
-
-            st.subheader("🎨 Visual Description")
-            st.markdown(st.session_state.visual)
+    # Results are memoized per product context, across sessions and reruns.
+    st.session_state.context = (idea, target_user, platform, pain_point)
+    st.session_state.pop("pipelines", None)
+    # Release the previous idea's artifacts before starting the new one.
+    artifacts().end_session(st.session_state.run_id)
+    artifacts().attach(st.session_state.run_id, ("prd",) + st.session_state.context)
+    jobs.submit(("prd",) + st.session_state.context, prd_job, st.session_state.run_id, agent("prd_agent"), {
+        "idea": idea,
+        "target_user": target_user,
+        "platform": platform,
+        "pain_point": pain_point
+    })
+
+context = st.session_state.get("context")
+active = []
+
+if context:
+    st.subheader("📄 Product Requirements Document")
+    prd = watch(("prd",) + context)
+    if prd is None or show_failure(prd):
+        st.session_state.pop("context", None)
+    else:
+        show_progress(prd, "prd")
+        if prd.active:
+            active.append(prd)
+        else:
+            st.success("✅ PRD generated successfully!")
+            st.download_button("📄 Download PRD", artifacts().get(prd.key, "prd") or "", file_name="PRD.md")
+
+            # Show pipeline choices
+            st.markdown("### Choose a pipeline to proceed:")
+            pipelines = st.session_state.setdefault("pipelines", set())
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("💻 Run Tech Pipeline"):
+                    pipelines.add("tech")
+                    artifacts().attach(st.session_state.run_id, ("tech",) + context)
+                    jobs.submit(
+                        ("tech",) + context, tech_job, st.session_state.run_id,
+                        agent("backend_agent"), agent("frontend_chain"), context[0],
+                    )
+            with col2:
+                if st.button("📈 Run Business + Marketing Pipeline"):
+                    pipelines.add("business")
+                    artifacts().attach(st.session_state.run_id, ("business",) + context)
+                    names = ["arun_business_dev_agent", "arun_sales_agent"] + (
+                        ["aemail_agent", "aslogan_agent", "socialmedia_agent", "avisual_agent"]
+                        if MARKETING_MODE == "separate" else ["agenerate_marketing_bundle", "format_bundle"]
+                    )
+                    jobs.submit(
+                        ("business",) + context, business_job, st.session_state.run_id,
+                        {name: agent(name) for name in names}, context[0],
+                    )
+
+            tech = watch(("tech",) + context) if "tech" in pipelines else None
+            if tech is not None and not show_failure(tech):
+                st.subheader("🧩 Backend Code")
+                show_progress(tech, "backend", language="python")
+                st.subheader("🎨 Frontend UI")
+                show_progress(tech, "frontend", language="jsx")
+                if tech.active:
+                    active.append(tech)
+                else:
+                    st.success("✅ Tech components generated!")
+
+            business = watch(("business",) + context) if "business" in pipelines else None
+            if business is not None and not show_failure(business):
+                if business.active:
+                    st.info("⏳ Generating business strategies and marketing content...")
+                    active.append(business)
+                else:
+                    result = {name: artifacts().get(business.key, name) or "" for name in business.result}
+                    st.success("✅ Business & Marketing content generated!")
+
+                    st.subheader("📊 Business Strategy")
+                    st.markdown(result["biz"])
+
+                    st.subheader("💸 Sales Copy")
+                    st.markdown(result["sales"])
+
+                    st.subheader("✉️ Cold Email")
+                    st.markdown(result["email"])
+
+                    st.subheader("🧠 Slogan")
+                    st.markdown(result["slogan"] if "\n" in result["slogan"] else f"> _{result['slogan']}_")
+
+                    st.subheader("📱 Social Media Post")
+                    st.markdown(result["social"])
+
+                    st.subheader("🎨 Visual Description")
+                    st.markdown(result["visual"])
+
+                    if "hashtags" in result:
+                        st.subheader("#️⃣ Hashtags & Post Ideas")
+                        st.markdown(result["hashtags"])
+                        st.markdown(result["post_ideas"])
+
+with st.expander("📥 Review inbox"):
+    # Stages posted by pipelines started with `python main.py --review inbox`.
+    items = pending_reviews()
+    if not items:
+        st.caption("Nothing waiting for review.")
+    for item in items:
+        key = f"{item['run']}-{item['stage']}-{item['version']}"
+        st.markdown(f"**{item['title']}** · run `{item['run']}`")
+        if item["stage"] in ("frontend_code", "backend_code", "test_code"):
+            st.code(item["output"], language="jsx" if item["stage"] == "frontend_code" else "python")
+        else:
+            st.markdown(item["output"])
+        feedback = st.text_input("What should change?", key=f"feedback-{key}")
+        approve_col, reject_col, revise_col = st.columns(3)
+        decision = None
+        if approve_col.button("✅ Approve", key=f"approve-{key}"):
+            decision = True
+        if reject_col.button("🔁 Reject", key=f"reject-{key}"):
+            decision = False
+        if revise_col.button("✏️ Revise", key=f"revise-{key}", disabled=not feedback.strip()):
+            decision = feedback
+        if decision is not None:
+            if not ReviewInbox(CheckpointStore(item["run"])).decide(item["stage"], decision, item["version"]):
+                st.warning("This stage changed while you were reviewing it.")
+            st.rerun()
+
+with st.expander("🕒 Where the time went"):
+    recorded = tracing.traces(st.session_state.run_id)
+    if recorded:
+        # Jobs shared with another session are traced under that session's run.
+        st.code(tracing.report(recorded), language=None)
+        st.caption("Traces: " + ", ".join(f"`{item.path}`" for item in recorded))
+    else:
+        st.caption("No finished jobs traced in this session yet.")
+
+with st.expander("📊 Agent metrics"):
+    rows = metrics.summary(st.session_state.run_id)
+    if rows:
+        st.dataframe(rows, use_container_width=True)
+    else:
+        st.caption("No LLM calls recorded in this session yet.")
+    st.caption("Background jobs: " + ", ".join(f"{count} {status}" for status, count in jobs.stats().items()))
+    store = artifacts().stats()
+    st.caption(
+        f"Artifacts: {store['artifacts']} for {store['sessions']} sessions, "
+        f"{store['memory_bytes'] / 1e6:.1f} MB in memory, {store['spilled']} spilled ({store['spilled_bytes'] / 1e6:.1f} MB)"
+    )
+
+# Poll running jobs by rerunning the script; the work itself never blocks a rerun.
+if active:
+    time.sleep(POLL_SECONDS)
+    st.rerun()
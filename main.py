@@ -1,32 +1,114 @@
 
+import argparse
 import os
+from workflows.checkpoints import new_run_id
 from workflows.full_build import run_full_pipeline
 
-def save_outputs(output_dict: dict, directory="build"):
+def report_metrics():
     """
-    Save each output from the agent pipeline into a .txt file inside the specified directory.
+    Print the per-stage latency/token/cost table and export a Prometheus snapshot.
     """
-    os.makedirs(directory, exist_ok=True)
-    for name, content in output_dict.items():
-        file_path = os.path.join(directory, f"{name}.txt")
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content.strip() if isinstance(content, str) else str(content))
+    from utils.logger import metrics
+
+    print("\n📊 Agent metrics\n")
+    print(metrics.summary_table())
+    print(f"\n📈 Prometheus snapshot written to {metrics.write_prometheus()}")
+
+def report_trace(run_id: str):
+    """
+    Print the waterfall and critical path of the run's latest trace.
+    """
+    from utils import tracing
+
+    recorded = tracing.traces(run_id)[-1:]
+    if recorded:
+        print("\n🕒 Where the time went\n")
+        print(tracing.report(recorded))
+        print(f"\n🧵 Trace written to {recorded[0].path} (open in chrome://tracing or ui.perfetto.dev)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Agentified: generate a full-stack app from a product idea.")
+    parser.add_argument("--batch", metavar="FILE", help="Run non-interactively over a .jsonl or .csv file of ideas")
+    parser.add_argument("--workers", type=int, default=4, help="Ideas processed concurrently in batch and service mode")
+    parser.add_argument("--approval", choices=["auto", "policy"], default="auto", help="Approval policy used in batch mode")
+    parser.add_argument("--out", default="build/batch", help="Output directory for batch mode")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume a checkpointed run, reusing approved stages")
+    parser.add_argument("--regenerate", metavar="STAGE", help="With --resume, regenerate this stage and everything downstream of it")
+    parser.add_argument("--reuse", choices=["off", "ask", "auto"], default="ask", help="Adapt a near-duplicate earlier run's artifacts instead of generating them (interactive runs only)")
+    parser.add_argument("--review", choices=["inline", "inbox"], default="inline", help="inbox: keep generating while stages wait for review")
+    parser.add_argument("--no-speculate", action="store_true", help="With --review inbox, wait for approval before generating dependent stages")
+    parser.add_argument("--serve", nargs="?", type=int, const=8765, metavar="PORT", help="Run the HTTP job service (uses --workers and --pool)")
+    parser.add_argument("--pool", choices=["thread", "process"], default="thread", help="Worker pool used by --serve")
+    parser.add_argument("--inbox", nargs="?", const="", metavar="RUN_ID", help="Review pending stages of one run (or all runs) and exit")
+    return parser.parse_args()
+
+def run_batch_mode(args):
+    from workflows.batch import run_batch
+
+    print(f"\n📦 Running batch from {args.batch} with {args.workers} workers...")
+    summary = run_batch(
+        args.batch,
+        out_dir=args.out,
+        workers=args.workers,
+        approval=args.approval,
+    )
+    print(
+        f"\n📊 {summary['ideas']} ideas in {summary['wall_seconds']}s "
+        f"({summary['ideas_per_minute']} ideas/min, {summary['mean_seconds_per_idea']}s mean per idea)"
+    )
+    print(f"   ✅ {summary['succeeded']} succeeded   🚫 {summary['rejected']} rejected   🔥 {summary['failed']} failed")
+    print(f"🗂️ Outputs saved to {args.out}/")
+
+def run_inbox_mode(args):
+    from utils.hitl import human_approval_step
+    from workflows.inbox import review_inbox
+
+    reviewed = review_inbox(human_approval_step, run_id=args.inbox or None)
+    print(f"\n📭 Inbox empty ({reviewed} reviewed).")
+
+def run_service_mode(args):
+    from workflows.service import serve
+
+    serve(port=args.serve, workers=args.workers, pool=args.pool)
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        requirement = input("\n📌 Enter product requirements: ")
-        output = run_full_pipeline(requirement)
-
-        if isinstance(output, dict):
-            print("\n🎉 All outputs generated and approved successfully!")
-            save_outputs(output)
-            print("🗂️ Outputs saved to ./build/ directory.")
-            for k, v in output.items():
-                print(f"\n=== {k.upper()} ===\n{v}")
+        if args.batch:
+            run_batch_mode(args)
+        elif args.serve is not None:
+            run_service_mode(args)
+        elif args.inbox is not None:
+            run_inbox_mode(args)
         else:
-            print(f"\n❌ Process halted: {output}")
+            requirement = None if args.resume else input("\n📌 Enter product requirements: ")
+            run_id = args.resume or new_run_id()
+            output = run_full_pipeline(
+                requirement,
+                run_id=run_id,
+                regenerate=args.regenerate,
+                reuse=args.reuse,
+                review=args.review,
+                speculative=not args.no_speculate,
+            )
+
+            if isinstance(output, dict):
+                print("\n🎉 All outputs generated and approved successfully!")
+                print(f"🗂️ Outputs saved to {os.path.join('build', 'runs', run_id)}/ (build/latest points at it).")
+                for k, v in output.items():
+                    print(f"\n=== {k.upper()} ===\n{v}")
+            else:
+                print(f"\n❌ Process halted: {output}")
+            report_trace(run_id)
+        report_metrics()
 
     except KeyboardInterrupt:
         print("\n⛔ Interrupted by user.")
     except Exception as e:
-        print(f"\n🔥 Unexpected error: {str(e)}")
+        from utils.ratelimit import is_throttled
+
+        if is_throttled(e):
+            print(f"\n🐢 Gemini quota still exhausted after retries: {str(e)}")
+            print("   Lower AGENTIFIED_RPM, AGENTIFIED_TPM or AGENTIFIED_MAX_CONCURRENCY and try again.")
+        else:
+            print(f"\n🔥 Unexpected error: {str(e)}")
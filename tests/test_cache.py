@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from utils import cache
+from workflows import full_build
+
+
+@pytest.fixture
+def cached(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AGENTIFIED_LLM", "fake")
+    monkeypatch.setenv("AGENTIFIED_FAKE_LATENCY", "fixed:0.01")
+    monkeypatch.setenv("AGENTIFIED_FAKE_TOKENS_PER_SEC", "100000")
+    monkeypatch.setenv("AGENTIFIED_CACHE", str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(cache, "_cache", None)
+    monkeypatch.setattr(full_build, "VALIDATION", False)
+    return cache
+
+
+def _run(approve, **kwargs):
+    return full_build.run_full_pipeline(
+        "a tool for dentists to schedule appointments", "clinic staff", "Web", "phone tag",
+        approve=approve, build_dir="build", stream=False, verbose=False, run_id="cached-run", **kwargs,
+    )
+
+
+def test_fresh_responses_skips_reads_but_replaces_the_entry(cached):
+    store = cache.get_cache()
+    key = store.key("model", 0.4, "prompt")
+    store.put(key, "old", "agent")
+    with cache.fresh_responses():
+        assert cache.wants_fresh()
+    with cache.fresh_responses(False):
+        assert not cache.wants_fresh()
+    assert store.get(key, "agent") == "old"
+
+
+def test_rejected_stage_is_regenerated_without_the_cached_reply(cached):
+    reject_docs = lambda title, content, show=True: not title.startswith("Documentation")
+    assert isinstance(_run(reject_docs), str)
+    hits = cached.get_cache().hits["docs_agent"]
+
+    assert isinstance(_run(lambda title, content, show=True: True), dict)
+    assert cached.get_cache().hits["docs_agent"] == hits
+
+
+def test_regenerated_stage_skips_the_cache(cached):
+    _run(lambda title, content, show=True: True)
+    hits = cached.get_cache().hits["docs_agent"]
+    _run(lambda title, content, show=True: True, regenerate="docs")
+    assert cached.get_cache().hits["docs_agent"] == hits
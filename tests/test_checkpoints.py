@@ -0,0 +1,33 @@
+import threading
+
+from workflows.checkpoints import CheckpointStore
+from workflows.inbox import ReviewInbox
+
+
+def test_concurrent_updates_from_separate_stores_are_not_lost(tmp_path):
+    CheckpointStore("run", str(tmp_path)).save("docs", "digest", {}, "text")
+
+    def update(field):
+        store = CheckpointStore("run", str(tmp_path))
+        for value in range(50):
+            store.update("docs", **{field: value})
+
+    threads = [threading.Thread(target=update, args=(f"field{n}",)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    record = CheckpointStore("run", str(tmp_path)).get("docs")
+    assert all(record[f"field{n}"] == 49 for n in range(8))
+    assert not [name for name in (tmp_path / "run").iterdir() if name.suffix == ".tmp"]
+
+
+def test_decide_refuses_a_stage_replaced_after_it_was_shown(tmp_path):
+    store = CheckpointStore("run", str(tmp_path))
+    store.save("docs", "digest", {}, "text")
+    version = store.get("docs")["updated"]
+    store.save_revision("docs", "revised", "shorter")
+    assert not ReviewInbox(store).decide("docs", True, version)
+    assert ReviewInbox(store).decide("docs", True, store.get("docs")["updated"])
+    assert store.get("docs")["approved"] is True
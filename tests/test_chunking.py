@@ -0,0 +1,116 @@
+import ast
+
+from utils.chunking import chunk_code, merge_docs, merge_tests, pack, split_jsx, split_python
+
+BACKEND = '''from fastapi import FastAPI
+
+app = FastAPI()
+
+
+@app.get("/items")
+def list_items():
+    return []
+
+
+@app.post("/items")
+def create_item(item: dict):
+    return item
+'''
+
+FRONTEND = '''import React from "react";
+
+function ItemList() {
+  return <ul />;
+}
+
+export default function App() {
+  return <ItemList />;
+}
+'''
+
+
+def test_split_python_keeps_setup_in_header_and_names_routes():
+    header, units = split_python(BACKEND)
+    assert "app = FastAPI()" in header
+    assert [name for name, _ in units] == ["GET /items", "POST /items"]
+
+
+def test_split_python_falls_back_to_blocks_on_syntax_error():
+    header, units = split_python("def broken(:\n    pass\n\nx = 1\n")
+    assert header == ""
+    assert [name for name, _ in units] == ["block 1", "block 2"]
+
+
+def test_split_jsx_hoists_imports():
+    header, units = split_jsx(FRONTEND)
+    assert header.startswith("import React")
+    assert [name for name, _ in units] == ["ItemList", "App"]
+
+
+def test_pack_repeats_header_and_keeps_oversized_units():
+    chunks = pack("H\n", [("a", "x" * 10), ("b", "y" * 10), ("c", "z" * 30)], max_chars=25)
+    assert [names for names, _ in chunks] == [["a", "b"], ["c"]]
+    assert all(code.startswith("H\n") for _, code in chunks)
+
+
+def test_chunk_code_filters_languages():
+    chunks = chunk_code(FRONTEND, BACKEND, max_chars=60, languages=("python",))
+    assert chunks and all(chunk["language"] == "python" for chunk in chunks)
+    assert chunk_code(FRONTEND, "", languages=("python",)) == []
+
+
+def test_merge_tests_deduplicates_setup_helpers_and_renames_clashing_tests():
+    first = '''import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def item():
+    return {"name": "a"}
+
+
+def test_create(item):
+    assert client.post("/items", json=item).status_code == 200
+'''
+    second = '''import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def item():
+    return {"name": "a"}
+
+
+def test_create(item):
+    assert client.post("/items", json=item).json() == item
+
+
+def test_list():
+    assert client.get("/items").json() == []
+'''
+    merged = merge_tests([("python: POST /items", first), ("python: GET /items", second)])
+    ast.parse(merged)
+    assert merged.count("from main import app") == 1
+    assert merged.count("client = TestClient(app)") == 1
+    assert merged.count("def item(") == 1
+    assert "def test_create(" in merged and "def test_create_2(" in merged
+    assert "def test_list(" in merged
+
+
+def test_merge_tests_handles_unparseable_chunks():
+    merged = merge_tests([("a", "import os\ndef test_a(:\n"), ("b", "import os\n\ndef test_b():\n    pass\n")])
+    assert merged.count("import os") == 1
+    assert "def test_b()" in merged
+
+
+def test_merge_docs_builds_table_of_contents():
+    merged = merge_docs([("python: GET /items", "Lists items."), ("jsx: App", "The root.")])
+    assert merged.startswith("# Documentation")
+    assert "- [python: GET /items](#python-get-items)" in merged
+    assert "## jsx: App\n\nThe root." in merged
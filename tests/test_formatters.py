@@ -0,0 +1,77 @@
+from utils.formatters import StreamCleaner, clean_output, extract_code
+
+REPLY = '''Install the dependencies:
+
+```bash
+pip install fastapi uvicorn
+```
+
+```python
+from fastapi import FastAPI
+
+app = FastAPI()
+```
+'''
+
+DOCS = '''```markdown
+# Items API
+
+Run it with:
+
+```bash
+uvicorn main:app
+```
+```'''
+
+
+def test_extract_code_keeps_only_blocks_in_the_stage_language():
+    assert extract_code(REPLY, "python") == "from fastapi import FastAPI\n\napp = FastAPI()"
+
+
+def test_extract_code_without_language_keeps_every_block():
+    assert extract_code(REPLY).startswith("pip install fastapi uvicorn")
+
+
+def test_extract_code_falls_back_to_other_blocks_when_none_match():
+    assert extract_code("```bash\npip install fastapi\n```", "python") == "pip install fastapi"
+
+
+def test_extract_code_without_fences_returns_cleaned_reply():
+    assert extract_code("print('hi')\n\n\n") == "print('hi')"
+
+
+def test_clean_output_keeps_markdown_code_fences_when_asked():
+    assert clean_output(DOCS, keep_fences=True) == "# Items API\n\nRun it with:\n\n```bash\nuvicorn main:app\n```"
+    assert "```" not in clean_output(DOCS)
+
+
+def test_stream_cleaner_matches_whole_reply_when_fed_per_character():
+    cleaner = StreamCleaner(code_only=True, code_language="python")
+    for character in REPLY:
+        cleaner.feed(character)
+    cleaner.close()
+    assert cleaner.text == extract_code(REPLY, "python")
+
+
+def test_clean_output_keeps_untagged_blocks_inside_a_markdown_wrapper():
+    reply = "```markdown\n# Items API\n\nRun it with:\n\n```\nuvicorn main:app\n```\n\nThat's all.\n```\n"
+    expected = "# Items API\n\nRun it with:\n\n```\nuvicorn main:app\n```\n\nThat's all."
+    assert clean_output(reply, keep_fences=True) == expected
+    cleaner = StreamCleaner(keep_fences=True)
+    for character in reply:
+        cleaner.feed(character)
+    cleaner.close()
+    assert cleaner.text == expected
+
+
+def test_clean_output_ends_the_markdown_wrapper_before_a_tagged_block():
+    reply = "```markdown\n# Items API\n```\n\n```bash\nuvicorn main:app\n```"
+    assert clean_output(reply, keep_fences=True) == "# Items API\n\n```bash\nuvicorn main:app\n```"
+
+
+def test_stream_cleaner_without_keep_text_only_feeds_the_sink():
+    pieces = []
+    cleaner = StreamCleaner(code_only=True, sink=pieces.append, code_language="python", keep_text=False)
+    emitted = "".join(cleaner.feed(character) for character in REPLY) + cleaner.close()
+    assert "".join(pieces) == emitted == extract_code(REPLY, "python")
+    assert cleaner.text == ""
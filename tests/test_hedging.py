@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+import pytest
+
+from utils import hedging
+
+
+@pytest.fixture
+def deadline(monkeypatch):
+    def set_deadline(seconds, hedge=False, delay=None, ratio=1.0):
+        monkeypatch.setattr(hedging, "DEADLINES", {"prd_agent": seconds} if seconds else {})
+        monkeypatch.setattr(hedging, "DEFAULT_DEADLINE", 0.0)
+        monkeypatch.setattr(hedging, "HEDGE", hedge)
+        monkeypatch.setattr(hedging, "hedge_delay", lambda agent: delay)
+        monkeypatch.setattr(hedging, "budget", hedging.HedgeBudget(ratio))
+    return set_deadline
+
+
+class Copies:
+    """make_call for hedging.call: each copy sleeps its own delay, and cancellations are recorded."""
+
+    def __init__(self, *delays):
+        self.delays = list(delays)
+        self.started = 0
+        self.cancelled = []
+
+    async def __call__(self):
+        copy = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delays[copy])
+        except asyncio.CancelledError:
+            self.cancelled.append(copy)
+            raise
+        return f"copy {copy}"
+
+
+def test_call_without_deadline_or_hedging_just_awaits(deadline):
+    deadline(None)
+    assert asyncio.run(hedging.call("prd_agent", Copies(0.01))) == "copy 0"
+
+
+def test_call_raises_and_cancels_once_the_deadline_passes(deadline):
+    deadline(0.05)
+    copies = Copies(5)
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError, match="within 0.05s"):
+        asyncio.run(hedging.call("prd_agent", copies))
+    assert time.perf_counter() - started < 1
+    assert copies.cancelled == [0]
+
+
+def test_hedged_copy_wins_and_the_slow_one_is_cancelled(deadline):
+    deadline(None, hedge=True, delay=0.02)
+    copies, stats = Copies(5, 0.01), {}
+    assert asyncio.run(hedging.call("prd_agent", copies, stats)) == "copy 1"
+    assert stats == {"hedged": True}
+    assert copies.cancelled == [0]
+
+
+def test_no_hedge_once_the_budget_is_spent(deadline):
+    deadline(None, hedge=True, delay=0.01, ratio=0.0)
+    copies, stats = Copies(0.05), {}
+    assert asyncio.run(hedging.call("prd_agent", copies, stats)) == "copy 0"
+    assert copies.started == 1 and stats == {}
+
+
+def test_hedge_budget_caps_the_share_of_hedged_calls():
+    budget = hedging.HedgeBudget(0.5)
+    budget.count()
+    assert not budget.take()
+    budget.count()
+    assert budget.take()
+    assert not budget.take()
+
+
+def test_hedge_delay_is_the_p95_of_recent_successful_calls(monkeypatch):
+    calls = [{"latency": float(n), "cache_hit": False, "error": None} for n in range(1, 21)]
+    calls += [{"latency": 99.0, "cache_hit": True, "error": None}, {"latency": 99.0, "cache_hit": False, "error": "x"}]
+    monkeypatch.setattr(hedging.metrics, "recent", lambda agent: calls)
+    assert hedging.hedge_delay("prd_agent") == 19.0
+    monkeypatch.setattr(hedging.metrics, "recent", lambda agent: calls[:3])
+    monkeypatch.setattr(hedging, "HEDGE_AFTER", 30.0)
+    assert hedging.hedge_delay("prd_agent") == 30.0
+
+
+def _chunks(first_delay, gap, count=3, closed=None):
+    async def generate():
+        try:
+            await asyncio.sleep(first_delay)
+            for index in range(count):
+                yield index
+                await asyncio.sleep(gap)
+        finally:
+            if closed is not None:
+                closed.append(True)
+    return generate
+
+
+async def _collect(iterator):
+    return [chunk async for chunk in iterator]
+
+
+def test_stream_passes_chunks_through_within_the_deadline(deadline):
+    deadline(1.0)
+    assert asyncio.run(_collect(hedging.stream("prd_agent", _chunks(0.01, 0.01)))) == [0, 1, 2]
+
+
+def test_stream_deadline_bounds_the_first_chunk(deadline):
+    deadline(0.05)
+    closed = []
+    with pytest.raises(TimeoutError, match="did not start responding within 0.05s"):
+        asyncio.run(_collect(hedging.stream("prd_agent", _chunks(5, 0, closed=closed))))
+    assert closed == [True]
+
+
+def test_stream_deadline_bounds_the_whole_stream(deadline):
+    deadline(0.1)
+    received, closed = [], []
+
+    async def consume():
+        async for chunk in hedging.stream("prd_agent", _chunks(0.01, 0.06, count=10, closed=closed)):
+            received.append(chunk)
+
+    with pytest.raises(TimeoutError, match="did not finish responding within 0.1s"):
+        asyncio.run(consume())
+    assert received and len(received) < 10
+    assert closed == [True]
+
+
+def test_agent_stream_honours_the_deadline_through_the_sync_api(deadline, monkeypatch):
+    pytest.importorskip("langchain_core")
+    from utils.llm import AgentLLM
+
+    monkeypatch.setenv("AGENTIFIED_LLM", "fake")
+    monkeypatch.setenv("AGENTIFIED_FAKE_LATENCY", "fixed:2")
+    monkeypatch.delenv("AGENTIFIED_CACHE", raising=False)
+    monkeypatch.setattr("utils.llm._clients", {})
+    deadline(0.1)
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError, match="did not start responding"):
+        list(AgentLLM("prd_agent").stream("write a PRD"))
+    assert time.perf_counter() - started < 1.5
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from workflows import full_build, inbox
+from workflows.checkpoints import CheckpointStore
+
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AGENTIFIED_LLM", "fake")
+    monkeypatch.setenv("AGENTIFIED_FAKE_LATENCY", "fixed:0.01")
+    monkeypatch.setenv("AGENTIFIED_FAKE_TOKENS_PER_SEC", "100000")
+    monkeypatch.delenv("AGENTIFIED_CACHE", raising=False)
+    monkeypatch.setattr(full_build, "VALIDATION", False)
+    monkeypatch.setattr(full_build, "POLL_SECONDS", 0.01)
+    monkeypatch.setattr(inbox, "POLL_SECONDS", 0.01)
+    return tmp_path
+
+
+def test_inbox_review_rejects_revises_and_approves(offline, monkeypatch):
+    calls = []
+    run_with_inbox = full_build._run_with_inbox
+    monkeypatch.setattr(full_build, "_run_with_inbox", lambda *args, **kwargs: calls.append(1) or run_with_inbox(*args, **kwargs))
+    seen = []
+
+    def approve(title, content, show=False):
+        seen.append(title)
+        if title.startswith("Documentation") and seen.count(title) == 1:
+            return False
+        if title.startswith("User Stories") and seen.count(title) == 1:
+            return "make the first story about onboarding"
+        return True
+
+    output = full_build.run_full_pipeline(
+        "a tool for dentists to schedule appointments", "clinic staff", "Web", "phone tag",
+        approve=approve, build_dir="build", stream=False, verbose=False, run_id="inbox-run", review="inbox",
+    )
+
+    assert calls == [1]
+    assert isinstance(output, dict) and output["docs"]
+    assert sum(title.startswith("Documentation") for title in seen) == 2
+    assert sum(title.startswith("User Stories") for title in seen) == 2
+    store = CheckpointStore("inbox-run")
+    assert all(store.get(stage)["approved"] for stage in ("prd", "user_stories", "docs", "backend_code"))
+    assert store.get("user_stories")["revisions"] == ["make the first story about onboarding"]
+    assert (offline / "build" / "runs" / "inbox-run" / "documentation.md").exists()
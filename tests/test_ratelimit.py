@@ -0,0 +1,170 @@
+import threading
+import time
+
+import pytest
+
+from utils import ratelimit
+
+
+class ClientError(Exception):
+    def __init__(self, message, code=None, status_code=None):
+        super().__init__(message)
+        self.code = code
+        self.status_code = status_code
+
+
+@pytest.mark.parametrize("error", [
+    ClientError("quota", code=429),
+    ClientError("overloaded", status_code=503),
+    RuntimeError("429 RESOURCE_EXHAUSTED"),
+    RuntimeError("Error calling model: {'code': 429}"),
+    RuntimeError("Rate limit reached for requests"),
+])
+def test_is_throttled_recognizes_quota_errors(error):
+    assert ratelimit.is_throttled(error)
+
+
+@pytest.mark.parametrize("message", [
+    "processed 429 items before failing",
+    "KeyError: 'order_4290'",
+    "Disk quota exceeded",
+    "timed out after 1429ms",
+])
+def test_is_throttled_ignores_unrelated_numbers(message):
+    assert not ratelimit.is_throttled(RuntimeError(message))
+
+
+def test_is_throttled_looks_at_the_cause():
+    try:
+        try:
+            raise ClientError("quota", code=429)
+        except ClientError as error:
+            raise ValueError("Unexpected error") from error
+    except ValueError as wrapped:
+        assert ratelimit.is_throttled(wrapped)
+
+
+class FakeClock:
+    """
+    Stands in for the time module: sleeping advances the clock instantly, by
+    at least a millisecond, as real time would past a rounding-error wait.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0.001)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", fake)
+    return fake
+
+
+def test_requests_wait_for_the_bucket_to_refill(clock):
+    limiter = ratelimit.RateLimiter(rpm=2, tpm=1_000_000)
+    for _ in range(2):
+        limiter.acquire("prd_agent", 10)
+        limiter.release()
+    assert clock.now == 0
+    limiter.acquire("prd_agent", 10)
+    assert 29.9 <= clock.now <= 31
+
+
+def test_tokens_wait_for_the_bucket_to_refill(clock):
+    limiter = ratelimit.RateLimiter(rpm=1000, tpm=1000)
+    limiter.acquire("prd_agent", 1000)
+    limiter.release(reserved=1000, used=1000)
+    limiter.acquire("prd_agent", 500)
+    assert 29.9 <= clock.now <= 31
+
+
+def test_throttling_halves_concurrency_and_successes_grow_it_back(clock):
+    limiter = ratelimit.RateLimiter(rpm=1000, tpm=1_000_000, max_concurrency=8)
+    for expected in (4, 2, 1, 1):
+        limiter.acquire("prd_agent", 10)
+        limiter.release(throttled=True)
+        assert limiter.stats()["concurrency_limit"] == expected
+    for _ in range(40):
+        limiter.acquire("prd_agent", 10)
+        limiter.release()
+    assert limiter.stats()["concurrency_limit"] == 8
+    assert limiter.stats()["throttled"] == 4
+
+
+def test_queued_calls_are_granted_in_priority_order():
+    limiter = ratelimit.RateLimiter(rpm=1000, tpm=1_000_000, max_concurrency=1)
+    limiter.acquire("docs_agent", 10)
+    granted = []
+
+    def call(agent):
+        limiter.acquire(agent, 10)
+        granted.append(agent)
+        limiter.release()
+
+    threads = []
+    for agent in ("socialmedia_agent", "prd_agent"):
+        threads.append(threading.Thread(target=call, args=(agent,)))
+        threads[-1].start()
+        while limiter.stats()["queued"] < len(threads):
+            time.sleep(0.005)
+    limiter.release()
+    for thread in threads:
+        thread.join(5)
+    assert granted == ["prd_agent", "socialmedia_agent"]
+
+
+def test_backoff_delay_is_jittered_exponential_and_capped():
+    for attempt in range(8):
+        delay = ratelimit.backoff_delay(attempt, base=1.0, cap=30.0)
+        ceiling = min(30.0, 2 ** attempt)
+        assert ceiling / 2 <= delay <= ceiling
+
+
+def test_limited_call_retries_throttled_calls_only(clock, monkeypatch):
+    limiter = ratelimit.RateLimiter(rpm=1000, tpm=1_000_000)
+    monkeypatch.setattr(ratelimit, "get_limiter", lambda: limiter)
+    monkeypatch.setattr(ratelimit, "backoff_delay", lambda attempt: 0)
+    replies = iter([ClientError("quota", code=429), ClientError("quota", code=429), "ok"])
+
+    def call():
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    stats = {}
+    assert ratelimit.limited_call("prd_agent", "prompt", call, stats) == "ok"
+    assert stats["retries"] == 2
+    assert limiter.stats() == {"concurrency_limit": 2, "in_flight": 0, "queued": 0, "throttled": 2}
+
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise RuntimeError("bad request")
+
+    with pytest.raises(RuntimeError):
+        ratelimit.limited_call("prd_agent", "prompt", failing)
+    assert len(attempts) == 1
+
+
+def test_limited_call_gives_up_after_max_retries(clock, monkeypatch):
+    monkeypatch.setattr(ratelimit, "get_limiter", lambda: ratelimit.RateLimiter(rpm=1000, tpm=1_000_000))
+    monkeypatch.setattr(ratelimit, "backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(ratelimit, "MAX_RETRIES", 2)
+    attempts = []
+
+    def throttled():
+        attempts.append(1)
+        raise ClientError("quota", code=429)
+
+    with pytest.raises(ClientError):
+        ratelimit.limited_call("prd_agent", "prompt", throttled)
+    assert len(attempts) == 3
@@ -0,0 +1,48 @@
+from utils import revision
+from workflows import full_build
+
+PRD = '''# Dental Scheduler
+
+## Overview
+Lets dentists fill their calendar.
+
+## Reminders
+Patients get SMS reminders.
+
+## Billing
+Invoices per appointment.
+'''
+
+
+class RecordingChain:
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, inputs):
+        self.calls.append(inputs)
+        return "<<<PART 1>>>\n## Overview\nLets barbers fill their calendar."
+
+
+def test_units_mentioning_picks_only_the_sections_with_dropped_terms():
+    targets = full_build._units_mentioning(PRD, "markdown", ["dentist"])
+    assert [name for name, _ in targets] == ["Overview"]
+
+
+def test_units_mentioning_keeps_a_parent_only_for_its_own_mentions():
+    assert [name for name, _ in full_build._units_mentioning(PRD, "markdown", ["dental"])] == ["Dental Scheduler"]
+    assert full_build._units_mentioning(PRD, "markdown", []) == []
+
+
+def test_seed_adapter_rewrites_only_what_the_idea_change_touches(monkeypatch):
+    chain = RecordingChain()
+    monkeypatch.setattr(full_build, "revise", lambda *args, **kwargs: revision.revise(*args, chain=chain, **kwargs))
+    adapt = full_build._seed_adapter("scheduling for dentists", "scheduling for barbers")
+
+    adapted = adapt("user_stories", PRD)
+    assert len(chain.calls) == 1
+    assert "Lets barbers fill their calendar." in adapted
+    assert "Patients get SMS reminders." in adapted
+
+    unchanged = "## Stories\nAs a user I want reminders."
+    assert adapt("user_stories", unchanged) == unchanged
+    assert len(chain.calls) == 1
@@ -0,0 +1,39 @@
+from utils import routing
+
+
+def _spent(monkeypatch, cost, seconds=0.0):
+    monkeypatch.setattr(routing, "ROUTING", True)
+    monkeypatch.setattr(routing, "RUN_BUDGET_USD", 0.10)
+    monkeypatch.setattr(routing, "run_spend", lambda run_id=None: (cost, seconds))
+
+
+def test_route_uses_declared_tiers_within_budget(monkeypatch):
+    _spent(monkeypatch, 0.01)
+    assert routing.route("slogan_agent", "default") == routing.TIERS["lite"]
+    assert routing.route("prd_agent", "default") == routing.TIERS["standard"]
+    assert routing.route("unknown_agent", "default") == "default"
+
+
+def test_route_starts_unpinned_agents_on_the_cheapest_tier_over_budget(monkeypatch):
+    _spent(monkeypatch, 0.25)
+    assert routing.route("prd_agent", "default") == routing.TIERS["lite"]
+    assert routing.route("backend_agent", "default") == routing.TIERS["standard"]
+
+
+def test_escalation_stops_over_budget(monkeypatch):
+    _spent(monkeypatch, 0.01)
+    assert routing.escalate("slogan_agent", routing.TIERS["lite"]) == routing.TIERS["standard"]
+    assert routing.escalate("slogan_agent", routing.TIERS["strong"]) is None
+    _spent(monkeypatch, 0.25)
+    assert routing.escalate("slogan_agent", routing.TIERS["lite"]) is None
+
+
+def test_route_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(routing, "ROUTING", False)
+    assert routing.route("slogan_agent", "default") == "default"
+
+
+def test_validate_rejects_refusals_and_unparseable_code():
+    assert not routing.validate("slogan_agent", "I'm sorry, I can't help with that.")
+    assert not routing.validate("backend_agent", "```python\ndef broken(:\n```")
+    assert routing.validate("backend_agent", "```python\napp = 1\n```")
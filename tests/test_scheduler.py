@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from workflows.scheduler import Node, critical_path, descendants, format_timings, run_graph
+
+
+def _graph(log, delay=0.02):
+    def step(name):
+        def run(results):
+            log.append(("start", name, sorted(results)))
+            time.sleep(delay)
+            log.append(("end", name))
+            return name.upper()
+        return run
+
+    return [
+        Node("prd", step("prd")),
+        Node("frontend", step("frontend"), deps=("prd",)),
+        Node("backend", step("backend"), deps=("prd",)),
+        Node("tests", step("tests"), deps=("frontend", "backend")),
+    ]
+
+
+def test_run_graph_runs_nodes_after_their_dependencies():
+    log = []
+    results, timings = run_graph(_graph(log), max_workers=4)
+    assert results == {"prd": "PRD", "frontend": "FRONTEND", "backend": "BACKEND", "tests": "TESTS"}
+    starts = {entry[1]: entry[2] for entry in log if entry[0] == "start"}
+    assert starts["frontend"] == ["prd"] and starts["backend"] == ["prd"]
+    assert starts["tests"] == ["backend", "frontend", "prd"]
+    assert timings["tests"][0] >= max(timings["frontend"][1], timings["backend"][1])
+
+
+def test_run_graph_runs_independent_nodes_concurrently_within_the_limit():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def run(results):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    run_graph([Node(f"node{n}", run) for n in range(6)], max_workers=3)
+    assert peak[0] == 3
+
+
+def test_run_graph_reports_results_as_nodes_finish():
+    done = []
+    run_graph(_graph([]), on_done=lambda name, output: done.append(name))
+    assert done[0] == "prd" and done[-1] == "tests"
+
+
+def test_run_graph_raises_the_first_failure():
+    def fail(results):
+        raise RuntimeError("backend failed")
+
+    with pytest.raises(RuntimeError, match="backend failed"):
+        run_graph([Node("prd", lambda r: 1), Node("backend", fail, deps=("prd",)), Node("tests", lambda r: 1, deps=("backend",))])
+
+
+def test_run_graph_detects_cycles_and_unknown_dependencies():
+    with pytest.raises(ValueError, match="cycle"):
+        run_graph([Node("a", lambda r: 1, deps=("b",)), Node("b", lambda r: 1, deps=("a",))])
+    with pytest.raises(ValueError, match="unknown"):
+        run_graph([Node("a", lambda r: 1, deps=("missing",))])
+    with pytest.raises(ValueError, match="Duplicate"):
+        run_graph([Node("a", lambda r: 1), Node("a", lambda r: 1)])
+
+
+def test_critical_path_and_report():
+    nodes = _graph([])
+    timings = {"prd": (0.0, 1.0), "frontend": (1.0, 2.0), "backend": (1.0, 4.0), "tests": (4.0, 5.0)}
+    assert critical_path(nodes, timings) == (["prd", "backend", "tests"], 5.0)
+    report = format_timings(nodes, timings)
+    assert "Critical path: prd → backend → tests (5.0s)" in report
+    assert "sequential would be 6.0s" in report
+
+
+def test_descendants_are_transitive():
+    assert sorted(descendants(_graph([]), "prd")) == ["backend", "frontend", "tests"]
+    assert descendants(_graph([]), "tests") == []
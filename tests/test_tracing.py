@@ -0,0 +1,44 @@
+import os
+
+from utils import tracing
+
+
+def _span(name, start, end):
+    span = tracing.Span(name, "stage", start=start)
+    span.end = end
+    return span
+
+
+def test_critical_path_is_the_longest_chain_of_sequential_spans():
+    prd = _span("prd", 0, 2)
+    short = _span("slogans", 2, 3)
+    code = _span("backend", 2, 6)
+    docs = _span("docs", 6, 7)
+    assert [span.name for span in tracing.critical_path([docs, short, code, prd])] == ["prd", "backend", "docs"]
+    assert tracing.critical_path([]) == []
+
+
+def test_longest_path_follows_predecessors():
+    durations = {"a": 1.0, "b": 5.0, "c": 2.0, "d": 1.0}
+    deps = {"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]}
+    assert tracing.longest_path(durations, durations.get, deps.get) == (["a", "b", "d"], 7.0)
+
+
+def test_prune_keeps_the_most_recent_trace_files(tmp_path):
+    for index in range(5):
+        path = tmp_path / f"run{index}.abc.trace.json"
+        path.write_text("{}")
+        os.utime(path, (index, index))
+    (tmp_path / "notes.txt").write_text("kept")
+    tracing.prune(str(tmp_path), keep=2)
+    assert sorted(os.listdir(tmp_path)) == ["notes.txt", "run3.abc.trace.json", "run4.abc.trace.json"]
+
+
+def test_trace_write_prunes_old_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_KEEP", 3)
+    for index in range(5):
+        trace = tracing.Trace("pipeline")
+        trace.run_id = f"run{index}"
+        path = trace.write(str(tmp_path))
+        os.utime(path, (index, index))
+    assert len(os.listdir(tmp_path)) == 3
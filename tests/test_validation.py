@@ -0,0 +1,28 @@
+import sys
+
+from utils import validation
+
+
+def test_check_python_reports_bad_stdlib_imports_without_importing_them(capsys):
+    sys.modules.pop("this", None)
+    result = validation.check_python("import this\nfrom json import bogus\nfrom os.path import join\nimport xml.nope\n")
+    assert "this" not in sys.modules
+    assert capsys.readouterr().out == ""
+    assert result["errors"] == ["line 2: cannot import bogus from 'json'", "line 4: no module named 'xml.nope'"]
+
+
+def test_check_python_checks_sibling_modules():
+    result = validation.check_python("from main import app, missing\n", {"main": "app = object()\n"})
+    assert result["errors"] == ["line 1: main has no missing"]
+
+
+def _collected(*args):
+    raise AssertionError("generated code was collected")
+
+
+def test_test_code_is_not_collected_unless_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(validation, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(validation, "COLLECT_TESTS", False)
+    monkeypatch.setattr(validation, "_collect_tests", _collected)
+    result = validation.validate_stage("test_code", "from main import app\n\ndef test_app():\n    assert app\n", "app = 1\n")
+    assert result["ok"]
@@ -0,0 +1,161 @@
+# File: utils/artifacts.py
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import tracing
+
+DEFAULT_BUILD_ROOT = "build"
+_READ_ONLY = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _artifact_writer() -> ThreadPoolExecutor:
+    """
+    The one background thread that writes artifacts for every store in this
+    process, so writes to a file land in the order they were queued.
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agentified-artifacts")
+    return _writer
+
+
+def _replace_atomically(path: str, write):
+    """
+    Calls write(tmp_path) and renames the result over path, so readers see
+    either the old file or the complete new one.
+    """
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+class ArtifactStore:
+    """
+    Writes one run's artifacts to <root>/runs/<run_id>/. Content is stored
+    once per SHA-256 under <root>/.objects/ and hard-linked into each run
+    (copied where links are unsupported), so identical artifacts across runs
+    are deduplicated. Blobs are read-only, so a run's file can't be edited in
+    place and change every run sharing it; editors that save by replacing
+    the file, or a copy, are fine. Every file appears atomically (temp file,
+    then rename). Writes are queued to the process-wide artifact writer;
+    flush() waits for this store's writes and rewrites manifest.json
+    (name -> sha256, bytes, updated). <root>/latest points at the most
+    recently flushed run where symlinks are supported.
+    """
+
+    def __init__(self, root: str = DEFAULT_BUILD_ROOT, run_id: str = "latest"):
+        self.root = root
+        self.run_id = run_id
+        self.dir = os.path.join(root, "runs", run_id)
+        self.objects = os.path.join(root, ".objects")
+        os.makedirs(self.dir, exist_ok=True)
+        os.makedirs(self.objects, exist_ok=True)
+        self.deduplicated = 0
+        self._manifest = self._load_manifest()
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def _load_manifest(self) -> dict:
+        path = os.path.join(self.dir, "manifest.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    def write(self, name: str, content, replaces: str = None):
+        """
+        Queues content (str or bytes) to be written as `name` in the run
+        directory. `replaces` is a file (e.g. a streamed .part) to remove
+        once the artifact is in place.
+        """
+        if os.path.basename(name) != name:
+            raise ValueError(f"Artifact names must be plain file names, got '{name}'")
+        data = content.encode("utf-8") if isinstance(content, str) else bytes(content)
+        future = _artifact_writer().submit(self._write, name, data, replaces, tracing.capture())
+        with self._lock:
+            self._pending.append(future)
+
+    def _write(self, name: str, data: bytes, replaces: str, context):
+        started = time.time()
+        try:
+            deduplicated = self._store(name, data)
+            if replaces and os.path.exists(replaces):
+                os.remove(replaces)
+        except Exception as error:
+            tracing.record(name, "artifact", started, context=context, error=repr(error))
+            raise
+        tracing.record(name, "artifact", started, context=context, bytes=len(data), deduplicated=deduplicated)
+
+    def _store(self, name: str, data: bytes):
+        digest = hashlib.sha256(data).hexdigest()
+        blob = os.path.join(self.objects, digest[:2], digest)
+        deduplicated = os.path.exists(blob)
+        if deduplicated:
+            self.deduplicated += 1
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+
+            def write_blob(tmp):
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.chmod(tmp, _READ_ONLY)
+
+            _replace_atomically(blob, write_blob)
+
+        def link(tmp):
+            try:
+                os.link(blob, tmp)
+            except OSError:
+                shutil.copyfile(blob, tmp)
+
+        _replace_atomically(self.path(name), link)
+        self._manifest[name] = {"sha256": digest, "bytes": len(data), "updated": time.time()}
+        return deduplicated
+
+    def flush(self):
+        """
+        Waits for this store's queued writes, then writes the manifest and
+        updates <root>/latest. Raises the first error a background write hit.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        errors = [future.exception() for future in pending]
+        error = next((error for error in errors if error is not None), None)
+        if error is not None:
+            raise error
+
+        def write_manifest(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._manifest, f, indent=2, sort_keys=True)
+
+        _replace_atomically(os.path.join(self.dir, "manifest.json"), write_manifest)
+        try:
+            _replace_atomically(
+                os.path.join(self.root, "latest"),
+                lambda tmp: os.symlink(os.path.join("runs", self.run_id), tmp, target_is_directory=True),
+            )
+        except (OSError, NotImplementedError):
+            pass
+        return self.dir
+
+    def manifest(self) -> dict:
+        return dict(self._manifest)
@@ -0,0 +1,157 @@
+# File: utils/cache.py
+
+import contextvars
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_CACHE_PATH = os.path.join(".agentified", "cache.sqlite")
+
+_cache = None
+_cache_lock = threading.Lock()
+_fresh = contextvars.ContextVar("agentified_cache_fresh", default=False)
+
+
+class ResponseCache:
+    """
+    Local SQLite cache of LLM responses, keyed by a hash of the rendered
+    prompt, model name and temperature. Entries older than max_age seconds
+    are dropped, and the least recently used entries are evicted once the
+    stored content exceeds max_bytes.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = 64 * 1024 * 1024, max_age: float = 7 * 86400):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = Counter()
+        self.misses = Counter()
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                agent TEXT,
+                content TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(model: str, temperature: float, prompt: str) -> str:
+        payload = f"{model}\x00{temperature}\x00{prompt}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str, agent: str = ""):
+        """
+        Returns the cached content for key, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and now - row[1] > self.max_age:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses[agent] += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits[agent] += 1
+            return row[0]
+
+    def put(self, key: str, content: str, agent: str = ""):
+        now = time.time()
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, agent, content, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, agent, content, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.max_age,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed ASC").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters per agent plus the current size of the cache.
+        """
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+@contextmanager
+def fresh_responses(enabled: bool = True):
+    """
+    Skips cache reads for LLM calls made inside the block (when enabled), so
+    regenerating a rejected or discarded output doesn't get the same reply
+    back. The new replies still replace the cached ones.
+    """
+    token = _fresh.set(enabled or _fresh.get())
+    try:
+        yield
+    finally:
+        _fresh.reset(token)
+
+
+def wants_fresh() -> bool:
+    return _fresh.get()
+
+
+def get_cache():
+    """
+    Returns the process-wide response cache, or None when caching is disabled.
+    Enable it with AGENTIFIED_CACHE=1 (default location) or a path to the SQLite file.
+    """
+    global _cache
+    setting = os.getenv("AGENTIFIED_CACHE", "").strip()
+    if not setting or setting.lower() in ("0", "false", "off"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                path = DEFAULT_CACHE_PATH if setting.lower() in ("1", "true", "on") else setting
+                _cache = ResponseCache(
+                    path,
+                    max_bytes=int(float(os.getenv("AGENTIFIED_CACHE_MAX_MB", "64")) * 1024 * 1024),
+                    max_age=float(os.getenv("AGENTIFIED_CACHE_MAX_AGE_DAYS", "7")) * 86400,
+                )
+    return _cache
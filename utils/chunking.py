@@ -0,0 +1,189 @@
+# File: utils/chunking.py
+
+import ast
+import re
+
+DEFAULT_CHUNK_CHARS = 12000
+
+_JSX_UNIT = re.compile(
+    r"^(?:export\s+(?:default\s+)?)?(?:async\s+)?(?:function\s+\w+|class\s+\w+|(?:const|let|var)\s+\w+\s*=)",
+    re.MULTILINE,
+)
+_JSX_IMPORT = re.compile(r"^import\s.*?(?:;|$)\n?", re.MULTILINE)
+_ROUTE_METHODS = {"get", "post", "put", "patch", "delete", "head", "options", "api_route", "websocket"}
+_IMPORT_LINE = re.compile(r"^(?:import\s+\S|from\s+\S+\s+import\s)")
+_TEST_DEF = re.compile(r"^((?:async\s+)?def\s+)(test_\w+)", re.MULTILINE)
+LANGUAGES = ("jsx", "python")
+
+
+def _unit_name(node) -> str:
+    """
+    Names a top-level definition, using the route path for FastAPI handlers.
+    """
+    for decorator in getattr(node, "decorator_list", []):
+        if (
+            isinstance(decorator, ast.Call)
+            and isinstance(decorator.func, ast.Attribute)
+            and decorator.func.attr in _ROUTE_METHODS
+            and decorator.args
+            and isinstance(decorator.args[0], ast.Constant)
+        ):
+            return f"{decorator.func.attr.upper()} {decorator.args[0].value}"
+    return getattr(node, "name", type(node).__name__)
+
+
+def _top_level(tree, code: str):
+    """Yields (node, source) for each top-level statement, decorators included."""
+    lines = code.splitlines(keepends=True)
+    for node in tree.body:
+        start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]) - 1
+        yield node, "".join(lines[start:node.end_lineno])
+
+
+def split_python(code: str):
+    """
+    Splits Python source into (header, units). The header holds imports and
+    module-level setup shared by every unit; each unit is one top-level
+    function or class (with its decorators) as (name, source).
+    Falls back to blank-line separated blocks if the code does not parse.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        blocks = [block for block in re.split(r"\n\s*\n(?=\S)", code) if block.strip()]
+        return "", [(f"block {number}", block) for number, block in enumerate(blocks, start=1)]
+
+    header, units = [], []
+    for node, source in _top_level(tree, code):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            units.append((_unit_name(node), source))
+        else:
+            header.append(source)
+    return "".join(header), units
+
+
+def split_jsx(code: str):
+    """
+    Splits a React/JSX file into (header, units): imports go to the header and
+    each top-level component, function or constant becomes a unit.
+    """
+    header = "".join(match.group(0) for match in _JSX_IMPORT.finditer(code))
+    body = _JSX_IMPORT.sub("", code)
+    starts = [match.start() for match in _JSX_UNIT.finditer(body)]
+    if not starts:
+        return header, [("module", body)] if body.strip() else []
+    units = []
+    if body[:starts[0]].strip():
+        units.append(("module", body[:starts[0]]))
+    for start, end in zip(starts, starts[1:] + [len(body)]):
+        source = body[start:end]
+        name = re.search(r"(?:function|class|const|let|var)\s+(\w+)", source)
+        units.append((name.group(1) if name else "module", source))
+    return header, units
+
+
+def pack(header: str, units, max_chars: int = DEFAULT_CHUNK_CHARS):
+    """
+    Greedily packs units into chunks of at most max_chars (a single oversized
+    unit still gets its own chunk). Every chunk starts with the shared header.
+    Returns a list of (names, code).
+    """
+    chunks, names, parts, size = [], [], [], len(header)
+    for name, source in units:
+        if parts and size + len(source) > max_chars:
+            chunks.append((names, header + "\n".join(parts)))
+            names, parts, size = [], [], len(header)
+        names.append(name)
+        parts.append(source)
+        size += len(source)
+    if parts:
+        chunks.append((names, header + "\n".join(parts)))
+    return chunks
+
+
+def chunk_code(frontend_code: str = "", backend_code: str = "", max_chars: int = DEFAULT_CHUNK_CHARS, languages=LANGUAGES):
+    """
+    Splits the generated frontend and backend into code-aware chunks, keeping
+    only the given languages. Returns a list of dicts with name, language and
+    code, in source order.
+    """
+    chunks = []
+    for language, code, splitter in (("jsx", frontend_code, split_jsx), ("python", backend_code, split_python)):
+        if language not in languages or not code or not code.strip():
+            continue
+        header, units = splitter(code)
+        if not units:
+            chunks.append({"name": language, "language": language, "code": code})
+            continue
+        for names, source in pack(header, units, max_chars):
+            label = names[0] if len(names) == 1 else f"{names[0]} … {names[-1]}"
+            chunks.append({"name": f"{language}: {label}", "language": language, "code": source})
+    return chunks
+
+
+def _rename_clashes(source: str, name: str, seen: dict) -> str:
+    seen[name] = seen.get(name, 0) + 1
+    if seen[name] == 1:
+        return source
+    definition = re.compile(rf"^((?:async\s+)?def\s+|class\s+){re.escape(name)}\b", re.MULTILINE)
+    return definition.sub(rf"\g<1>{name}_{seen[name]}", source, count=1)
+
+
+def merge_tests(parts) -> str:
+    """
+    Merges per-chunk pytest files, given as (chunk_name, code) in chunk order,
+    into one file: imports are hoisted and de-duplicated, module-level setup
+    (e.g. `client = TestClient(app)`), fixtures and helpers are kept only the
+    first time they appear, and tests that clash with an earlier chunk's are
+    renamed with a numeric suffix. Chunks that don't parse are only
+    de-duplicated line by line on their imports.
+    """
+    imports, setup, helpers, bodies, seen_tests = [], set(), set(), [], {}
+
+    def rename(match):
+        return _rename_clashes(match.group(0), match.group(2), seen_tests)
+
+    for chunk_name, code in parts:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            tree = None
+        body = []
+        if tree is None:
+            for line in code.splitlines():
+                single_line = line.count("(") == line.count(")") and not line.rstrip().endswith("\\")
+                if _IMPORT_LINE.match(line) and single_line:
+                    if line not in imports:
+                        imports.append(line)
+                else:
+                    body.append(line)
+            text = _TEST_DEF.sub(rename, "\n".join(body).strip())
+        else:
+            for node, source in _top_level(tree, code):
+                source = source.rstrip()
+                if isinstance(node, (ast.Import, ast.ImportFrom)):
+                    if source not in imports:
+                        imports.append(source)
+                elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    if node.name.startswith(("test", "Test")):
+                        body.append(_rename_clashes(source, node.name, seen_tests))
+                    elif node.name not in helpers:
+                        helpers.add(node.name)
+                        body.append(source)
+                elif source not in setup:
+                    setup.add(source)
+                    body.append(source)
+            text = "\n\n\n".join(body)
+        if text:
+            bodies.append(f"# --- Tests for {chunk_name} ---\n\n{text}")
+    return "\n".join(imports) + "\n\n\n" + "\n\n\n".join(bodies) + "\n"
+
+
+def merge_docs(parts, title: str = "Documentation") -> str:
+    """
+    Merges per-chunk Markdown, given as (chunk_name, markdown) in chunk order,
+    into one document with a table of contents.
+    """
+    toc = [f"- [{name}](#{re.sub(r'[^a-z0-9 -]', '', name.lower()).replace(' ', '-')})" for name, _ in parts]
+    sections = [f"## {name}\n\n{markdown.strip()}" for name, markdown in parts]
+    return f"# {title}\n\n" + "\n".join(toc) + "\n\n" + "\n\n---\n\n".join(sections) + "\n"
@@ -0,0 +1,196 @@
+# File: utils/fake_llm.py
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+CHUNK_TOKENS = 4
+
+# Canned outputs picked by keywords in the prompt, so downstream stages
+# (cleaning, chunking, merging) see realistic shapes.
+DEFAULT_OUTPUTS = [
+    ("pytest", '''```python
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+
+client = TestClient(app)
+
+
+def test_list_items_returns_ok():
+    response = client.get("/items")
+    assert response.status_code == 200
+
+
+def test_create_item_validates_payload():
+    response = client.post("/items", json={})
+    assert response.status_code == 422
+```'''),
+    ("documentation", "## Overview\n\nThis module exposes a small REST API.\n\n### `list_items()`\n\nReturns every stored item.\n"),
+    ("user stories", "\n".join(f"• As a user, I want feature {n}, so that I save time." for n in range(1, 9))),
+    ("FastAPI", '''```python
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+app = FastAPI()
+items = {}
+
+
+class Item(BaseModel):
+    name: str
+    description: str = ""
+
+
+@app.get("/items")
+def list_items():
+    """Return every stored item."""
+    return list(items.values())
+
+
+@app.post("/items")
+def create_item(item: Item):
+    """Store a new item."""
+    items[item.name] = item
+    return item
+
+
+@app.delete("/items/{name}")
+def delete_item(name: str):
+    """Delete an item by name."""
+    if name not in items:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return items.pop(name)
+```'''),
+    ("React", '''```jsx
+import React, { useEffect, useState } from "react";
+
+function ItemList({ items }) {
+  return (
+    <ul className="divide-y divide-gray-200">
+      {items.map((item) => (
+        <li key={item.name} className="py-2">{item.name}</li>
+      ))}
+    </ul>
+  );
+}
+
+export default function App() {
+  const [items, setItems] = useState([]);
+  const [error, setError] = useState(null);
+
+  useEffect(() => {
+    fetch("/items").then((r) => r.json()).then(setItems).catch(setError);
+  }, []);
+
+  if (error) return <p className="text-red-600">Something went wrong.</p>;
+  return <ItemList items={items} />;
+}
+```'''),
+    ("JSON object", json.dumps({
+        "email_copy": "Subject: Ship your idea this week\n\nHi there, ...",
+        "slogans": ["Build faster. Ship smarter.", "From idea to app in an afternoon.", "Your founding team, on demand."],
+        "social_posts": "**LinkedIn:** We just launched ...\n\n**Instagram:** Idea in, app out ...",
+        "visual_concept": "Geometric logo, indigo and coral palette, photography of small teams at work.",
+        "hashtags": ["#BuildInPublic", "#NoCode", "#AI", "#Startups", "#ShipIt"],
+        "post_ideas": ["Before/after timelapse of an app build", "Founder Q&A carousel", "Customer story reel"],
+    })),
+    ("slogan", "Build faster. Ship smarter."),
+]
+
+
+def _sampler(spec: str):
+    """
+    Parses a latency spec: "fixed:S", "uniform:LOW:HIGH" or "lognormal:MEDIAN:SIGMA" (seconds).
+    """
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution '{spec}'")
+
+
+def _load_outputs():
+    path = os.getenv("AGENTIFIED_FAKE_OUTPUTS")
+    if not path:
+        return DEFAULT_OUTPUTS
+    with open(path, encoding="utf-8") as f:
+        return list(json.load(f).items()) + DEFAULT_OUTPUTS
+
+
+class FakeChatModel:
+    """
+    Offline stand-in for ChatGoogleGenerativeAI. Replies after a sampled
+    time to first token and then at a fixed token rate. Randomness is seeded
+    from the prompt, so the same prompt always gets the same latency and text.
+
+    Configured with AGENTIFIED_FAKE_LATENCY, AGENTIFIED_FAKE_TOKENS_PER_SEC,
+    AGENTIFIED_FAKE_OUTPUT_TOKENS, AGENTIFIED_FAKE_OUTPUTS (JSON of
+    prompt keyword -> reply) and AGENTIFIED_FAKE_SEED.
+    """
+
+    def __init__(self, model: str = "fake", temperature: float = 0.0):
+        self.model = model
+        self.temperature = temperature
+        self.latency = _sampler(os.getenv("AGENTIFIED_FAKE_LATENCY", "lognormal:0.8:0.4"))
+        self.tokens_per_sec = float(os.getenv("AGENTIFIED_FAKE_TOKENS_PER_SEC", "150"))
+        self.output_tokens = int(os.getenv("AGENTIFIED_FAKE_OUTPUT_TOKENS", "300"))
+        self.seed = os.getenv("AGENTIFIED_FAKE_SEED", "0")
+        self.outputs = _load_outputs()
+
+    def model_copy(self, update: dict = None):
+        copy = FakeChatModel(self.model, self.temperature)
+        for name, value in (update or {}).items():
+            setattr(copy, name, value)
+        return copy
+
+    def _plan(self, input):
+        text = input.to_string() if hasattr(input, "to_string") else str(input)
+        digest = hashlib.sha256(f"{self.seed}\x00{self.model}\x00{text}".encode("utf-8")).hexdigest()
+        rng = random.Random(int(digest[:16], 16))
+        reply = next((output for keyword, output in self.outputs if keyword.lower() in text.lower()), None)
+        if reply is None:
+            words = [f"word{rng.randrange(1000)}" for _ in range(self.output_tokens)]
+            reply = "\n\n".join(" ".join(words[i:i + 40]) for i in range(0, len(words), 40))
+        pieces = reply.split(" ")
+        chunks = [" ".join(pieces[i:i + CHUNK_TOKENS]) + " " for i in range(0, len(pieces), CHUNK_TOKENS)]
+        chunks[-1] = chunks[-1].rstrip(" ")
+        usage = {
+            "input_tokens": len(text) // 4,
+            "output_tokens": len(pieces),
+            "total_tokens": len(text) // 4 + len(pieces),
+        }
+        return self.latency(rng), chunks, usage
+
+    def invoke(self, input, config=None, **kwargs):
+        first, chunks, usage = self._plan(input)
+        time.sleep(first + len(chunks) * CHUNK_TOKENS / self.tokens_per_sec)
+        return AIMessage(content="".join(chunks), usage_metadata=usage)
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        first, chunks, usage = self._plan(input)
+        await asyncio.sleep(first + len(chunks) * CHUNK_TOKENS / self.tokens_per_sec)
+        return AIMessage(content="".join(chunks), usage_metadata=usage)
+
+    def stream(self, input, config=None, **kwargs):
+        first, chunks, usage = self._plan(input)
+        time.sleep(first)
+        for index, chunk in enumerate(chunks):
+            time.sleep(CHUNK_TOKENS / self.tokens_per_sec)
+            yield AIMessageChunk(content=chunk, usage_metadata=usage if index == len(chunks) - 1 else None)
+
+    async def astream(self, input, config=None, **kwargs):
+        first, chunks, usage = self._plan(input)
+        await asyncio.sleep(first)
+        for index, chunk in enumerate(chunks):
+            await asyncio.sleep(CHUNK_TOKENS / self.tokens_per_sec)
+            yield AIMessageChunk(content=chunk, usage_metadata=usage if index == len(chunks) - 1 else None)
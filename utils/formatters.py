@@ -1,18 +1,202 @@
 # File: utils/formatters.py
 
+import re
 
+_FENCE = re.compile(r"^\s*```([\w.+#-]*)\s*$")
+_CLOSING_FENCE = re.compile(r"```\s*$")
+# Fence tags accepted for each code language (untagged fences are always accepted).
+FENCE_TAGS = {
+    "python": {"python", "py", "python3"},
+    "jsx": {"jsx", "javascript", "js", "tsx", "typescript", "ts", "react"},
+}
+_MARKDOWN_TAGS = {"markdown", "md"}
 
-def clean_output(text: str) -> str:
+
+def _text_of(text) -> str:
+    return text.content if hasattr(text, "content") else text
+
+
+class StreamCleaner:
+    """
+    Cleans LLM output incrementally, one chunk at a time.
+
+    Fence lines (with or without a language tag) are removed, trailing
+    whitespace is stripped, leading and trailing blank lines are dropped and
+    runs of blank lines collapse to one. With code_only, only the lines inside
+    fenced code blocks are kept; if the reply turns out to contain no fences,
+    the whole cleaned text is used instead, so prose before the first fence is
+    buffered until one appears. With a code_language as well, blocks tagged
+    with another language (e.g. ```bash install steps) are dropped too, unless
+    the reply has no other code. With keep_fences (for Markdown artifacts),
+    code blocks keep their fences and only a ```markdown fence wrapping the
+    reply is removed. An untagged fence inside that wrapper either closes it
+    or opens a code block, which the next fence (or the end) tells apart.
+
+    Every cleaned piece is also passed to `sink` (e.g. a file's write method)
+    as soon as it is known, and `language` is the tag of the first fence kept.
+    The cleaned text is kept for `text` unless keep_text is False, in which
+    case pieces only go to the sink. Beyond that, the cleaner holds back the
+    current partial line, prose before the first fence (code_only, for
+    replies without fences), off-language blocks until other code is kept,
+    and the lines after an ambiguous fence in a ```markdown wrapper.
+    """
+
+    def __init__(
+        self, code_only: bool = False, sink=None, code_language: str = None, keep_fences: bool = False,
+        keep_text: bool = True,
+    ):
+        self.code_only = code_only
+        self.sink = sink
+        self.code_language = code_language
+        self.keep_fences = keep_fences and not code_only
+        self.keep_text = keep_text
+        self.language = None
+        self._partial = ""
+        self._blank_lines = 0
+        self._started = False
+        self._in_fence = False
+        self._seen_fence = False
+        self._skipping = False
+        self._wrapped = False
+        self._prose = []
+        self._skipped = []
+        self._held = None
+        self._parts = []
+        self._recent = []
+
+    def _emit(self, line: str):
+        if not line:
+            if self._started:
+                self._blank_lines += 1
+            return
+        piece = ("\n\n" if self._blank_lines else "\n") if self._started else ""
+        piece += line
+        self._started = True
+        self._blank_lines = 0
+        self._skipped = []  # no longer needed as a fallback
+        self._recent.append(piece)
+        if self.keep_text:
+            self._parts.append(piece)
+        if self.sink is not None:
+            self.sink(piece)
+
+    def _accepts(self, tag: str) -> bool:
+        if not tag or not self.code_only or not self.code_language:
+            return True
+        return tag.lower() in FENCE_TAGS.get(self.code_language, {self.code_language})
+
+    def _release_held(self, closed_wrapper: bool):
+        held, self._held = self._held, None
+        if closed_wrapper:
+            self._wrapped = False
+        else:
+            self._in_fence = True
+            self._emit("```")
+        for line in held:
+            self._line(line)
+
+    def _line(self, line: str):
+        fence = _FENCE.match(line)
+        if self._held is not None:
+            if not fence:
+                self._held.append(line)
+                return
+            # Only an untagged fence can close a block the held fence opened.
+            self._release_held(closed_wrapper=bool(fence.group(1)))
+        if fence and self.keep_fences:
+            tag = fence.group(1)
+            if not self._in_fence and tag.lower() in _MARKDOWN_TAGS and not self._wrapped:
+                self._wrapped = True
+            elif not self._in_fence and not tag and self._wrapped:
+                self._held = []
+            else:
+                if not self._in_fence and self.language is None and tag:
+                    self.language = tag
+                self._in_fence = not self._in_fence
+                self._emit(line.strip())
+            return
+        if fence and not self._in_fence and not self._accepts(fence.group(1)):
+            self._in_fence = self._skipping = True
+            self._seen_fence = True
+            self._prose = []
+            return
+        if fence and self._skipping:
+            self._in_fence = self._skipping = False
+            return
+        if self._skipping:
+            if not self._started:
+                self._skipped.append(line.rstrip())
+            return
+        if fence:
+            if not self._in_fence and self.language is None and fence.group(1):
+                self.language = fence.group(1)
+            self._in_fence = not self._in_fence
+            if self.code_only and not self._seen_fence:
+                self._prose = []
+            self._seen_fence = True
+            if self.code_only and not self._in_fence:
+                self._blank_lines = max(self._blank_lines, 1)
+            return
+        line = _CLOSING_FENCE.sub("", line).rstrip()
+        if not self.code_only or self._in_fence:
+            self._emit(line)
+        elif not self._seen_fence:
+            self._prose.append(line)
+
+    def feed(self, chunk) -> str:
+        """
+        Consumes a chunk and returns the cleaned text completed by it.
+        """
+        self._recent = []
+        *lines, self._partial = (self._partial + _text_of(chunk)).split("\n")
+        for line in lines:
+            self._line(line)
+        return "".join(self._recent)
+
+    def close(self) -> str:
+        """
+        Flushes the last partial line and returns the cleaned text it completed.
+        """
+        self._recent = []
+        if self._partial:
+            self._line(self._partial)
+            self._partial = ""
+        if self._held is not None:
+            self._release_held(closed_wrapper=True)
+        if self.code_only and not self._seen_fence:
+            for line in self._prose:
+                self._emit(line)
+            self._prose = []
+        if not self._started:
+            for line in self._skipped:
+                self._emit(line)
+        self._skipped = []
+        return "".join(self._recent)
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+
+def clean_output(text: str, keep_fences: bool = False) -> str:
     """
     Cleans raw LLM output by removing markdown formatting, code fences,
-    excess whitespace, and trailing line breaks.
+    excess whitespace, and trailing line breaks. Markdown artifacts pass
+    keep_fences to keep their code blocks intact.
+    """
+    cleaner = StreamCleaner(keep_fences=keep_fences)
+    cleaner.feed(text)
+    cleaner.close()
+    return cleaner.text
+
+
+def extract_code(text: str, language: str = None) -> str:
+    """
+    Returns only the fenced code blocks of an LLM reply, or the cleaned
+    reply if it has none. With a language ("python", "jsx"), blocks tagged
+    with another language are left out.
     """
-    import re
-    if hasattr(text, "content"):
-        text = text.content  
-    text = text.strip()
-    text = re.sub(r"^```(?:\\w+)?", "", text, flags=re.MULTILINE)
-    text = re.sub(r"```$", "", text, flags=re.MULTILINE)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    text = re.sub(r"\s+$", "", text, flags=re.MULTILINE)
-    return text.strip()
+    cleaner = StreamCleaner(code_only=True, code_language=language)
+    cleaner.feed(text)
+    cleaner.close()
+    return cleaner.text
@@ -0,0 +1,157 @@
+# File: utils/hedging.py
+
+import asyncio
+import math
+import os
+import threading
+
+from utils.logger import metrics
+
+
+def _parse_deadlines(value: str) -> dict:
+    """Parses "prd_agent=60,frontend_agent=120" into {agent: seconds}."""
+    deadlines = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        agent, _, seconds = item.partition("=")
+        deadlines[agent.strip()] = float(seconds)
+    return deadlines
+
+
+# Seconds an agent call may take before it fails with TimeoutError; 0 = no deadline.
+DEFAULT_DEADLINE = float(os.getenv("AGENTIFIED_DEADLINE", "0"))
+DEADLINES = _parse_deadlines(os.getenv("AGENTIFIED_DEADLINES", ""))
+
+HEDGE = os.getenv("AGENTIFIED_HEDGE", "off").lower() in ("1", "on", "true")
+# At most this share of calls may send a duplicate request.
+HEDGE_BUDGET = float(os.getenv("AGENTIFIED_HEDGE_BUDGET", "0.05"))
+HEDGE_PERCENTILE = 0.95
+# Until an agent has this many successful calls, hedge after HEDGE_AFTER seconds (0 = don't).
+MIN_SAMPLES = 10
+HEDGE_AFTER = float(os.getenv("AGENTIFIED_HEDGE_AFTER", "30"))
+
+
+def deadline_for(agent: str):
+    return DEADLINES.get(agent, DEFAULT_DEADLINE) or None
+
+
+def enabled(agent: str) -> bool:
+    return HEDGE or deadline_for(agent) is not None
+
+
+def hedge_delay(agent: str):
+    """
+    Seconds to wait before hedging a call to agent: the p95 latency of its
+    recent successful, uncached calls, or HEDGE_AFTER with too few samples.
+    """
+    latencies = sorted(
+        call["latency"] for call in metrics.recent(agent)
+        if not call["cache_hit"] and not call["error"]
+    )
+    if len(latencies) < MIN_SAMPLES:
+        return HEDGE_AFTER or None
+    return latencies[min(len(latencies) - 1, math.ceil(HEDGE_PERCENTILE * len(latencies)) - 1)]
+
+
+class HedgeBudget:
+    """
+    Allows a duplicate request only while hedges stay within `ratio` of all
+    calls, so tail-latency insurance can't double the spend.
+    """
+
+    def __init__(self, ratio: float):
+        self.ratio = ratio
+        self.calls = 0
+        self.hedges = 0
+        self._lock = threading.Lock()
+
+    def count(self):
+        with self._lock:
+            self.calls += 1
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.ratio * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+
+budget = HedgeBudget(HEDGE_BUDGET)
+
+
+async def stream(agent: str, make_stream):
+    """
+    Yields the chunks of the async iterator make_stream() returns. The
+    agent's deadline covers both the wait for the first chunk and the whole
+    stream; once it passes, the stream is cancelled and TimeoutError raised.
+    Streams are never hedged: a duplicate can't take over a reply that is
+    already being shown.
+    """
+    deadline = deadline_for(agent)
+    iterator = make_stream()
+    if deadline is None:
+        async for chunk in iterator:
+            yield chunk
+        return
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    first = True
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(iterator.__anext__(), max(0.0, started + deadline - loop.time()))
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                if first:
+                    raise TimeoutError(f"{agent} did not start responding within {deadline:g}s") from None
+                raise TimeoutError(f"{agent} did not finish responding within {deadline:g}s") from None
+            first = False
+            yield chunk
+    finally:
+        await iterator.aclose()
+
+
+async def call(agent: str, make_call, stats: dict = None):
+    """
+    Awaits make_call(). With hedging on, a call still running after the
+    agent's hedge_delay starts a second copy (if the budget allows); the first
+    copy to succeed wins and the other is cancelled. Raises TimeoutError once
+    the agent's deadline passes. stats["hedged"] is set when a copy was sent.
+    """
+    deadline = deadline_for(agent)
+    if not HEDGE and deadline is None:
+        return await make_call()
+    budget.count()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    delay = hedge_delay(agent) if HEDGE else None
+    tasks = {asyncio.ensure_future(make_call())}
+    try:
+        while True:
+            now = loop.time()
+            waits = []
+            if deadline is not None:
+                waits.append(started + deadline - now)
+            if delay is not None:
+                waits.append(started + delay - now)
+            timeout = max(0.0, min(waits)) if waits else None
+            done, tasks = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            error = None
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not tasks:
+                raise error
+            if deadline is not None and loop.time() - started >= deadline:
+                raise TimeoutError(f"{agent} did not respond within {deadline:g}s")
+            if delay is not None and loop.time() - started >= delay:
+                delay = None
+                if budget.take():
+                    if stats is not None:
+                        stats["hedged"] = True
+                    tasks.add(asyncio.ensure_future(make_call()))
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -1,11 +1,58 @@
 # File: utils/hitl.py
 
-def human_approval_step(title: str, content: str) -> bool:
+def human_approval_step(title: str, content: str, show: bool = True):
     """
     Displays the LLM-generated output to a human and asks for approval via terminal.
-    Returns True if approved, False if rejected.
+    Pass show=False when the content has already been streamed to the terminal.
+    Returns True if approved, False if rejected, or the reviewer's feedback
+    (e.g. "fix the Success Metrics section") to have only that part revised.
     """
     print(f"\n--- {title} ---\n")
-    print(content)
-    decision = input("\n✅ Approve this output? (y/n): ").strip().lower()
-    return decision == "y"
+    if show:
+        print(content)
+    decision = input("\n✅ Approve this output? (y/n, or describe what to change): ").strip()
+    if decision.lower() in ("y", "yes"):
+        return True
+    if decision.lower() in ("", "n", "no"):
+        return False
+    return decision
+
+
+def feedback_of(decision):
+    """
+    Returns the revision feedback carried by an approval decision, or None
+    for a plain approve/reject.
+    """
+    if isinstance(decision, str) and decision.strip():
+        return decision.strip()
+    return None
+
+
+def auto_approve(title: str, content: str, show: bool = False) -> bool:
+    """
+    Non-interactive approval that accepts every output. Used for batch runs.
+    """
+    return True
+
+
+# Marks approval steps no human is behind; the pipeline never reuses earlier runs for them.
+auto_approve.automatic = True
+
+
+REFUSAL_MARKERS = ("i cannot", "i can't", "i'm sorry", "as an ai")
+
+
+def policy_approval(min_chars: int = 80):
+    """
+    Returns a non-interactive approval step that rejects empty or very short
+    outputs and outputs that open with a refusal.
+    """
+    def approve(title: str, content: str, show: bool = False) -> bool:
+        text = (content or "").strip()
+        if len(text) < min_chars:
+            return False
+        opening = text[:200].lower()
+        return not any(marker in opening for marker in REFUSAL_MARKERS)
+
+    approve.automatic = True
+    return approve
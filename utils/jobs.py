@@ -0,0 +1,108 @@
+# File: utils/jobs.py
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    """
+    A unit of background work. The worker reports partial output per stage
+    with update(), and readers poll status, progress and result.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.status = QUEUED
+        self.progress = {}
+        self.first_token = {}
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+
+    def update(self, stage: str, text: str):
+        with self._lock:
+            self.progress[stage] = text
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.progress)
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def _run(self, fn, args, kwargs):
+        self.status = RUNNING
+        self.started = time.time()
+        try:
+            self.result = fn(self, *args, **kwargs)
+            self.status = DONE
+        except Exception as error:
+            self.error = f"{type(error).__name__}: {error}"
+            self.status = FAILED
+        finally:
+            self.finished = time.time()
+
+
+class JobManager:
+    """
+    Runs jobs on a shared thread pool and memoizes them by key: submitting a
+    key that is queued, running or done returns the existing job instead of
+    starting new work, while failed jobs are retried. At most `max_finished`
+    finished jobs are kept, least recently used first out.
+    """
+
+    def __init__(self, max_workers: int = 4, max_finished: int = 64):
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agentified-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def submit(self, key, fn, *args, **kwargs) -> Job:
+        """
+        Starts fn(job, *args, **kwargs) in the background unless a job for key
+        already exists. The caller's context variables are carried over.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                self._jobs.move_to_end(key)
+                return job
+            job = Job(key)
+            self._jobs[key] = job
+            self._evict()
+        context = contextvars.copy_context()
+        self._pool.submit(context.run, job._run, fn, args, kwargs)
+        return job
+
+    def forget(self, key):
+        """Drops a finished job, so the next submit for key starts new work."""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not job.active:
+                del self._jobs[key]
+
+    def _evict(self):
+        finished = [key for key, job in self._jobs.items() if not job.active]
+        for key in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {status: sum(job.status == status for job in jobs) for status in (QUEUED, RUNNING, DONE, FAILED)}
@@ -0,0 +1,284 @@
+# File: utils/llm.py
+
+import asyncio
+import os
+import threading
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import Runnable
+
+from utils import hedging, tracing
+from utils.cache import ResponseCache, get_cache, wants_fresh
+from utils.logger import get_logger, metrics
+from utils.ratelimit import alimited_call, alimited_stream, limited_call, limited_stream
+from utils.routing import ROUTING, escalate, route, validate
+from utils.runner import iterate_async, run_async
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+_clients = {}
+_lock = threading.Lock()
+_env_loaded = False
+
+
+def _load_env():
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def get_llm(model: str = DEFAULT_MODEL, temperature: float = 0.4):
+    """
+    Returns the shared chat client for (model, temperature), building it on first use.
+    Clients for the same model share one underlying Gemini transport and only differ
+    in their generation settings. AGENTIFIED_LLM=fake swaps in the offline
+    FakeChatModel from utils.fake_llm.
+    """
+    key = (model, temperature)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            sibling = next((c for (m, _), c in _clients.items() if m == model), None)
+            if os.getenv("AGENTIFIED_LLM", "gemini").lower() == "fake":
+                from utils.fake_llm import FakeChatModel
+                client = FakeChatModel(model=model, temperature=temperature)
+            elif sibling is not None:
+                # model_copy skips validation, so the copy keeps the sibling's connection.
+                client = sibling.model_copy(update={"temperature": temperature})
+            else:
+                _load_env()
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                client = ChatGoogleGenerativeAI(
+                    model=model,
+                    temperature=temperature,
+                    google_api_key=os.getenv("GOOGLE_API_KEY"),
+                    # Throttling is retried by utils.ratelimit, which needs to see the 429s.
+                    max_retries=1,
+                )
+            _clients[key] = client
+    return client
+
+
+def _add_usage(total: dict, chunk):
+    for name, value in (getattr(chunk, "usage_metadata", None) or {}).items():
+        if isinstance(value, int):
+            total[name] = total.get(name, 0) + value
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def prompt_text(input) -> str:
+    """
+    Renders whatever the prompt step produced (PromptValue, messages or str) as plain text.
+    """
+    if hasattr(input, "to_string"):
+        return input.to_string()
+    if isinstance(input, (list, tuple)):
+        return "\n".join(f"{getattr(m, 'type', '')}: {getattr(m, 'content', m)}" for m in input)
+    return str(input)
+
+
+class AgentLLM(Runnable):
+    """
+    Lazy stand-in for a chat model in `prompt | gemini` chains. The shared
+    client is only looked up when the chain actually runs. Responses go
+    through the local response cache when it is enabled, unless the agent
+    opts out with cache=False, or inside utils.cache.fresh_responses(). Calls that reach Gemini go through the shared
+    rate limiter, and every call is recorded in utils.logger.metrics.
+
+    Unless a model is pinned, it is picked per call by utils.routing. With
+    routing enabled, invoke/ainvoke replies that fail validation are retried
+    once per stronger tier while the run is within budget. Streamed replies
+    have been shown by the time they can be checked, so they keep the routed
+    model and a failed check is only logged; escalation needs
+    AGENTIFIED_STREAM=0.
+
+    Agents with a deadline or with hedging on (see utils.hedging) are called
+    through the async client, also from invoke(), so a late request can be
+    raced against a duplicate and the loser cancelled. Streams of agents
+    with a deadline likewise go through astream(), where the deadline bounds
+    the first chunk and the whole stream; streams are not hedged.
+    """
+
+    def __init__(self, agent: str, temperature: float = 0.4, model: str = None, cache: bool = True):
+        self.agent = agent
+        self.temperature = temperature
+        self.model = model
+        self.cache = cache
+
+    def __repr__(self):
+        return f"AgentLLM(agent={self.agent!r}, model={self._model()!r}, temperature={self.temperature})"
+
+    def _model(self) -> str:
+        return self.model or route(self.agent, DEFAULT_MODEL)
+
+    def _escalation(self, model, result):
+        if self.model is not None or not ROUTING or validate(self.agent, result.content):
+            return None
+        return escalate(self.agent, model)
+
+    def _check_streamed(self, model, reply: str):
+        if self.model is None and ROUTING and not validate(self.agent, reply):
+            get_logger("agentified.routing").warning(
+                "streamed_reply_failed_validation", extra={"fields": {"agent": self.agent, "model": model}},
+            )
+
+    def _cache_lookup(self, model, text):
+        cache = get_cache() if self.cache else None
+        if cache is None:
+            return None, None, None
+        key = ResponseCache.key(model, self.temperature, text)
+        if wants_fresh():
+            return cache, key, None
+        return cache, key, cache.get(key, self.agent)
+
+    def _record(self, model, text, started, result=None, usage=None, ttft=None, stats=None, cache_hit=False, error=None):
+        usage = usage or getattr(result, "usage_metadata", None) or {}
+        latency = time.perf_counter() - started
+        tracing.record(
+            self.agent, "llm", time.time() - latency, model=model, cache_hit=cache_hit,
+            hedged=(stats or {}).get("hedged", False), error=repr(error) if error else None,
+        )
+        metrics.record(
+            agent=self.agent,
+            model=model,
+            latency=latency,
+            ttft=ttft,
+            input_tokens=usage.get("input_tokens", 0 if cache_hit else len(text) // 4),
+            output_tokens=usage.get("output_tokens", 0),
+            retries=(stats or {}).get("retries", 0),
+            hedged=(stats or {}).get("hedged", False),
+            cache_hit=cache_hit,
+            error=repr(error) if error else None,
+        )
+
+    def invoke(self, input, config=None, **kwargs):
+        if hedging.enabled(self.agent) and not _in_event_loop():
+            return run_async(self.ainvoke(input, config, **kwargs))
+        model = self._model()
+        while True:
+            result = self._invoke(model, input, config, **kwargs)
+            model = self._escalation(model, result)
+            if model is None:
+                return result
+
+    def _invoke(self, model, input, config=None, **kwargs):
+        started = time.perf_counter()
+        text = prompt_text(input)
+        cache, key, hit = self._cache_lookup(model, text)
+        if hit is not None:
+            self._record(model, text, started, cache_hit=True)
+            return AIMessage(content=hit)
+        stats = {}
+        client = get_llm(model, self.temperature)
+        try:
+            result = limited_call(self.agent, text, lambda: client.invoke(input, config, **kwargs), stats)
+        except Exception as error:
+            self._record(model, text, started, stats=stats, error=error)
+            raise
+        self._record(model, text, started, result, stats=stats)
+        if cache is not None:
+            cache.put(key, result.content, self.agent)
+        return result
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        model = self._model()
+        while True:
+            result = await self._ainvoke(model, input, config, **kwargs)
+            model = self._escalation(model, result)
+            if model is None:
+                return result
+
+    async def _ainvoke(self, model, input, config=None, **kwargs):
+        started = time.perf_counter()
+        text = prompt_text(input)
+        cache, key, hit = self._cache_lookup(model, text)
+        if hit is not None:
+            self._record(model, text, started, cache_hit=True)
+            return AIMessage(content=hit)
+        stats = {}
+        client = get_llm(model, self.temperature)
+        try:
+            result = await hedging.call(
+                self.agent,
+                lambda: alimited_call(self.agent, text, lambda: client.ainvoke(input, config, **kwargs), stats),
+                stats,
+            )
+        except Exception as error:
+            self._record(model, text, started, stats=stats, error=error)
+            raise
+        self._record(model, text, started, result, stats=stats)
+        if cache is not None:
+            cache.put(key, result.content, self.agent)
+        return result
+
+    def stream(self, input, config=None, **kwargs):
+        if hedging.deadline_for(self.agent) is not None and not _in_event_loop():
+            yield from iterate_async(self.astream(input, config, **kwargs))
+            return
+        started = time.perf_counter()
+        text = prompt_text(input)
+        model = self._model()
+        cache, key, hit = self._cache_lookup(model, text)
+        if hit is not None:
+            self._record(model, text, started, ttft=time.perf_counter() - started, cache_hit=True)
+            yield AIMessageChunk(content=hit)
+            return
+        stats, parts, usage, ttft = {}, [], {}, None
+        client = get_llm(model, self.temperature)
+        try:
+            for chunk in limited_stream(self.agent, text, lambda: client.stream(input, config, **kwargs), stats):
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                _add_usage(usage, chunk)
+                parts.append(chunk.content)
+                yield chunk
+        except Exception as error:
+            self._record(model, text, started, usage=usage, ttft=ttft, stats=stats, error=error)
+            raise
+        self._record(model, text, started, usage=usage, ttft=ttft, stats=stats)
+        self._check_streamed(model, "".join(parts))
+        if cache is not None:
+            cache.put(key, "".join(parts), self.agent)
+
+    async def astream(self, input, config=None, **kwargs):
+        started = time.perf_counter()
+        text = prompt_text(input)
+        model = self._model()
+        cache, key, hit = self._cache_lookup(model, text)
+        if hit is not None:
+            self._record(model, text, started, ttft=time.perf_counter() - started, cache_hit=True)
+            yield AIMessageChunk(content=hit)
+            return
+        stats, parts, usage, ttft = {}, [], {}, None
+        client = get_llm(model, self.temperature)
+        try:
+            chunks = hedging.stream(
+                self.agent, lambda: alimited_stream(self.agent, text, lambda: client.astream(input, config, **kwargs), stats),
+            )
+            async for chunk in chunks:
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                _add_usage(usage, chunk)
+                parts.append(chunk.content)
+                yield chunk
+        except Exception as error:
+            self._record(model, text, started, usage=usage, ttft=ttft, stats=stats, error=error)
+            raise
+        self._record(model, text, started, usage=usage, ttft=ttft, stats=stats)
+        self._check_streamed(model, "".join(parts))
+        if cache is not None:
+            cache.put(key, "".join(parts), self.agent)
@@ -0,0 +1,273 @@
+# File: utils/logger.py
+
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from contextlib import contextmanager
+
+from utils import tracing
+
+METRICS_LOG = os.getenv("AGENTIFIED_METRICS_LOG", os.path.join(".agentified", "metrics.jsonl"))
+# Recent calls kept per agent (for hedging percentiles) and runs kept for per-run summaries.
+METRICS_WINDOW = int(os.getenv("AGENTIFIED_METRICS_WINDOW", "200"))
+METRICS_RUNS = int(os.getenv("AGENTIFIED_METRICS_RUNS", "256"))
+
+# USD per million tokens (input, output), used for the cost estimate in summaries.
+MODEL_PRICES = {
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-pro": (1.25, 10.00),
+}
+
+current_run = contextvars.ContextVar("agentified_run", default=None)
+current_stage = contextvars.ContextVar("agentified_stage", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, merging in any `fields` dict
+    passed through `extra`.
+    """
+
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        return json.dumps(payload, default=str)
+
+
+def get_logger(name: str = "agentified") -> logging.Logger:
+    """
+    Returns a logger that writes structured JSON lines to AGENTIFIED_METRICS_LOG.
+    """
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        if os.path.dirname(METRICS_LOG):
+            os.makedirs(os.path.dirname(METRICS_LOG), exist_ok=True)
+        handler = logging.FileHandler(METRICS_LOG, encoding="utf-8")
+        handler.setFormatter(JsonFormatter())
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+@contextmanager
+def run_scope(run_id: str):
+    """
+    Attributes every LLM call made inside the block (including from worker
+    threads started with a copied context) to run_id.
+    """
+    tracing.name_trace(run_id)
+    token = current_run.set(run_id)
+    try:
+        yield run_id
+    finally:
+        current_run.reset(token)
+
+
+@contextmanager
+def stage_scope(stage: str):
+    token = current_stage.set(stage)
+    try:
+        with tracing.span(stage, "stage"):
+            yield stage
+    finally:
+        current_stage.reset(token)
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICES.get(model, MODEL_PRICES["gemini-2.5-flash"])
+    return (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+
+def _row():
+    return {
+        "calls": 0, "latency": 0.0, "ttft": None, "input_tokens": 0, "output_tokens": 0,
+        "retries": 0, "cache_hits": 0, "hedges": 0, "errors": 0, "cost": 0.0,
+    }
+
+
+def _add_call(row: dict, call: dict):
+    row["calls"] += 1
+    row["latency"] += call["latency"]
+    if call["ttft"] is not None:
+        row["ttft"] = call["ttft"] if row["ttft"] is None else min(row["ttft"], call["ttft"])
+    row["input_tokens"] += call["input_tokens"]
+    row["output_tokens"] += call["output_tokens"]
+    row["retries"] += call["retries"]
+    row["cache_hits"] += int(call["cache_hit"])
+    row["hedges"] += int(call["hedged"])
+    row["errors"] += int(bool(call["error"]))
+    if not call["cache_hit"]:
+        row["cost"] += estimate_cost(call["model"], call["input_tokens"], call["output_tokens"])
+
+
+def _merge(row: dict, other: dict):
+    for key, value in other.items():
+        if key == "ttft":
+            if value is not None:
+                row["ttft"] = value if row["ttft"] is None else min(row["ttft"], value)
+        else:
+            row[key] += value
+
+
+class Metrics:
+    """
+    In-process record of agent LLM calls: latency, time to first token,
+    token counts, retries and cache hits, tagged with the current run and stage.
+    Memory stays bounded however long the process runs: calls are folded into
+    counters per (agent, stage, model) and per run (the last METRICS_RUNS
+    runs), and only the last METRICS_WINDOW calls of each agent are kept.
+    Every call is also logged to AGENTIFIED_METRICS_LOG.
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW, max_runs: int = METRICS_RUNS):
+        self._totals = defaultdict(_row)  # (agent, stage, model) -> row
+        self._runs = OrderedDict()  # run_id -> {"stages": {stage: row}, "started": ts}, oldest first
+        self._recent = defaultdict(lambda: deque(maxlen=window))  # agent -> recent calls
+        self._max_runs = max_runs
+        self._lock = threading.Lock()
+
+    def record(self, agent: str, model: str, latency: float, ttft: float = None, input_tokens: int = 0,
+               output_tokens: int = 0, retries: int = 0, cache_hit: bool = False, error: str = None,
+               hedged: bool = False):
+        call = {
+            "run": current_run.get(),
+            "stage": current_stage.get() or agent,
+            "agent": agent,
+            "model": model,
+            "latency": latency,
+            "ttft": ttft,
+            "input_tokens": input_tokens or 0,
+            "output_tokens": output_tokens or 0,
+            "retries": retries,
+            "cache_hit": cache_hit,
+            "hedged": hedged,
+            "error": error,
+            "ts": time.time(),
+        }
+        with self._lock:
+            _add_call(self._totals[(agent, call["stage"], model)], call)
+            self._recent[agent].append(call)
+            if call["run"] is not None:
+                run = self._runs.get(call["run"])
+                if run is None:
+                    run = self._runs[call["run"]] = {"stages": defaultdict(_row), "started": call["ts"] - latency}
+                    while len(self._runs) > self._max_runs:
+                        self._runs.popitem(last=False)
+                self._runs.move_to_end(call["run"])
+                run["started"] = min(run["started"], call["ts"] - latency)
+                _add_call(run["stages"][call["stage"]], call)
+        get_logger("agentified.metrics").info("llm_call", extra={"fields": call})
+        return call
+
+    def recent(self, agent: str):
+        """The last METRICS_WINDOW calls of agent, oldest first."""
+        with self._lock:
+            return list(self._recent.get(agent, ()))
+
+    def spend(self, run_id: str):
+        """Returns (cost in USD, start time of its first call) for run_id, or None if it made no calls."""
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            return sum(row["cost"] for row in run["stages"].values()), run["started"]
+
+    def summary(self, run_id: str = None):
+        """
+        Aggregates calls per stage, for run_id or for the whole process.
+        Returns a list of dicts sorted by total latency.
+        """
+        rows = defaultdict(_row)
+        with self._lock:
+            if run_id is None:
+                grouped = [(stage, row) for (_, stage, _), row in self._totals.items()]
+            else:
+                grouped = list(self._runs.get(run_id, {"stages": {}})["stages"].items())
+            for stage, row in grouped:
+                _merge(rows[stage], row)
+        return sorted(
+            ({"stage": stage, **row} for stage, row in rows.items()),
+            key=lambda row: row["latency"],
+            reverse=True,
+        )
+
+    def summary_table(self, run_id: str = None) -> str:
+        rows = self.summary(run_id)
+        if not rows:
+            return "No LLM calls recorded."
+        header = f"{'Stage':<20} {'Calls':>5} {'Latency':>9} {'TTFT':>7} {'In tok':>8} {'Out tok':>8} {'Retry':>5} {'Cache':>5} {'Cost $':>8}"
+        lines = [header, "-" * len(header)]
+        for row in rows:
+            ttft = f"{row['ttft']:.1f}s" if row["ttft"] is not None else "-"
+            lines.append(
+                f"{row['stage']:<20} {row['calls']:>5} {row['latency']:>8.1f}s {ttft:>7} {row['input_tokens']:>8} "
+                f"{row['output_tokens']:>8} {row['retries']:>5} {row['cache_hits']:>5} {row['cost']:>8.4f}"
+            )
+        totals = {key: sum(row[key] for row in rows) for key in ("calls", "latency", "input_tokens", "output_tokens", "retries", "cache_hits", "cost")}
+        lines.append("-" * len(header))
+        lines.append(
+            f"{'Total':<20} {totals['calls']:>5} {totals['latency']:>8.1f}s {'':>7} {totals['input_tokens']:>8} "
+            f"{totals['output_tokens']:>8} {totals['retries']:>5} {totals['cache_hits']:>5} {totals['cost']:>8.4f}"
+        )
+        return "\n".join(lines)
+
+    def prometheus(self) -> str:
+        """
+        Renders the process's counters in the Prometheus text exposition format.
+        """
+        counters = {}
+        with self._lock:
+            totals = [(key, dict(row)) for key, row in self._totals.items()]
+        for (agent, stage, model), row in totals:
+            labels = f'agent="{agent}",stage="{stage}",model="{model}"'
+            counters[("agentified_llm_calls_total", labels)] = row["calls"]
+            counters[("agentified_llm_latency_seconds_sum", labels)] = row["latency"]
+            counters[("agentified_llm_latency_seconds_count", labels)] = row["calls"]
+            counters[("agentified_llm_input_tokens_total", labels)] = row["input_tokens"]
+            counters[("agentified_llm_output_tokens_total", labels)] = row["output_tokens"]
+            counters[("agentified_llm_retries_total", labels)] = row["retries"]
+            counters[("agentified_llm_cache_hits_total", labels)] = row["cache_hits"]
+            counters[("agentified_llm_hedges_total", labels)] = row["hedges"]
+            counters[("agentified_llm_errors_total", labels)] = row["errors"]
+
+        help_text = {
+            "agentified_llm_calls_total": ("counter", "LLM calls made by agents"),
+            "agentified_llm_latency_seconds": ("summary", "Wall-clock latency of LLM calls"),
+            "agentified_llm_input_tokens_total": ("counter", "Prompt tokens sent"),
+            "agentified_llm_output_tokens_total": ("counter", "Completion tokens received"),
+            "agentified_llm_retries_total": ("counter", "Retries after throttling"),
+            "agentified_llm_cache_hits_total": ("counter", "Calls answered from the response cache"),
+            "agentified_llm_hedges_total": ("counter", "Calls that sent a duplicate request after their p95 latency"),
+            "agentified_llm_errors_total": ("counter", "Calls that raised"),
+        }
+        lines = []
+        for metric, (kind, description) in help_text.items():
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for (name, labels), value in sorted(counters.items()):
+                if name == metric or name.startswith(metric + "_"):
+                    lines.append(f"{name}{{{labels}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str = os.path.join(".agentified", "metrics.prom")):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+        return path
+
+
+metrics = Metrics()
@@ -0,0 +1,350 @@
+# File: utils/ratelimit.py
+
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import re
+import threading
+import time
+
+from utils import tracing
+
+# Lower numbers are served first when calls are queued behind the limiter.
+AGENT_PRIORITY = {
+    "prd_agent": 0,
+    "userstories_agent": 1,
+    "frontend_agent": 1,
+    "backend_agent": 1,
+    "revision_agent": 1,
+    "testing_agent": 2,
+    "frontend_subagents": 2,
+    "docs_agent": 3,
+    "business_dev_agent": 4,
+    "sales_agent": 4,
+    "marketing_agent": 5,
+    "marketing_bundle": 5,
+    "marketing_strategy_agent": 5,
+    "email_agent": 5,
+    "visual_agent": 6,
+    "slogan_agent": 6,
+    "socialmedia_agent": 7,
+}
+DEFAULT_PRIORITY = 5
+
+# Rough output allowance added to the prompt size when reserving tokens.
+EXPECTED_OUTPUT_TOKENS = 1024
+MAX_RETRIES = int(os.getenv("AGENTIFIED_MAX_RETRIES", "5"))
+_POLL_SECONDS = 0.02
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+# Throttling as worded in error messages, for clients that only put the status there:
+# a leading "429", "code: 429"/"status=429", RESOURCE_EXHAUSTED or rate-limit wording.
+_THROTTLED_MESSAGE = re.compile(
+    r"^\W*429\b|\b(?:code|status(?:_code)?)\W{0,3}429\b|RESOURCE_EXHAUSTED|\brate[ _-]?limit|\btoo many requests\b"
+    r"|\bexceeded your current quota\b",
+    re.IGNORECASE,
+)
+
+
+def is_throttled(error: Exception) -> bool:
+    """
+    True for quota (429) and overload (503) errors from the Gemini client,
+    whichever transport raised them, judged by status code, exception type,
+    then message wording (a bare "429" elsewhere in a message doesn't count),
+    and finally by the exception that caused it.
+    """
+    code = getattr(error, "code", None)
+    if callable(code):
+        code = code()
+    code = getattr(code, "name", code)
+    if code in (429, 503, "RESOURCE_EXHAUSTED", "UNAVAILABLE"):
+        return True
+    if getattr(error, "status_code", None) in (429, 503):
+        return True
+    if type(error).__name__ in ("ResourceExhausted", "ServiceUnavailable", "TooManyRequests"):
+        return True
+    if _THROTTLED_MESSAGE.search(str(error)):
+        return True
+    cause = error.__cause__ or error.__context__
+    return cause is not None and cause is not error and is_throttled(cause)
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """
+    Exponential backoff with jitter, so throttled callers don't retry in lockstep.
+    """
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def _count_retry(stats):
+    if stats is not None:
+        stats["retries"] = stats.get("retries", 0) + 1
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + EXPECTED_OUTPUT_TOKENS
+
+
+def used_tokens(result):
+    usage = getattr(result, "usage_metadata", None) or {}
+    return usage.get("total_tokens")
+
+
+class RateLimiter:
+    """
+    Process-wide token buckets for requests per minute and tokens per minute,
+    plus an adaptive concurrency limit: halved on every 429/503 and grown back
+    by one slot per `limit` successful calls. Queued calls are granted in
+    priority order (see AGENT_PRIORITY), then first come first served.
+    """
+
+    def __init__(self, rpm: int, tpm: int, max_concurrency: int = 8, min_concurrency: int = 1):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.throttled = 0
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+        self._updated = now
+
+    def _enqueue(self, agent: str):
+        ticket = (AGENT_PRIORITY.get(agent, DEFAULT_PRIORITY), next(self._seq))
+        with self._lock:
+            heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _dequeue(self, ticket):
+        with self._lock:
+            if ticket in self._waiters:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+
+    def _try_acquire(self, ticket, tokens: int):
+        """
+        Returns (acquired, seconds_to_wait_before_retrying).
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._waiters[0] != ticket or self.in_flight >= int(self.limit):
+                return False, _POLL_SECONDS
+            tokens = min(tokens, self.tpm)
+            wait = max(
+                (1 - self._requests) * 60 / self.rpm,
+                (tokens - self._tokens) * 60 / self.tpm,
+            )
+            if wait > 0:
+                return False, min(wait, 1.0)
+            heapq.heappop(self._waiters)
+            self._requests -= 1
+            self._tokens -= tokens
+            self.in_flight += 1
+            return True, 0.0
+
+    def acquire(self, agent: str, tokens: int):
+        ticket = self._enqueue(agent)
+        try:
+            while True:
+                acquired, wait = self._try_acquire(ticket, tokens)
+                if acquired:
+                    return
+                time.sleep(wait)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+
+    async def aacquire(self, agent: str, tokens: int):
+        ticket = self._enqueue(agent)
+        try:
+            while True:
+                acquired, wait = self._try_acquire(ticket, tokens)
+                if acquired:
+                    return
+                await asyncio.sleep(wait)
+        except BaseException:
+            self._dequeue(ticket)
+            raise
+
+    def release(self, reserved: int = 0, used: int = None, throttled: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            if used is not None:
+                self._tokens = min(self.tpm, self._tokens + min(reserved, self.tpm) - used)
+            if throttled:
+                self.throttled += 1
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                self._requests = min(self._requests, 0.0)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "concurrency_limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "queued": len(self._waiters),
+                "throttled": self.throttled,
+            }
+
+
+def get_limiter():
+    """
+    Returns the process-wide limiter, configured from AGENTIFIED_RPM,
+    AGENTIFIED_TPM and AGENTIFIED_MAX_CONCURRENCY. Set AGENTIFIED_RPM=0 to disable it.
+    """
+    global _limiter
+    rpm = int(os.getenv("AGENTIFIED_RPM", "60"))
+    if rpm <= 0:
+        return None
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    rpm=rpm,
+                    tpm=int(os.getenv("AGENTIFIED_TPM", "1000000")),
+                    max_concurrency=int(os.getenv("AGENTIFIED_MAX_CONCURRENCY", "8")),
+                )
+    return _limiter
+
+
+def limited_call(agent: str, prompt: str, call, stats: dict = None):
+    """
+    Runs call() under the shared limiter, retrying throttled calls with backoff.
+    Retries are counted in stats["retries"] when a stats dict is given.
+    """
+    limiter = get_limiter()
+    if limiter is None:
+        return call()
+    reserved = estimate_tokens(prompt)
+    for attempt in itertools.count():
+        limiter.acquire(agent, reserved)
+        try:
+            result = call()
+        except Exception as error:
+            throttled = is_throttled(error)
+            limiter.release(throttled=throttled)
+            if not throttled or attempt >= MAX_RETRIES:
+                raise
+            _count_retry(stats)
+            with tracing.span("backoff", "retry", agent=agent, attempt=attempt + 1):
+                time.sleep(backoff_delay(attempt))
+            continue
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.release(reserved, used_tokens(result))
+        return result
+
+
+async def alimited_call(agent: str, prompt: str, call, stats: dict = None):
+    """
+    Async version of limited_call; call() must return an awaitable.
+    """
+    limiter = get_limiter()
+    if limiter is None:
+        return await call()
+    reserved = estimate_tokens(prompt)
+    for attempt in itertools.count():
+        await limiter.aacquire(agent, reserved)
+        try:
+            result = await call()
+        except Exception as error:
+            throttled = is_throttled(error)
+            limiter.release(throttled=throttled)
+            if not throttled or attempt >= MAX_RETRIES:
+                raise
+            _count_retry(stats)
+            with tracing.span("backoff", "retry", agent=agent, attempt=attempt + 1):
+                await asyncio.sleep(backoff_delay(attempt))
+            continue
+        except BaseException:
+            # Cancelled, e.g. the losing copy of a hedged request.
+            limiter.release()
+            raise
+        limiter.release(reserved, used_tokens(result))
+        return result
+
+
+def limited_stream(agent: str, prompt: str, stream, stats: dict = None):
+    """
+    Streams chunks from stream() under the shared limiter. A throttled call is
+    only retried if it failed before producing its first chunk.
+    """
+    limiter = get_limiter()
+    if limiter is None:
+        yield from stream()
+        return
+    reserved = estimate_tokens(prompt)
+    for attempt in itertools.count():
+        limiter.acquire(agent, reserved)
+        started = False
+        used = 0
+        try:
+            for chunk in stream():
+                started = True
+                used += used_tokens(chunk) or 0
+                yield chunk
+        except Exception as error:
+            throttled = is_throttled(error)
+            limiter.release(throttled=throttled)
+            if started or not throttled or attempt >= MAX_RETRIES:
+                raise
+            _count_retry(stats)
+            with tracing.span("backoff", "retry", agent=agent, attempt=attempt + 1):
+                time.sleep(backoff_delay(attempt))
+            continue
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.release(reserved, used or None)
+        return
+
+
+async def alimited_stream(agent: str, prompt: str, stream, stats: dict = None):
+    """
+    Async version of limited_stream; stream() must return an async iterator.
+    """
+    limiter = get_limiter()
+    if limiter is None:
+        async for chunk in stream():
+            yield chunk
+        return
+    reserved = estimate_tokens(prompt)
+    for attempt in itertools.count():
+        await limiter.aacquire(agent, reserved)
+        started = False
+        used = 0
+        try:
+            async for chunk in stream():
+                started = True
+                used += used_tokens(chunk) or 0
+                yield chunk
+        except Exception as error:
+            throttled = is_throttled(error)
+            limiter.release(throttled=throttled)
+            if started or not throttled or attempt >= MAX_RETRIES:
+                raise
+            _count_retry(stats)
+            with tracing.span("backoff", "retry", agent=agent, attempt=attempt + 1):
+                await asyncio.sleep(backoff_delay(attempt))
+            continue
+        except BaseException:
+            limiter.release()
+            raise
+        limiter.release(reserved, used or None)
+        return
@@ -0,0 +1,161 @@
+# File: utils/revision.py
+
+import re
+
+from utils.chunking import split_jsx, split_python
+from utils.formatters import clean_output, extract_code
+
+_MARKDOWN_HEADING = re.compile(
+    r"^(?:(#{1,6})\s+(.+?)|(?:\d+\.\s+)?\*\*([^*\n]+)\*\*:?)\s*$",
+    re.MULTILINE,
+)
+_PART_MARKER = re.compile(r"^\s*<<<PART (\d+)>>>\s*$", re.MULTILINE)
+_ROUTE = re.compile(r"(?<![\w/])/[\w{}\-/:.]*")
+_QUOTED = re.compile(r"[`'\"]([^`'\"]+)[`'\"]")
+
+LANGUAGES = {".md": "markdown", ".jsx": "jsx", ".py": "python"}
+KINDS = {
+    "markdown": "Markdown document",
+    "jsx": "React + Tailwind component file",
+    "python": "Python module",
+}
+
+
+def language_for(filename: str) -> str:
+    for extension, language in LANGUAGES.items():
+        if filename.endswith(extension):
+            return language
+    return "markdown"
+
+
+def _heading_text(text: str) -> str:
+    return re.sub(r"^[\W\d_]+", "", text).strip(" *:").lower()
+
+
+def split_markdown(text: str):
+    """
+    Splits Markdown into (name, source) sections. A section runs from its
+    heading to the next heading of the same or a higher level, so a parent
+    section contains its subsections. Bold-only lines count as the lowest
+    heading level. Text before the first heading is the "preamble".
+    """
+    headings = []
+    for match in _MARKDOWN_HEADING.finditer(text):
+        level = len(match.group(1)) if match.group(1) else 7
+        headings.append((match.start(), level, match.group(2) or match.group(3)))
+    sections = []
+    if headings and text[:headings[0][0]].strip():
+        sections.append(("preamble", text[:headings[0][0]]))
+    for index, (start, level, title) in enumerate(headings):
+        end = next((other for other, other_level, _ in headings[index + 1:] if other_level <= level), len(text))
+        sections.append((title.strip(), text[start:end]))
+    return sections
+
+
+def split_units(content: str, language: str):
+    """
+    Splits an artifact into named, revisable units that are exact substrings
+    of it: Markdown sections, or top-level Python/JSX definitions.
+    """
+    if language == "markdown":
+        return split_markdown(content)
+    splitter = split_python if language == "python" else split_jsx
+    _, units = splitter(content)
+    return [(name, source) for name, source in units if source in content]
+
+
+_GENERIC_WORDS = {"get", "post", "put", "patch", "delete", "block", "module", "preamble"}
+
+
+def _mentions(feedback: str, name: str, source: str) -> int:
+    """
+    Scores how directly feedback refers to a unit: 2 for its full heading or
+    name, a route path or a quoted snippet; 1 for a shared word; else 0.
+    """
+    lowered = feedback.lower()
+    heading = _heading_text(name)
+    if len(heading) >= 3 and heading in lowered:
+        return 2
+    targets = _ROUTE.findall(feedback) + _QUOTED.findall(feedback)
+    if any(len(target) > 1 and (target in name or target in source) for target in targets):
+        return 2
+    for word in re.findall(r"\w+", name.lower()):
+        if len(word) >= 3 and word not in _GENERIC_WORDS and re.search(rf"\b{re.escape(word)}\b", lowered):
+            return 1
+    return 0
+
+
+def select_targets(units, feedback: str):
+    """
+    Returns the units the feedback refers to, by heading, definition name,
+    route path or quoted snippet, falling back to units sharing a word with
+    it. Units nested in another selected unit are dropped so every selected
+    part is replaced exactly once.
+    """
+    scores = [_mentions(feedback, name, source) for name, source in units]
+    best = max(scores, default=0)
+    if best == 0:
+        return []
+    selected = [unit for unit, score in zip(units, scores) if score == best]
+    return [
+        (name, source) for name, source in selected
+        if not any(source != other and source in other for _, other in selected)
+    ]
+
+
+def _parse_parts(reply: str, count: int):
+    pieces = _PART_MARKER.split(reply)
+    parts = {}
+    for index in range(1, len(pieces) - 1, 2):
+        number = int(pieces[index])
+        if 1 <= number <= count:
+            parts[number] = pieces[index + 1]
+    return parts
+
+
+def revise(content: str, feedback: str, language: str = "markdown", chain=None, targets=None):
+    """
+    Regenerates only the sections or definitions of content that feedback
+    targets (or the given (name, source) `targets` units) and splices them
+    back into the otherwise unchanged text. If no part can be matched, the
+    whole artifact is sent as the single part.
+    Returns (revised_content, names_of_revised_parts).
+    """
+    if chain is None:
+        from agents.registry import get_agent
+        chain = get_agent("revision_chain")
+
+    units = split_units(content, language)
+    if targets is None:
+        targets = select_targets(units, feedback)
+    targets = targets or [("whole document", content)]
+    outline = "\n".join(
+        f"- {name}{' (to revise)' if any(name == target for target, _ in targets) else ''}" for name, _ in units
+    ) or "- whole document (to revise)"
+    parts = "\n\n".join(f"<<<PART {number}>>>\n{source.strip()}" for number, (_, source) in enumerate(targets, start=1))
+
+    result = chain.invoke({
+        "kind": KINDS.get(language, "document"),
+        "feedback": feedback,
+        "outline": outline,
+        "parts": parts,
+    })
+    reply = getattr(result, "content", result)
+    replies = _parse_parts(reply, len(targets))
+    if not replies and len(targets) == 1:
+        replies = {1: reply}
+
+    if language == "markdown":
+        clean = lambda reply: clean_output(reply, keep_fences=True)
+    else:
+        clean = lambda reply: extract_code(reply, language)
+    revised, names = content, []
+    for number, (name, source) in enumerate(targets, start=1):
+        if number not in replies:
+            continue
+        trailing = source[len(source.rstrip()):]
+        leading = source[:len(source) - len(source.lstrip())]
+        new_source = leading + clean(replies[number]) + trailing
+        revised = revised.replace(source, new_source, 1)
+        names.append(name)
+    return revised, names
@@ -0,0 +1,123 @@
+# File: utils/routing.py
+
+import ast
+import os
+import time
+
+from utils.formatters import extract_code
+from utils.hitl import REFUSAL_MARKERS
+from utils.logger import current_run, metrics
+
+# Model tiers, cheapest first.
+TIERS = {
+    "lite": "gemini-2.5-flash-lite",
+    "standard": "gemini-2.5-flash",
+    "strong": "gemini-2.5-pro",
+}
+TIER_ORDER = list(TIERS)
+
+# Declared task complexity per agent. Short copy runs on the lite tier;
+# documents and code keep the standard model so they are never downgraded.
+AGENT_TIERS = {
+    "slogan_agent": "lite",
+    "marketing_agent": "lite",  # hashtags and post ideas
+    "email_agent": "lite",
+    "socialmedia_agent": "lite",
+    "visual_agent": "lite",
+    "marketing_bundle": "standard",
+    "marketing_strategy_agent": "standard",
+    "prd_agent": "standard",
+    "userstories_agent": "standard",
+    "frontend_agent": "standard",
+    "frontend_subagents": "standard",
+    "backend_agent": "standard",
+    "testing_agent": "standard",
+    "docs_agent": "standard",
+    "revision_agent": "standard",
+    "business_dev_agent": "standard",
+    "sales_agent": "standard",
+}
+# Agents that write code keep their declared tier even once a run is over budget.
+PINNED_AGENTS = {"frontend_agent", "frontend_subagents", "backend_agent", "testing_agent"}
+
+ROUTING = os.getenv("AGENTIFIED_ROUTING", "off").lower() in ("1", "on", "true")
+# Once a run has spent this much (USD, 0 = no limit) or has been calling the
+# model for this long (seconds, 0 = no limit), escalations stop and agents
+# outside PINNED_AGENTS start on the cheapest tier.
+RUN_BUDGET_USD = float(os.getenv("AGENTIFIED_RUN_BUDGET_USD", "0"))
+RUN_BUDGET_SECONDS = float(os.getenv("AGENTIFIED_RUN_BUDGET_SECONDS", "0"))
+
+
+def _parses(text: str) -> bool:
+    try:
+        ast.parse(extract_code(text, "python"))
+    except SyntaxError:
+        return False
+    return True
+
+
+# Agent-specific checks on top of the generic one in validate().
+VALIDATORS = {
+    "backend_agent": _parses,
+    "testing_agent": _parses,
+    "marketing_agent": lambda text: "#" in text or len(text.splitlines()) >= 3,
+}
+
+
+def validate(agent: str, text: str) -> bool:
+    """
+    Cheap local check that a reply is usable: not empty, not a refusal, and
+    passing the agent's validator if it has one.
+    """
+    text = (text or "").strip()
+    if not text or any(marker in text[:200].lower() for marker in REFUSAL_MARKERS):
+        return False
+    check = VALIDATORS.get(agent)
+    return check is None or check(text)
+
+
+def run_spend(run_id: str = None):
+    """
+    Returns (cost in USD, seconds since the first call) for run_id, or for
+    the current run.
+    """
+    spent = metrics.spend(run_id or current_run.get())
+    if spent is None:
+        return 0.0, 0.0
+    cost, started = spent
+    return cost, time.time() - started
+
+
+def within_budget(run_id: str = None) -> bool:
+    if not (RUN_BUDGET_USD or RUN_BUDGET_SECONDS):
+        return True
+    cost, seconds = run_spend(run_id)
+    return (not RUN_BUDGET_USD or cost < RUN_BUDGET_USD) and (not RUN_BUDGET_SECONDS or seconds < RUN_BUDGET_SECONDS)
+
+
+def route(agent: str, default: str) -> str:
+    """
+    Returns the model for agent's declared tier, or default when routing is
+    off (AGENTIFIED_ROUTING) or the agent declares no tier. Once the run is
+    over budget, agents outside PINNED_AGENTS get the cheapest tier instead.
+    """
+    if not ROUTING or agent not in AGENT_TIERS:
+        return default
+    tier = AGENT_TIERS[agent]
+    if agent not in PINNED_AGENTS and not within_budget():
+        tier = TIER_ORDER[0]
+    return TIERS[tier]
+
+
+def escalate(agent: str, model: str):
+    """
+    Returns the next stronger model after a reply from `model` failed
+    validation, or None when routing is off, model is already the strongest
+    tier or the run is over budget.
+    """
+    if not ROUTING or agent not in AGENT_TIERS or model not in TIERS.values():
+        return None
+    position = TIER_ORDER.index(next(tier for tier, name in TIERS.items() if name == model))
+    if position + 1 >= len(TIER_ORDER) or not within_budget():
+        return None
+    return TIERS[TIER_ORDER[position + 1]]
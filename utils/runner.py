@@ -0,0 +1,70 @@
+# File: utils/runner.py
+
+import asyncio
+import contextvars
+import threading
+
+_loop = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the process-wide event loop, started on a daemon thread on first use.
+    Async LLM clients bind their connections to the loop they first ran on, so
+    keeping a single loop alive lets every caller share them.
+    """
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="agentified-loop", daemon=True)
+                thread.start()
+                _loop = loop
+    return _loop
+
+
+async def _with_context(coro, context):
+    for variable, value in context.items():
+        variable.set(value)
+    return await coro
+
+
+def run_async(coro, timeout: float = None):
+    """
+    Runs a coroutine on the shared loop from synchronous code and waits for its result.
+    The caller's context variables (run and stage tags) are carried over.
+    """
+    context = contextvars.copy_context()
+    return asyncio.run_coroutine_threadsafe(_with_context(coro, context), get_loop()).result(timeout)
+
+
+def iterate_async(iterator):
+    """
+    Iterates an async iterator on the shared loop from synchronous code,
+    carrying the caller's context variables into every step. Closes it
+    if the caller stops early.
+    """
+    try:
+        while True:
+            try:
+                yield run_async(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        if hasattr(iterator, "aclose"):
+            run_async(iterator.aclose())
+
+
+async def gather_limited(coros, limit: int = 16):
+    """
+    Awaits the coroutines concurrently, at most `limit` at a time, preserving order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(bounded(coro) for coro in coros))
@@ -0,0 +1,139 @@
+# File: utils/session_store.py
+
+import mmap
+import os
+import secrets
+import shutil
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+DEFAULT_SPILL_DIR = os.path.join(".agentified", "session_spill")
+
+
+class _Spilled:
+    """An artifact moved out of memory into a file."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+
+
+class SessionLease:
+    """
+    Kept in a session's state. When the session goes away and the lease is
+    garbage collected, the session's artifacts are released.
+    """
+
+    def __init__(self, store, session: str):
+        self.session = session
+        weakref.finalize(self, store.end_session, session)
+
+
+class SessionArtifactStore:
+    """
+    Process-wide store for large generated texts shown by many sessions.
+    Artifacts belong to an owner (e.g. a background job key) and owners are
+    attached to the sessions displaying them. Recently used artifacts stay in
+    memory up to `budget_bytes`; older ones are spilled to files under
+    spill_dir and memory-mapped when read. Owners no session is attached to
+    anymore are evicted, and `on_evict(owner)` is called for each.
+    """
+
+    def __init__(self, budget_bytes: int, spill_dir: str = DEFAULT_SPILL_DIR, on_evict=None):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = os.path.join(spill_dir, f"{os.getpid()}-{secrets.token_hex(3)}")
+        self.on_evict = on_evict
+        self.memory_bytes = 0
+        self._entries = OrderedDict()  # (owner, name) -> str or _Spilled, least recently used first
+        self._sessions = {}  # session -> {"owners": set, "seen": timestamp}
+        self._lock = threading.RLock()
+        os.makedirs(self.spill_dir, exist_ok=True)
+        weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+
+    def put(self, owner, name: str, text: str):
+        with self._lock:
+            self._discard((owner, name))
+            self._entries[(owner, name)] = text
+            self.memory_bytes += len(text.encode("utf-8"))
+            self._spill()
+
+    def get(self, owner, name: str):
+        """Returns the artifact's text, reading spilled ones back from disk, or None."""
+        with self._lock:
+            entry = self._entries.get((owner, name))
+            if entry is None:
+                return None
+            self._entries.move_to_end((owner, name))
+            if isinstance(entry, str):
+                return entry
+            if entry.size == 0:
+                return ""
+            with open(entry.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[:].decode("utf-8")
+
+    def _spill(self):
+        for key in list(self._entries):
+            if self.memory_bytes <= self.budget_bytes:
+                return
+            entry = self._entries[key]
+            if not isinstance(entry, str):
+                continue
+            data = entry.encode("utf-8")
+            path = os.path.join(self.spill_dir, secrets.token_hex(8))
+            with open(path, "wb") as f:
+                f.write(data)
+            self._entries[key] = _Spilled(path, len(data))
+            self.memory_bytes -= len(data)
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if isinstance(entry, str):
+            self.memory_bytes -= len(entry.encode("utf-8"))
+        elif entry is not None and os.path.exists(entry.path):
+            os.remove(entry.path)
+
+    def attach(self, session: str, owner):
+        with self._lock:
+            state = self._sessions.setdefault(session, {"owners": set(), "seen": time.time()})
+            state["owners"].add(owner)
+            state["seen"] = time.time()
+
+    def touch(self, session: str):
+        with self._lock:
+            self._sessions.setdefault(session, {"owners": set(), "seen": time.time()})["seen"] = time.time()
+
+    def end_session(self, session: str):
+        with self._lock:
+            self._sessions.pop(session, None)
+        self._evict_unattached()
+
+    def sweep(self, idle_seconds: float):
+        """Ends sessions not seen for idle_seconds, for sessions whose lease was never collected."""
+        cutoff = time.time() - idle_seconds
+        with self._lock:
+            idle = [session for session, state in self._sessions.items() if state["seen"] < cutoff]
+        for session in idle:
+            self.end_session(session)
+
+    def _evict_unattached(self):
+        with self._lock:
+            attached = set().union(*(state["owners"] for state in self._sessions.values()))
+            evicted = {owner for owner, _ in self._entries if owner not in attached}
+            for key in [key for key in self._entries if key[0] in evicted]:
+                self._discard(key)
+        for owner in evicted:
+            if self.on_evict is not None:
+                self.on_evict(owner)
+
+    def stats(self) -> dict:
+        with self._lock:
+            spilled = [entry for entry in self._entries.values() if not isinstance(entry, str)]
+            return {
+                "sessions": len(self._sessions),
+                "artifacts": len(self._entries),
+                "memory_bytes": self.memory_bytes,
+                "spilled": len(spilled),
+                "spilled_bytes": sum(entry.size for entry in spilled),
+            }
@@ -0,0 +1,165 @@
+# File: utils/similarity.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+
+DEFAULT_INDEX_PATH = os.path.join(".agentified", "ideas.sqlite")
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS = NUM_PERMUTATIONS // BANDS
+_MAX_HASH = (1 << 32) - 1
+
+STOPWORDS = {
+    "a", "an", "and", "app", "application", "are", "as", "at", "be", "by", "for", "from", "help", "helps",
+    "in", "into", "is", "it", "of", "on", "or", "platform", "that", "the", "their", "this", "to", "using",
+    "which", "with", "without", "you", "your",
+}
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ers", "er", "ed", "es", "s")
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def normalize(text: str):
+    """
+    Lowercases, joins hyphenated words ("no-code" -> "nocode"), drops
+    stopwords and strips common suffixes. Returns the list of tokens.
+    """
+    text = re.sub(r"(\w)-(\w)", r"\1\2", text.lower())
+    return [_stem(word) for word in re.findall(r"[a-z0-9]+", text) if word not in STOPWORDS]
+
+
+def shingles(text: str) -> set:
+    """
+    Word tokens plus character trigrams of each token, so both rewordings
+    and small spelling differences overlap.
+    """
+    features = set()
+    for token in normalize(text):
+        features.add(f"w:{token}")
+        padded = f"^{token}$"
+        features.update(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+def _hash(feature: str, seed: int) -> int:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=4, salt=struct.pack("<Q", seed)).digest()
+    return struct.unpack("<I", digest)[0]
+
+
+def minhash(features) -> list:
+    if not features:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+    return [min(_hash(feature, seed) for feature in features) for seed in range(NUM_PERMUTATIONS)]
+
+
+def similarity(a: list, b: list) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERMUTATIONS
+
+
+class IdeaIndex:
+    """
+    Local MinHash/LSH index over the ideas of past runs. Candidates
+    come from signatures sharing at least one band of rows; they are ranked by
+    estimated Jaccard similarity. Only runs for the same platform are compared.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ideas (
+                run_id TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                created REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS bands (bucket TEXT NOT NULL, run_id TEXT NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_bucket ON bands (bucket)")
+        self._conn.commit()
+
+    @staticmethod
+    def _buckets(signature: list):
+        for band in range(BANDS):
+            rows = signature[band * ROWS:(band + 1) * ROWS]
+            yield f"{band}:" + ",".join(map(str, rows))
+
+    def add(self, run_id: str, text: str, platform: str = ""):
+        signature = minhash(shingles(text))
+        with self._lock:
+            self._conn.execute("DELETE FROM bands WHERE run_id = ?", (run_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ideas (run_id, text, platform, signature, created) VALUES (?, ?, ?, ?, ?)",
+                (run_id, text, platform or "", json.dumps(signature), time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO bands (bucket, run_id) VALUES (?, ?)",
+                [(bucket, run_id) for bucket in self._buckets(signature)],
+            )
+            self._conn.commit()
+
+    def remove(self, run_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM bands WHERE run_id = ?", (run_id,))
+            self._conn.execute("DELETE FROM ideas WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+
+    def find(self, text: str, platform: str = "", threshold: float = 0.8, exclude: str = None):
+        """
+        Returns (run_id, stored_text, similarity) for the closest stored idea
+        at or above threshold, or None.
+        """
+        signature = minhash(shingles(text))
+        buckets = list(self._buckets(signature))
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT DISTINCT ideas.run_id, ideas.text, ideas.signature FROM bands
+                JOIN ideas ON ideas.run_id = bands.run_id
+                WHERE bands.bucket IN ({','.join('?' * len(buckets))}) AND ideas.platform = ?
+                """,
+                buckets + [platform or ""],
+            ).fetchall()
+        best = None
+        for run_id, stored, stored_signature in rows:
+            if run_id == exclude:
+                continue
+            score = similarity(signature, json.loads(stored_signature))
+            if score >= threshold and (best is None or score > best[2]):
+                best = (run_id, stored, score)
+        return best
+
+
+def get_idea_index():
+    """
+    Returns the process-wide idea index at AGENTIFIED_IDEA_INDEX (default
+    .agentified/ideas.sqlite).
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = IdeaIndex(os.getenv("AGENTIFIED_IDEA_INDEX", DEFAULT_INDEX_PATH))
+    return _index
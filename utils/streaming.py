@@ -0,0 +1,73 @@
+# File: utils/streaming.py
+
+import sys
+import threading
+import time
+
+_print_lock = threading.Lock()
+
+
+def _chunk_text(chunk) -> str:
+    content = getattr(chunk, "content", chunk)
+    if isinstance(content, list):
+        return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    return content or ""
+
+
+def iter_text(chain, inputs: dict, timings: dict = None, stage: str = None):
+    """
+    Streams a chain and yields the text of each chunk as it arrives.
+    If a timings dict is given, the time to first token is stored under `stage`.
+    """
+    start = time.perf_counter()
+    first = True
+    for chunk in chain.stream(inputs):
+        text = _chunk_text(chunk)
+        if not text:
+            continue
+        if first and timings is not None:
+            timings[stage] = time.perf_counter() - start
+        first = False
+        yield text
+
+
+def stream_text(chain, inputs: dict, on_token=None):
+    """
+    Streams a chain, passing every chunk to on_token.
+    Returns (full_text, time_to_first_token_seconds).
+    """
+    timings = {}
+    parts = []
+    for text in iter_text(chain, inputs, timings, "ttft"):
+        parts.append(text)
+        if on_token:
+            on_token(text)
+    return "".join(parts), timings.get("ttft")
+
+
+class LinePrinter:
+    """
+    Prints streamed tokens line by line, prefixed with the stage name, so
+    output from stages generated concurrently stays readable in the terminal.
+    """
+
+    def __init__(self, stage: str, stream=None):
+        self.stage = stage
+        self.stream = stream or sys.stdout
+        self._buffer = ""
+
+    def write(self, text: str):
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        if lines:
+            with _print_lock:
+                for line in lines:
+                    self.stream.write(f"[{self.stage}] {line}\n")
+                self.stream.flush()
+
+    def flush(self):
+        if self._buffer:
+            with _print_lock:
+                self.stream.write(f"[{self.stage}] {self._buffer}\n")
+                self.stream.flush()
+            self._buffer = ""
@@ -0,0 +1,319 @@
+# File: utils/tracing.py
+
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+TRACING = os.getenv("AGENTIFIED_TRACE", "on").lower() not in ("0", "false", "off")
+TRACE_DIR = os.getenv("AGENTIFIED_TRACE_DIR", os.path.join(".agentified", "traces"))
+# "chrome": Trace Event Format (chrome://tracing, ui.perfetto.dev); "otlp": OpenTelemetry JSON.
+TRACE_FORMAT = os.getenv("AGENTIFIED_TRACE_FORMAT", "chrome").lower()
+# Trace files kept in TRACE_DIR, most recent first (0 = keep all).
+TRACE_KEEP = int(os.getenv("AGENTIFIED_TRACE_KEEP", "200"))
+TRACE_SUFFIXES = (".trace.json", ".otlp.json")
+MAX_KEPT = 64
+
+KINDS = ("run", "stage", "llm", "retry", "approval", "artifact")
+
+current_trace = contextvars.ContextVar("agentified_trace", default=None)
+current_span = contextvars.ContextVar("agentified_span", default=None)
+
+_finished = OrderedDict()  # run_id -> [Trace], most recent last
+_finished_lock = threading.Lock()
+
+
+class Span:
+    def __init__(self, name: str, kind: str, parent: str = None, start: float = None, **attributes):
+        self.id = secrets.token_hex(8)
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.start = time.time() if start is None else start
+        self.end = None
+        self.thread = threading.get_ident()
+        self.attributes = attributes
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.time()) - self.start
+
+
+class Trace:
+    """
+    The spans recorded for one pipeline run (or one background job), with
+    wall-clock times. run_id is filled in by the first run_scope entered.
+    """
+
+    def __init__(self, name: str):
+        self.id = secrets.token_hex(16)
+        self.name = name
+        self.run_id = None
+        self.spans = []
+        self.path = None
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def root(self):
+        return next((span for span in self.spans if span.parent is None), None)
+
+    def chrome(self) -> dict:
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.kind,
+                    "ph": "X",
+                    "ts": round(span.start * 1e6),
+                    "dur": round(span.duration * 1e6),
+                    "pid": pid,
+                    "tid": span.thread,
+                    "args": {"span_id": span.id, "parent_id": span.parent, **span.attributes},
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.id, "run_id": self.run_id},
+        }
+
+    def otlp(self) -> dict:
+        def value(item):
+            if isinstance(item, bool):
+                return {"boolValue": item}
+            if isinstance(item, int):
+                return {"intValue": str(item)}
+            if isinstance(item, float):
+                return {"doubleValue": item}
+            return {"stringValue": str(item)}
+
+        spans = [
+            {
+                "traceId": self.id,
+                "spanId": span.id,
+                **({"parentSpanId": span.parent} if span.parent else {}),
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(int(span.start * 1e9)),
+                "endTimeUnixNano": str(int((span.start + span.duration) * 1e9)),
+                "attributes": [
+                    {"key": key, "value": value(item)}
+                    for key, item in {"agentified.kind": span.kind, **span.attributes}.items() if item is not None
+                ],
+            }
+            for span in self.spans
+        ]
+        return {"resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": "agentified"}},
+                {"key": "agentified.run_id", "value": {"stringValue": str(self.run_id)}},
+            ]},
+            "scopeSpans": [{"scope": {"name": "agentified"}, "spans": spans}],
+        }]}
+
+    def write(self, directory: str = TRACE_DIR, format: str = TRACE_FORMAT) -> str:
+        os.makedirs(directory, exist_ok=True)
+        suffix = "otlp.json" if format == "otlp" else "trace.json"
+        path = os.path.join(directory, f"{self.run_id or 'untagged'}.{self.id[:6]}.{suffix}")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.otlp() if format == "otlp" else self.chrome(), f, default=str)
+        os.replace(tmp, path)
+        self.path = path
+        prune(directory)
+        return path
+
+
+def prune(directory: str = TRACE_DIR, keep: int = None):
+    """Deletes all but the `keep` (default TRACE_KEEP) most recently written trace files."""
+    keep = TRACE_KEEP if keep is None else keep
+    if not keep or not os.path.isdir(directory):
+        return
+    paths = [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(TRACE_SUFFIXES)]
+    stamped = []
+    for path in paths:
+        try:
+            stamped.append((os.path.getmtime(path), path))
+        except OSError:  # pruned concurrently
+            continue
+    for _, path in sorted(stamped, reverse=True)[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def name_trace(run_id: str):
+    """Tags the current trace with run_id unless it already has one (see utils.logger.run_scope)."""
+    active = current_trace.get()
+    if active is not None and active.run_id is None:
+        active.run_id = run_id
+
+
+@contextmanager
+def span(name: str, kind: str, **attributes):
+    """
+    Records the block as a span of the current trace, nested under the
+    current span. Does nothing outside a trace.
+    """
+    active = current_trace.get()
+    if active is None:
+        yield None
+        return
+    current = active.add(Span(name, kind, current_span.get(), **attributes))
+    token = current_span.set(current.id)
+    try:
+        yield current
+    except BaseException as error:
+        current.attributes["error"] = repr(error)
+        raise
+    finally:
+        current.end = time.time()
+        current_span.reset(token)
+
+
+def capture():
+    """Returns (trace, parent span id), to record spans from threads that don't share the context."""
+    return current_trace.get(), current_span.get()
+
+
+def record(name: str, kind: str, start: float, end: float = None, context=None, **attributes):
+    """
+    Records an already finished span, e.g. an LLM call timed elsewhere.
+    `context` is a capture() from the thread that started the work.
+    """
+    active, parent = context or capture()
+    if active is None:
+        return None
+    finished = Span(name, kind, parent, start, **attributes)
+    finished.end = time.time() if end is None else end
+    return active.add(finished)
+
+
+@contextmanager
+def trace(name: str):
+    """
+    Starts a trace with a root "run" span for the block. On exit the trace is
+    written to TRACE_DIR and kept in memory for report() (see traces()).
+    """
+    if not TRACING:
+        yield None
+        return
+    started = Trace(name)
+    token = current_trace.set(started)
+    try:
+        with span(name, "run"):
+            yield started
+    finally:
+        current_trace.reset(token)
+        started.write()
+        with _finished_lock:
+            _finished.setdefault(started.run_id, []).append(started)
+            _finished.move_to_end(started.run_id)
+            while len(_finished) > MAX_KEPT:
+                _finished.popitem(last=False)
+
+
+def traced(name: str):
+    """Decorator running the function inside trace(name)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with trace(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def traces(run_id: str) -> list:
+    """Finished traces of run_id kept in this process, oldest first."""
+    with _finished_lock:
+        return list(_finished.get(run_id, []))
+
+
+def _covered(intervals) -> float:
+    """Seconds covered by the union of (start, end) intervals."""
+    total, reach = 0.0, None
+    for start, end in sorted(intervals):
+        if reach is None or start > reach:
+            total += end - start
+            reach = end
+        elif end > reach:
+            total += end - reach
+            reach = end
+    return total
+
+
+def longest_path(items, duration, predecessors):
+    """
+    Returns (path, seconds) for the chain of items, each one a predecessor
+    of the next, with the largest total duration(item). predecessors(item)
+    lists the items that had to finish before it started. Used for both
+    the scheduler's dependency graph and the spans of a trace.
+    """
+    best = {}
+
+    def longest(item):
+        if item not in best:
+            chain, total = max(
+                (longest(before) for before in predecessors(item)), key=lambda found: found[1], default=([], 0.0),
+            )
+            best[item] = (chain + [item], total + duration(item))
+        return best[item]
+
+    return max((longest(item) for item in items), key=lambda found: found[1], default=([], 0.0))
+
+
+def critical_path(spans) -> list:
+    """
+    The longest chain of spans that each started after the previous one
+    finished. These spans bound the end-to-end latency: shortening anything
+    else doesn't end the run sooner.
+    """
+    spans = list(spans)
+    path, _ = longest_path(
+        spans,
+        lambda item: item.duration,
+        lambda item: [other for other in spans if other.start + other.duration <= item.start + 1e-6 and other is not item],
+    )
+    return path
+
+
+def report(recorded, width: int = 40) -> str:
+    """
+    Renders a waterfall of the stages and approval waits of one or more traces,
+    the time covered by each span kind and the critical path.
+    """
+    spans = [span for item in recorded for span in item.spans]
+    if not spans:
+        return "No trace recorded."
+    roots = {item.root().id for item in recorded if item.root() is not None}
+    top = [span for span in spans if span.parent in roots and span.kind in ("stage", "approval")]
+    origin = min(span.start for span in spans)
+    wall = max(span.start + span.duration for span in spans) - origin
+    scale = width / wall if wall else 0
+
+    lines = ["  Waterfall:"]
+    for item in sorted(top, key=lambda span: span.start):
+        offset = int((item.start - origin) * scale)
+        bar = "█" * max(1, int(item.duration * scale)) if item.kind == "stage" else "░" * max(1, int(item.duration * scale))
+        lines.append(f"  {item.name[:24]:<24} {' ' * offset}{bar:<{width - offset}} {item.start - origin:6.1f}s +{item.duration:.1f}s")
+    lines.append(f"  Wall clock: {wall:.1f}s  (█ generating, ░ waiting for approval)")
+    for kind in KINDS[2:]:
+        covered = _covered((span.start, span.start + span.duration) for span in spans if span.kind == kind)
+        if covered:
+            lines.append(f"  {kind:<9} {covered:7.1f}s  ({covered / wall:.0%} of the run)" if wall else f"  {kind:<9} {covered:7.1f}s")
+    path = critical_path(top)
+    if path:
+        seconds = sum(span.duration for span in path)
+        lines.append(f"  Critical path: {' → '.join(span.name for span in path)} ({seconds:.1f}s of {wall:.1f}s)")
+    return "\n".join(lines)
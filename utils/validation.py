@@ -0,0 +1,313 @@
+# File: utils/validation.py
+
+import ast
+import hashlib
+import importlib.machinery
+import importlib.util
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+VALIDATION = os.getenv("AGENTIFIED_VALIDATE", "on").lower() not in ("0", "false", "off")
+# Collecting tests imports the generated backend, i.e. runs LLM-written code; opt-in only.
+COLLECT_TESTS = os.getenv("AGENTIFIED_VALIDATE_TESTS", "off").lower() in ("1", "on", "true")
+CACHE_DIR = os.getenv("AGENTIFIED_VALIDATION_CACHE", os.path.join(".agentified", "validation"))
+# Concurrent pytest subprocesses across all runs in this process.
+WORKERS = int(os.getenv("AGENTIFIED_VALIDATION_WORKERS", "2"))
+PYTEST_TIMEOUT = 60
+JSX_TIMEOUT = 30
+# Address space and file size limits of the collection subprocess, where supported.
+COLLECT_MEMORY_BYTES = 1024 * 1024 * 1024
+COLLECT_FILE_BYTES = 16 * 1024 * 1024
+# Bump when the checks change, so cached verdicts from older checks are ignored.
+VERSION = 3
+
+# The generated backend is importable under these names next to the tests.
+BACKEND_MODULES = ("main", "app", "backend_code")
+_MISSING_MODULE = re.compile(r"No module named '([\w.]+)'")
+# Runs pytest --collect-only under resource limits (argv: CPU seconds, memory bytes, file bytes).
+_COLLECT_SCRIPT = """
+import sys
+try:
+    import resource
+except ImportError:
+    resource = None
+if resource is not None:
+    for limit, value in (("RLIMIT_CPU", sys.argv[1]), ("RLIMIT_AS", sys.argv[2]), ("RLIMIT_FSIZE", sys.argv[3]), ("RLIMIT_CORE", "0")):
+        if hasattr(resource, limit):
+            try:
+                resource.setrlimit(getattr(resource, limit), (int(value), int(value)))
+            except (ValueError, OSError):
+                pass
+import pytest
+sys.exit(pytest.main(["--collect-only", "-q", "-p", "no:cacheprovider", "test_code.py"]))
+"""
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _subprocess_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=max(1, WORKERS), thread_name_prefix="agentified-validate")
+    return _pool
+
+
+def _result(errors=(), skipped=()) -> dict:
+    return {"ok": not errors, "errors": list(errors), "skipped": list(skipped)}
+
+
+def _top_level_names(body):
+    """
+    Names a module defines at top level, including inside if/try/with/for
+    blocks. Returns None when a star import makes them unknowable.
+    """
+    names = set()
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            if any(alias.name == "*" for alias in node.names):
+                return None
+            names.update((alias.asname or alias.name).split(".")[0] for alias in node.names)
+        elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            names.update(
+                target.id for target in ast.walk(node)
+                if isinstance(target, ast.Name) and isinstance(target.ctx, ast.Store)
+            )
+            for block in ("body", "orelse", "finalbody", "handlers"):
+                nested = getattr(node, block, None)
+                if isinstance(nested, list) and nested and isinstance(nested[0], ast.stmt):
+                    inner = _top_level_names(nested)
+                    if inner is None:
+                        return None
+                    names.update(inner)
+            for handler in getattr(node, "handlers", []):
+                inner = _top_level_names(handler.body)
+                if inner is None:
+                    return None
+                names.update(inner)
+    return names
+
+
+def _find_spec(module: str):
+    """
+    Locates a module without importing it or any of its parent packages
+    (importlib.util.find_spec imports the parents of dotted names).
+    """
+    parts = module.split(".")
+    spec = importlib.util.find_spec(parts[0])
+    for depth in range(1, len(parts)):
+        if spec is None or spec.submodule_search_locations is None:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(".".join(parts[:depth + 1]), spec.submodule_search_locations)
+    return spec
+
+
+def _missing_names(module: str, spec, names):
+    """
+    Names the module doesn't define, read from its source rather than by
+    importing it. Returns [] when its names can't be known statically
+    (compiled modules, star imports, a module __getattr__).
+    """
+    if not spec.origin or not spec.origin.endswith(".py"):
+        return []
+    try:
+        with open(spec.origin, encoding="utf-8") as f:
+            defined = _top_level_names(ast.parse(f.read()).body)
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return []
+    if defined is None or "__getattr__" in defined:
+        return []
+    return [
+        name for name in names
+        if name not in defined
+        and not (spec.submodule_search_locations is not None and _find_spec(f"{module}.{name}"))
+    ]
+
+
+def check_python(code: str, siblings: dict = None) -> dict:
+    """
+    Parses code and checks its imports without running it or importing them. `siblings` maps
+    module names to the source of other generated files, whose top-level
+    names are checked against `from <sibling> import ...`. Modules that are
+    not in the standard library and not installed here are reported as
+    skipped rather than failing.
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as error:
+        return _result([f"SyntaxError: {error.msg} (line {error.lineno})"])
+
+    siblings = siblings or {}
+    sibling_names = {}
+    for module, source in siblings.items():
+        try:
+            sibling_names[module] = _top_level_names(ast.parse(source).body)
+        except SyntaxError:
+            sibling_names[module] = None
+    errors, skipped = [], []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports = [(alias.name, ()) for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+            imports = [(node.module, [alias.name for alias in node.names if alias.name != "*"])]
+        else:
+            continue
+        for module, names in imports:
+            top = module.split(".")[0]
+            if top in sibling_names:
+                defined = sibling_names[top]
+                missing = [name for name in names if defined is not None and name not in defined]
+                if missing:
+                    errors.append(f"line {node.lineno}: {module} has no {', '.join(missing)}")
+            elif top in sys.stdlib_module_names:
+                if importlib.util.find_spec(top) is None:
+                    continue
+                loaded = sys.modules.get(module)
+                if loaded is not None:
+                    # Already imported by this process, so looking at it runs nothing.
+                    missing = [
+                        name for name in names
+                        if not hasattr(loaded, name)
+                        and not (hasattr(loaded, "__path__") and _find_spec(f"{module}.{name}"))
+                    ]
+                else:
+                    spec = _find_spec(module)
+                    if spec is None:
+                        errors.append(f"line {node.lineno}: no module named '{module}'")
+                        continue
+                    missing = _missing_names(module, spec, names)
+                if missing:
+                    errors.append(f"line {node.lineno}: cannot import {', '.join(missing)} from '{module}'")
+            elif importlib.util.find_spec(top) is None:
+                skipped.append(f"'{top}' is not installed, imports from it were not checked")
+    return _result(errors, sorted(set(skipped)))
+
+
+def _collect_tests(test_code: str, backend_code: str) -> dict:
+    """
+    Has pytest collect the tests next to the backend in a subprocess. This
+    imports, i.e. runs, the generated code. It is not a sandbox: the
+    subprocess runs as this user in a temporary directory with a trimmed
+    environment, Python's isolated mode and CPU, memory and file size
+    limits (where the OS supports them), and is killed with everything it
+    started after PYTEST_TIMEOUT, but it can still use the network and
+    reach files this user can. Only on with AGENTIFIED_VALIDATE_TESTS.
+    """
+    if importlib.util.find_spec("pytest") is None:
+        return _result(skipped=["pytest is not installed, tests were not collected"])
+    with tempfile.TemporaryDirectory(prefix="agentified-validate-") as workdir:
+        for module in BACKEND_MODULES:
+            with open(os.path.join(workdir, f"{module}.py"), "w", encoding="utf-8") as f:
+                f.write(backend_code)
+        with open(os.path.join(workdir, "test_code.py"), "w", encoding="utf-8") as f:
+            f.write(test_code)
+        # No API keys reach generated code, and -I keeps the repo and user site-packages off its path.
+        env = {key: os.environ[key] for key in ("PATH", "SYSTEMROOT", "TMPDIR", "TEMP", "TMP") if key in os.environ}
+        limits = [str(PYTEST_TIMEOUT), str(COLLECT_MEMORY_BYTES), str(COLLECT_FILE_BYTES)]
+        process = subprocess.Popen(
+            [sys.executable, "-I", "-c", _COLLECT_SCRIPT, *limits],
+            cwd=workdir,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=os.name == "posix",
+        )
+        try:
+            stdout, stderr = process.communicate(timeout=PYTEST_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+            process.communicate()
+            return _result([f"pytest collection did not finish within {PYTEST_TIMEOUT}s"])
+    output = (stdout + stderr).strip()
+    if process.returncode == 0:
+        return _result()
+    if process.returncode == 5:
+        return _result(["pytest collected no tests"])
+    missing = set(_MISSING_MODULE.findall(output)) - set(BACKEND_MODULES)
+    if missing and all(importlib.util.find_spec(module.split(".")[0]) is None for module in missing):
+        return _result(skipped=[f"tests need {', '.join(sorted(missing))}, which is not installed here"])
+    return _result([f"pytest collection failed:\n{output[-2000:]}"])
+
+
+def check_jsx(code: str) -> dict:
+    """
+    Syntax-checks JSX with esprima (Python) or esbuild, whichever is
+    available; skipped when neither is.
+    """
+    try:
+        import esprima
+    except ImportError:
+        esprima = None
+    if esprima is not None:
+        try:
+            esprima.parseModule(code, {"jsx": True})
+        except Exception as error:  # esprima raises its own Error type on invalid syntax
+            return _result([f"JSX syntax error: {error}"])
+        return _result()
+    esbuild = shutil.which("esbuild")
+    if esbuild is None:
+        return _result(skipped=["no JSX parser available (pip install esprima or put esbuild on PATH)"])
+    try:
+        completed = subprocess.run(
+            [esbuild, "--loader=jsx", "--log-level=error"], input=code, capture_output=True, text=True, timeout=JSX_TIMEOUT,
+        )
+    except subprocess.TimeoutExpired:
+        return _result(skipped=[f"esbuild did not finish within {JSX_TIMEOUT}s, JSX was not checked"])
+    if completed.returncode != 0:
+        return _result([f"JSX syntax error:\n{completed.stderr.strip()[-2000:]}"])
+    return _result()
+
+
+def _cache_path(kind: str, *sources: str) -> str:
+    digest = hashlib.sha256(json.dumps([VERSION, kind, *sources]).encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, digest[:2], f"{digest}.json")
+
+
+def validate_stage(stage: str, code: str, backend_code: str = "") -> dict:
+    """
+    Validates a generated code stage without running it: frontend_code is
+    syntax-checked as JSX, backend_code and test_code are parsed and
+    import-checked. With COLLECT_TESTS, test_code is also collected by
+    pytest next to backend_code (see _collect_tests, which does run the
+    generated code). Results are cached by content hash. Returns
+    {"ok", "errors", "skipped"}.
+    """
+    sources = (code, backend_code) if stage == "test_code" else (code,)
+    path = _cache_path(f"{stage}+collect" if stage == "test_code" and COLLECT_TESTS else stage, *sources)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    if stage == "frontend_code":
+        result = check_jsx(code)
+    elif stage == "backend_code":
+        result = check_python(code)
+    else:
+        result = check_python(code, {module: backend_code for module in BACKEND_MODULES})
+        if result["ok"] and COLLECT_TESTS:
+            collected = _subprocess_pool().submit(_collect_tests, code, backend_code).result()
+            result = _result(collected["errors"], result["skipped"] + collected["skipped"])
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+    os.replace(tmp, path)
+    return result
@@ -0,0 +1,124 @@
+# File: workflows/batch.py
+
+import csv
+import json
+import os
+import re
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.artifacts import ArtifactStore
+from utils.hitl import auto_approve, policy_approval
+from workflows.checkpoints import new_run_id
+from workflows.full_build import run_full_pipeline
+
+APPROVAL_MODES = {
+    "auto": lambda: auto_approve,
+    "policy": policy_approval,
+}
+
+
+def load_ideas(path: str):
+    """
+    Reads product ideas from a .jsonl or .csv file. Each record needs an
+    `idea` (or `requirements`) field and may set target_user, platform and pain_point.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            records = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+
+    ideas = []
+    for number, record in enumerate(records, start=1):
+        idea = (record.get("idea") or record.get("requirements") or "").strip()
+        if not idea:
+            raise ValueError(f"{path}: record {number} has no 'idea' field")
+        ideas.append({
+            "idea": idea,
+            "target_user": record.get("target_user") or "General users",
+            "platform": record.get("platform") or "Web",
+            "pain_point": record.get("pain_point") or "N/A",
+        })
+    return ideas
+
+
+def _slug(text: str, limit: int = 40) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:limit] or "idea"
+
+
+def run_batch(path: str, out_dir: str = "build/batch", workers: int = 4, approval: str = "auto", stage_workers: int = 2):
+    """
+    Runs the full pipeline for every idea in `path` on a pool of `workers`,
+    without prompting. Each idea is a run of its own, written to
+    out_dir/runs/<batch id>-<index>-<slug>/ as soon as it finishes; identical
+    artifacts across ideas are stored once (see utils.artifacts). Earlier
+    runs are never reused, since no one reviews what would be adapted from
+    them. Returns a summary dict.
+    """
+    ideas = load_ideas(path)
+    approve = APPROVAL_MODES[approval]()
+    batch_id = new_run_id()
+    os.makedirs(out_dir, exist_ok=True)
+
+    counts = {"succeeded": 0, "rejected": 0, "failed": 0}
+    durations = []
+    lock = threading.Lock()
+
+    def note(run_id, filename, text):
+        artifacts = ArtifactStore(out_dir, run_id)
+        artifacts.write(filename, text)
+        artifacts.flush()
+
+    def process(index, item):
+        run_id = f"{batch_id}-{index:04d}-{_slug(item['idea'])}"
+        start = time.perf_counter()
+        try:
+            output = run_full_pipeline(
+                item["idea"],
+                target_user=item["target_user"],
+                platform=item["platform"],
+                pain_point=item["pain_point"],
+                approve=approve,
+                build_dir=out_dir,
+                max_workers=stage_workers,
+                stream=False,
+                verbose=False,
+                run_id=run_id,
+            )
+        except Exception:
+            note(run_id, "error.txt", traceback.format_exc())
+            status = "failed"
+        else:
+            if isinstance(output, dict):
+                status = "succeeded"
+            else:
+                note(run_id, "rejected.txt", str(output))
+                status = "rejected"
+        elapsed = time.perf_counter() - start
+        with lock:
+            counts[status] += 1
+            durations.append(elapsed)
+        return index, status, elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(process, index, item) for index, item in enumerate(ideas, start=1)]
+        for future in as_completed(futures):
+            index, status, elapsed = future.result()
+            print(f"  [{index}/{len(ideas)}] {status} in {elapsed:.1f}s")
+    wall = time.perf_counter() - started
+
+    summary = {
+        "ideas": len(ideas),
+        **counts,
+        "wall_seconds": round(wall, 2),
+        "ideas_per_minute": round(len(ideas) / wall * 60, 2) if wall else 0.0,
+        "mean_seconds_per_idea": round(sum(durations) / len(durations), 2) if durations else 0.0,
+    }
+    with open(os.path.join(out_dir, "batch_summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
@@ -0,0 +1,195 @@
+# File: workflows/checkpoints.py
+
+import hashlib
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+
+CHECKPOINT_ROOT = os.path.join(".agentified", "runs")
+
+_run_locks = {}
+_run_locks_lock = threading.Lock()
+
+
+def new_run_id() -> str:
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+
+
+def input_hash(stage: str, inputs) -> str:
+    payload = json.dumps([stage, inputs], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _run_lock(directory: str) -> threading.RLock:
+    """
+    One lock per run directory, shared by every store of that run in this
+    process (the inbox loop, the reviewer and the service each open their own).
+    """
+    key = os.path.abspath(directory)
+    with _run_locks_lock:
+        return _run_locks.setdefault(key, threading.RLock())
+
+
+def _write_json(path: str, data):
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+class CheckpointStore:
+    """
+    Persists each stage's inputs, output and approval state for one run, so an
+    interrupted or rejected run can resume without paying for stages that are
+    still valid. A checkpoint is only reused when the hash of the stage's
+    inputs matches and it has not been rejected. Read-modify-write updates
+    hold the run's lock, so concurrent reviewers and the pipeline don't
+    overwrite each other's changes.
+    """
+
+    def __init__(self, run_id: str, root: str = CHECKPOINT_ROOT):
+        self.run_id = run_id
+        self.dir = os.path.join(root, run_id)
+        os.makedirs(self.dir, exist_ok=True)
+        self.lock = _run_lock(self.dir)
+
+    def _path(self, stage: str) -> str:
+        return os.path.join(self.dir, f"{stage}.json")
+
+    def _discarded_path(self, stage: str) -> str:
+        return os.path.join(self.dir, f"{stage}.discarded")
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.dir, "run.json"))
+
+    def load_meta(self) -> dict:
+        path = os.path.join(self.dir, "run.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_meta(self, meta: dict):
+        _write_json(os.path.join(self.dir, "run.json"), meta)
+
+    def get(self, stage: str):
+        path = self._path(stage)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, stage: str, digest: str):
+        """
+        Returns the checkpoint for stage if it was produced from the same inputs
+        and has not been rejected, otherwise None.
+        """
+        record = self.get(stage)
+        if record is None or record["input_hash"] != digest or record.get("approved") is False:
+            return None
+        return record
+
+    def save(self, stage: str, digest: str, inputs, output):
+        with self.lock:
+            if os.path.exists(self._discarded_path(stage)):
+                os.remove(self._discarded_path(stage))
+            _write_json(self._path(stage), {
+                "stage": stage,
+                "input_hash": digest,
+                "inputs": inputs,
+                "output": output,
+                "approved": None,
+                "updated": time.time(),
+            })
+
+    def save_revision(self, stage: str, output, feedback: str):
+        """
+        Replaces a stage's output with a revised one, keeping its input hash so
+        it is still reused on resume, and logs the feedback that produced it.
+        """
+        with self.lock:
+            record = self.get(stage)
+            if record is not None:
+                record["output"] = output
+                record["approved"] = None
+                record["revisions"] = record.get("revisions", []) + [feedback]
+                record.pop("checks", None)  # the revised output hasn't been checked
+                for field in ("feedback", "title", "posted"):  # pending again once re-posted
+                    record.pop(field, None)
+                record["updated"] = time.time()
+                _write_json(self._path(stage), record)
+
+    def update(self, stage: str, **fields):
+        """
+        Sets extra fields (e.g. review title or pending feedback) on a stage's checkpoint.
+        """
+        with self.lock:
+            record = self.get(stage)
+            if record is not None:
+                record.update(fields)
+                record["updated"] = time.time()
+                _write_json(self._path(stage), record)
+
+    def stages(self):
+        return sorted(
+            name[:-len(".json")] for name in os.listdir(self.dir)
+            if name.endswith(".json") and name != "run.json"
+        )
+
+    def set_approval(self, stage: str, approved: bool):
+        with self.lock:
+            record = self.get(stage)
+            if record is not None:
+                record["approved"] = approved
+                record["updated"] = time.time()
+                _write_json(self._path(stage), record)
+
+    def adopt(self, other: "CheckpointStore", stages=None):
+        """
+        Copies every stage of another run that was not rejected (of `stages`,
+        if given) into this run as a seed: an unreviewed output whose inputs
+        don't match this run's, to adapt instead of generating from scratch.
+        This run's own meta is kept; the earlier run and its idea are recorded
+        as reused_from and reused_idea. Returns the stage names.
+        """
+        self.save_meta({
+            **self.load_meta(),
+            "reused_from": other.run_id,
+            "reused_idea": other.load_meta().get("requirements"),
+        })
+        adopted = []
+        for stage in other.stages():
+            record = other.get(stage)
+            if record is None or record.get("approved") is False or (stages is not None and stage not in stages):
+                continue
+            record.update({"approved": None, "reused_from": other.run_id, "updated": time.time()})
+            for field in ("title", "feedback", "posted"):
+                record.pop(field, None)
+            with self.lock:
+                _write_json(self._path(stage), record)
+            adopted.append(stage)
+        return adopted
+
+    def invalidate(self, stages):
+        """
+        Discards the stages' checkpoints, leaving a marker so the next
+        generation isn't served the discarded output again (see was_discarded).
+        """
+        with self.lock:
+            for stage in stages:
+                if os.path.exists(self._path(stage)):
+                    open(self._discarded_path(stage), "w").close()
+                    os.remove(self._path(stage))
+
+    def was_discarded(self, stage: str) -> bool:
+        """
+        True if the stage's last output was rejected or invalidated and
+        nothing has been saved since.
+        """
+        record = self.get(stage)
+        if record is not None:
+            return record.get("approved") is False
+        return os.path.exists(self._discarded_path(stage))
@@ -1,103 +1,739 @@
-from agents.prd_agent import prd_agent
-from agents.marketing_agent.email_agent import email_agent
-from agents.marketing_agent.slogan_agent import slogan_agent
-from agents.marketing_agent.socialmedia_agent import socialmedia_agent
-from agents.marketing_agent.visual_agent import visual_agent
-from agents.frontend_agent import frontend_agent
-from agents.backend_agent import backend_agent
-from agents.userstories_agent import userstories_agent
-from agents.testing_agent import testing_agent
-from agents.docs_agent import docs_agent
-from agents.marketing_agent import socialmedia_agent
-from utils.formatters import clean_output
-from utils.hitl import human_approval_step
-
-def run_full_pipeline(requirements: str):
-    print("\n📄 Generating Product Requirements Document...")
-    
+import contextvars
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.registry import lazy_agent
+from utils import tracing
+from utils.artifacts import ArtifactStore
+from utils.cache import fresh_responses
+from utils.chunking import DEFAULT_CHUNK_CHARS, LANGUAGES, chunk_code, merge_docs, merge_tests
+from utils.formatters import StreamCleaner, clean_output
+from utils.hitl import feedback_of, human_approval_step
+from utils.logger import run_scope, stage_scope
+from utils.revision import language_for, revise, split_units
+from utils.similarity import get_idea_index, normalize
+from utils.streaming import LinePrinter, iter_text, stream_text
+from utils.validation import VALIDATION, validate_stage
+from workflows.checkpoints import CHECKPOINT_ROOT, CheckpointStore, input_hash, new_run_id
+from workflows.inbox import POLL_SECONDS, ReviewInbox, review_inbox
+from workflows.scheduler import Node, descendants, run_graph, format_timings
+
+# Agent modules, prompts and clients are only loaded when their stage first runs.
+prd_agent = lazy_agent("prd_agent")
+email_chain = lazy_agent("email_chain")
+slogan_chain = lazy_agent("slogan_chain")
+socialmedia_agent = lazy_agent("socialmedia_agent")
+visual_chain = lazy_agent("visual_chain")
+frontend_chain = lazy_agent("frontend_chain")
+backend_agent = lazy_agent("backend_agent")
+userstories_agent = lazy_agent("userstories_agent")
+testing_agent = lazy_agent("testing_agent")
+docs_agent = lazy_agent("docs_agent")
+generate_marketing_bundle = lazy_agent("generate_marketing_bundle")
+format_bundle = lazy_agent("format_bundle")
+fix_code = lazy_agent("fix_code")
+
+DEFAULT_MAX_WORKERS = int(os.getenv("AGENTIFIED_MAX_WORKERS", "4"))
+DEFAULT_STREAM = os.getenv("AGENTIFIED_STREAM", "1").lower() not in ("0", "false", "off")
+CHUNK_CHARS = int(os.getenv("AGENTIFIED_CHUNK_CHARS", str(DEFAULT_CHUNK_CHARS)))
+# "fused": one structured call for all marketing assets; "separate": one call per asset.
+MARKETING_MODE = os.getenv("AGENTIFIED_MARKETING", "fused").lower()
+REUSE_THRESHOLD = float(os.getenv("AGENTIFIED_REUSE_THRESHOLD", "0.8"))
+MAX_FIX_ROUNDS = int(os.getenv("AGENTIFIED_MAX_FIX_ROUNDS", "2"))
+
+# Stages that go through human review, in review order, with the build file they are saved to.
+REVIEWED_STAGES = [
+    ("user_stories", "User Stories", "user_stories.md"),
+    ("frontend_code", "Frontend Code", "frontend_code.jsx"),
+    ("backend_code", "Backend Code", "backend_code.py"),
+    ("test_code", "Test Code", "test_code.py"),
+    ("docs", "Documentation", "documentation.md"),
+]
+# Stages whose replies are reduced to their fenced code blocks and streamed
+# to <build file>.part while they are generated.
+CODE_STAGES = {"frontend_code", "backend_code", "test_code"}
+# Language of each reviewed stage's file ("markdown", "jsx" or "python").
+STAGE_LANGUAGES = {name: language_for(filename) for name, _, filename in REVIEWED_STAGES}
+# Stages an earlier run's output can seed when its idea is reused: they are
+# generated from the idea alone, so only the parts of the seed that refer to
+# what changed in the idea are rewritten (see _seed_adapter). Tests, docs
+# and marketing are generated from scratch.
+SEED_STAGES = ("prd", "user_stories", "frontend_code", "backend_code")
+ADAPT_FEEDBACK = (
+    'This was written for a different product idea: "{previous}". Rewrite it for this idea instead, '
+    'keeping whatever still applies: "{requirements}".'
+)
+# Language each code stage is described as to the fix agent.
+FIX_LANGUAGES = {
+    "frontend_code": "React + Tailwind (JSX)",
+    "backend_code": "Python (FastAPI)",
+    "test_code": "Python (pytest)",
+}
+
+
+def _combined_code(results):
+    return f"{results['frontend_code']}\n\n{results['backend_code']}"
+
+
+def _partial_path(build_dir: str, stage: str):
+    if build_dir is None or stage not in CODE_STAGES:
+        return None
+    filename = next(filename for name, _, filename in REVIEWED_STAGES if name == stage)
+    return os.path.join(build_dir, f"{filename}.part")
+
+
+def _map_reduce(
+    stage: str, chain, code: dict, merge, stream: bool, first_token: dict, max_workers: int, path: str = None,
+    languages=LANGUAGES,
+) -> str:
+    """
+    Runs chain once per code chunk of the given languages, concurrently, and
+    merges the outputs in chunk order. Codebases within CHUNK_CHARS keep the
+    single call.
+    """
+    combined = _combined_code(code)
+    if len(combined) <= CHUNK_CHARS:
+        return _generate(stage, chain, {"code": combined}, stream, first_token, path)
+    chunks = chunk_code(code["frontend_code"], code["backend_code"], CHUNK_CHARS, languages)
+    if len(chunks) <= 1:
+        single = chunks[0]["code"] if chunks else combined
+        return _generate(stage, chain, {"code": single}, stream, first_token, path)
+    outputs = chain.batch([{"code": chunk["code"]} for chunk in chunks], config={"max_concurrency": max_workers})
+    merged = merge([(chunk["name"], _clean(stage, output)) for chunk, output in zip(chunks, outputs)])
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(merged)
+    return merged
+
+
+def _cleaner(stage: str, sink=None) -> StreamCleaner:
+    """
+    Code stages keep only code blocks in their own language; Markdown stages
+    keep their code blocks fenced. With a sink, the cleaned text only goes there.
+    """
+    language = STAGE_LANGUAGES.get(stage)
+    return StreamCleaner(
+        code_only=stage in CODE_STAGES, sink=sink, code_language=language, keep_fences=language == "markdown",
+        keep_text=sink is None,
+    )
+
+
+def _clean(stage: str, text) -> str:
+    cleaner = _cleaner(stage)
+    cleaner.feed(text)
+    cleaner.close()
+    return cleaner.text
+
+
+def _generate(stage: str, chain, inputs: dict, stream: bool, first_token: dict, path: str = None) -> str:
+    """
+    Generates one stage, cleaning the reply as it arrives. Code stages keep
+    only their code blocks. With a path, the cleaned text is written there
+    while the reply is still streaming, rather than also held in memory, and
+    read back once it is complete.
+    """
+    sink = open(path, "w", encoding="utf-8") if path is not None else None
+    cleaner = _cleaner(stage, sink.write if sink else None)
+    try:
+        if stream:
+            printer = LinePrinter(stage)
+            for text in iter_text(chain, inputs, first_token, stage):
+                printer.write(text)
+                cleaner.feed(text)
+            printer.flush()
+        else:
+            cleaner.feed(chain.invoke(inputs))
+        cleaner.close()
+    finally:
+        if sink is not None:
+            sink.close()
+    if path is not None:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    return cleaner.text
+
+
+def _validated(stage: str, code: str, inputs: dict, checks: dict = None) -> str:
+    """
+    Checks a generated code stage locally (see utils.validation) and only
+    calls the fix agent, with the errors found, when a check fails. Every
+    fix is checked again; after MAX_FIX_ROUNDS fixes the last version goes
+    to review as it is. The final verdict is stored in checks[stage].
+    """
+    if not VALIDATION or stage not in CODE_STAGES:
+        return code
+    backend_code = inputs.get("backend_code", "")
+    result = validate_stage(stage, code, backend_code)
+    for _ in range(MAX_FIX_ROUNDS):
+        if result["ok"]:
+            break
+        with stage_scope(f"{stage}_fix"):
+            code = _clean(stage, fix_code(code, "\n".join(result["errors"]), FIX_LANGUAGES[stage]))
+        result = validate_stage(stage, code, backend_code)
+    if checks is not None:
+        checks[stage] = result
+    return code
+
+
+def _failed_checks(store, stage: str):
+    """The errors a stage's code still had after its fix rounds, or None if it passed or wasn't checked."""
+    result = (store.get(stage) or {}).get("checks")
+    return result["errors"] if result and not result["ok"] else None
+
+
+def _review_title(store, stage: str, title: str) -> str:
+    return f"{title} (⚠️ still fails local checks)" if _failed_checks(store, stage) else title
+
+
+def _checkpointed(store, stage: str, inputs: dict, generate, adapt=None) -> str:
+    """
+    Returns the stage's checkpointed output for these inputs, or generates
+    and saves it. A seed adopted from an earlier run (see
+    CheckpointStore.adopt) is passed to adapt(seed) instead of generating.
+    A stage generated again after a rejection or an explicit regenerate
+    bypasses the response cache, which holds the discarded reply.
+    """
+    if store is None:
+        return generate()
+    digest = input_hash(stage, inputs)
+    record = store.load(stage, digest)
+    if record is not None:
+        return record["output"]
+    seed = store.get(stage)
+    if adapt is not None and seed is not None and seed.get("reused_from"):
+        output = adapt(seed["output"])
+    else:
+        with fresh_responses(store.was_discarded(stage)):
+            output = generate()
+    store.save(stage, digest, inputs, output)
+    return output
+
+
+def build_graph(
+    requirements: str,
+    stream: bool = False,
+    first_token: dict = None,
+    store: CheckpointStore = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    build_dir: str = None,
+    adapt=None,
+):
+    """
+    Describes the generation stages as a dependency graph. Everything except
+    tests and docs only needs the requirements, so it can run concurrently.
+    Tests and docs are generated per code chunk and merged (see utils.chunking);
+    tests only from the backend chunks, since the testing agent writes pytest.
+    When stream is set, tokens are printed as they arrive and the time to
+    first token of each stage is stored in first_token. With a checkpoint
+    store, stages whose inputs are unchanged reuse their saved output.
+    With a build_dir, code stages are written to <build file>.part as they
+    are generated, ahead of review. Code stages are checked locally before
+    they are saved, and fixed only if a check fails (see _validated); the
+    final verdict is kept on the checkpoint as "checks". With
+    adapt(stage, seed), SEED_STAGES seeded from an earlier run are adapted
+    rather than generated. In the fused marketing mode a single
+    "marketing" stage returns every marketing asset (see _marketing_results).
+    """
+    first_token = {} if first_token is None else first_token
+    checks = {}
+
+    def stage(name, chain, inputs, deps=(), merge=None, languages=LANGUAGES):
+        def run(results):
+            stage_inputs = inputs(results)
+            path = _partial_path(build_dir, name)
+            if merge is None:
+                generate = lambda: _generate(name, chain, stage_inputs, stream, first_token, path)
+            else:
+                generate = lambda: _map_reduce(name, chain, stage_inputs, merge, stream, first_token, max_workers, path, languages)
+            adapt_seed = None
+            if adapt is not None and name in SEED_STAGES:
+                adapt_seed = lambda seed: _validated(name, adapt(name, seed), stage_inputs, checks)
+            with stage_scope(name):
+                output = _checkpointed(
+                    store, name, stage_inputs, lambda: _validated(name, generate(), stage_inputs, checks), adapt_seed,
+                )
+            if store is not None and name in checks:
+                store.update(name, checks=checks.pop(name))
+            return output
+        return Node(name, run, deps)
+
+    def fused_marketing(results):
+        generate = lambda: format_bundle(generate_marketing_bundle(requirements))
+        with stage_scope("marketing"):
+            return _checkpointed(store, "marketing", {"requirements": requirements}, generate)
+
+    requirement_input = lambda r: {"requirements": requirements}
+    code_input = lambda r: {"frontend_code": r["frontend_code"], "backend_code": r["backend_code"]}
+    if MARKETING_MODE == "separate":
+        marketing = [
+            stage("email_copy", email_chain, requirement_input),
+            stage("slogans", slogan_chain, requirement_input),
+            stage("social_copy", socialmedia_agent, requirement_input),
+            stage("visual_campaign", visual_chain, requirement_input),
+        ]
+    else:
+        marketing = [Node("marketing", fused_marketing)]
+    return marketing + [
+        stage("user_stories", userstories_agent, lambda r: {
+            "requirements": requirements,
+            "target_users": "",
+            "industry": "",
+            "pain_points": "",
+            "output_style": "",
+        }),
+        stage("frontend_code", frontend_chain, requirement_input),
+        stage("backend_code", backend_agent, requirement_input),
+        stage("test_code", testing_agent, code_input, deps=("frontend_code", "backend_code"), merge=merge_tests, languages=("python",)),
+        stage("docs", docs_agent, code_input, deps=("frontend_code", "backend_code"), merge=merge_docs),
+    ]
+
+
+def _silent(*args, **kwargs):
+    pass
+
+
+def _write_stage_file(artifacts: ArtifactStore, stage: str, filename: str, content: str):
+    # Queued to the store's writer thread; the .part file goes once the final file is in place.
+    artifacts.write(filename, content, replaces=_partial_path(artifacts.dir, stage))
+
+
+def _marketing_results(results: dict) -> dict:
+    """
+    Spreads the fused marketing stage's assets into per-asset results, so
+    both marketing modes produce the same keys.
+    """
+    return {**results, **results.get("marketing", {})}
+
+
+def _pipeline_output(prd: str, results: dict, artifacts: ArtifactStore) -> dict:
+    """
+    Builds the pipeline's return value, writes each entry to <name>.txt in
+    the run directory and waits for every queued artifact to be on disk.
+    """
+    results = _marketing_results(results)
+    output = {
+        "prd": prd,
+        "user_stories": results["user_stories"],
+        "frontend_code": results["frontend_code"],
+        "backend_code": results["backend_code"],
+        "test_code": results["test_code"],
+        "docs": results["docs"],
+        "social_copy": results["social_copy"],
+        "marketing": {
+            "Email Copy": results["email_copy"],
+            "Slogans": results["slogans"],
+            "Social Media Posts": results["social_copy"],
+            "Visual Campaign": results["visual_campaign"],
+            **({
+                "Hashtags": results["hashtags"],
+                "Post Ideas": results["post_ideas"],
+            } if "hashtags" in results else {}),
+        },
+    }
+    for name, content in output.items():
+        artifacts.write(f"{name}.txt", content.strip() if isinstance(content, str) else str(content))
+    artifacts.flush()
+    return output
+
+
+def _run_with_inbox(store, nodes, prd_inputs, approve, artifacts, max_workers, speculative, max_rejections, say, adapt=None):
+    """
+    Generates every stage ahead of review and posts each one to the run's
+    ReviewInbox as soon as it is ready, so reviewing and generating overlap.
+    With speculative=False, a stage waits for its reviewed dependencies to
+    be approved. Feedback revises the targeted parts of a stage; a rejection
+    regenerates it. Either way everything downstream is discarded and
+    regenerated. `approve` (if given) reviews the inbox from this process;
+    otherwise decisions come from `python main.py --inbox` or Streamlit.
+    """
+    def generate_prd(results):
+        with stage_scope("prd"):
+            return _checkpointed(
+                store, "prd", prd_inputs, lambda: _generate("prd", prd_agent, prd_inputs, False, {}),
+                adapt and (lambda seed: adapt("prd", seed)),
+            )
+
+    graph = [Node("prd", generate_prd)] + nodes
+    reviewed = {"prd": ("Product Requirements Document", "markdown", None)}
+    reviewed.update({name: (title, language_for(filename), filename) for name, title, filename in REVIEWED_STAGES})
+    inbox = ReviewInbox(store)
+    results, approved, epochs, rejections = {}, set(), Counter(), Counter()
+    running = {}
+    finished = threading.Event()
+
+    def ready(node):
+        if node.name in results or any(name == node.name for name, _, _ in running.values()):
+            return False
+        return all(
+            dep in results and (speculative or dep in approved or dep not in reviewed)
+            for dep in node.deps
+        )
+
+    def reset(names):
+        for name in names:
+            results.pop(name, None)
+            approved.discard(name)
+            epochs[name] += 1
+        store.invalidate(names)
+
+    def finish(name, output):
+        results[name] = output
+        if name not in reviewed:
+            return
+        title, _, filename = reviewed[name]
+        if (store.get(name) or {}).get("approved"):
+            approved.add(name)
+            if filename:
+                _write_stage_file(artifacts, name, filename, output)
+        else:
+            inbox.post(name, _review_title(store, name, title))
+            say(f"  📥 {_review_title(store, name, title)} is ready for review")
+
+    def revise_stage(name, feedback):
+        _, language, _ = reviewed[name]
+        with stage_scope(f"{name}_revision"):
+            content, _ = revise(results[name], feedback, language)
+        return content
+
+    def loop():
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            while len(approved) < len(reviewed) or len(results) < len(graph):
+                for node in graph:
+                    if ready(node):
+                        future = pool.submit(contextvars.copy_context().run, node.fn, dict(results))
+                        running[future] = (node.name, "generate", epochs[node.name])
+
+                for future in [future for future in running if future.done()]:
+                    name, kind, epoch = running.pop(future)
+                    output = future.result()
+                    if epoch != epochs[name]:
+                        continue
+                    if kind == "revise":
+                        store.save_revision(name, output, store.get(name).get("feedback", ""))
+                        reset(descendants(graph, name))
+                    finish(name, output)
+
+                for name in [name for name in results if name in reviewed and name not in approved]:
+                    if any(running_name == name for running_name, _, _ in running.values()):
+                        continue
+                    decision = inbox.decision(name)
+                    title, _, filename = reviewed[name]
+                    if decision is True:
+                        approved.add(name)
+                        say(f"  ✅ {title} approved")
+                        if filename:
+                            _write_stage_file(artifacts, name, filename, results[name])
+                    elif decision is False:
+                        rejections[name] += 1
+                        if rejections[name] > max_rejections:
+                            return f"{title} rejected {rejections[name]} times. Resume with: python main.py --resume {store.run_id}"
+                        say(f"  🔁 {title} rejected, regenerating it and everything built on it")
+                        reset([name] + descendants(graph, name))
+                    elif decision:
+                        say(f"  ✏️ Revising {title}: {decision}")
+                        future = pool.submit(contextvars.copy_context().run, revise_stage, name, decision)
+                        running[future] = (name, "revise", epochs[name])
+                time.sleep(POLL_SECONDS)
+        return None
+
+    outcome = {}
+
+    def run_loop():
+        try:
+            with run_scope(store.run_id):
+                outcome["halted"] = loop()
+        except BaseException as error:
+            outcome["error"] = error
+        finally:
+            finished.set()
+
+    worker = threading.Thread(target=contextvars.copy_context().run, args=(run_loop,), name="agentified-inbox", daemon=True)
+    worker.start()
+    if approve is not None:
+        review_inbox(approve, run_id=store.run_id, until=finished.is_set)
+    worker.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    if outcome.get("halted"):
+        artifacts.flush()
+        return outcome["halted"]
+    return _pipeline_output(results["prd"], results, artifacts)
+
+
+def _units_mentioning(content: str, language: str, terms):
+    """
+    The sections or definitions of content that mention any of terms (word
+    prefixes, since normalized terms are stemmed). A unit is kept only if
+    it mentions one outside its matching nested units, and units nested in a
+    kept one are dropped, so each part is rewritten once and as narrowly as
+    possible. Content without units counts as one.
+    """
+    if not terms:
+        return []
+    pattern = re.compile(r"\b(?:" + "|".join(map(re.escape, terms)) + ")", re.IGNORECASE)
+    units = split_units(content, language) or [("whole document", content)]
+    matched = [(name, source) for name, source in units if pattern.search(source)]
+    kept = []
+    for name, source in matched:
+        own = source
+        for _, other in matched:
+            if other != source and other in source:
+                own = own.replace(other, "")
+        if pattern.search(own):
+            kept.append((name, source))
+    return [
+        (name, source) for name, source in kept
+        if not any(source != other and source in other for _, other in kept)
+    ]
+
+
+def _seed_adapter(previous: str, requirements: str):
+    """
+    Returns adapt(stage, seed) for seeds from the run whose idea was
+    `previous`. Only the parts of a seed that mention a term of the earlier
+    idea that this one lacks are rewritten (see utils.revision); a seed
+    mentioning none goes to review unchanged, without an LLM call.
+    """
+    dropped = sorted(set(normalize(previous)) - set(normalize(requirements)))
+    feedback = ADAPT_FEEDBACK.format(previous=previous, requirements=requirements)
+
+    def adapt(stage, seed):
+        language = STAGE_LANGUAGES.get(stage, "markdown")
+        targets = _units_mentioning(seed, language, dropped)
+        if not targets:
+            return seed
+        with stage_scope(f"{stage}_adapt"):
+            content, _ = revise(seed, feedback, language, targets=targets)
+        return content
+
+    return adapt
+
+
+def _find_prior_run(store, requirements, platform, reuse):
+    """
+    Indexes this run's idea and returns the checkpoint store of a
+    near-duplicate earlier run with a usable PRD, if `reuse` accepts it.
+    Only the idea is compared: target users and pain points are often
+    boilerplate shared by unrelated ideas.
+    """
+    index = get_idea_index()
+    match = None
+    if reuse in ("ask", "auto"):
+        match = index.find(requirements, platform, REUSE_THRESHOLD, exclude=store.run_id)
+    if match is not None and os.path.isdir(os.path.join(CHECKPOINT_ROOT, match[0])):
+        run_id, text, score = match
+        prior = CheckpointStore(run_id)
+        prd = prior.get("prd")
+        if prd is not None and prd.get("approved") is not False:
+            question = f"\n♻️ This looks like run {run_id} ({score:.0%} similar): \"{text}\". Reuse its artifacts? (y/n): "
+            if reuse == "auto" or input(question).strip().lower() == "y":
+                return prior
+    index.add(store.run_id, requirements, platform)
+    return None
+
+
+@tracing.traced("pipeline")
+def run_full_pipeline(
+    requirements: str = None,
+    target_user: str = None,
+    platform: str = None,
+    pain_point: str = None,
+    approve=human_approval_step,
+    build_dir: str = "build",
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    stream: bool = DEFAULT_STREAM,
+    verbose: bool = True,
+    run_id: str = None,
+    regenerate: str = None,
+    reuse: str = "off",
+    review: str = "inline",
+    speculative: bool = True,
+    max_rejections: int = 2,
+):
+    """
+    Runs the PRD, generation graph and review steps for one product idea.
+    Context left as None is asked for on the terminal, and `approve` replaces
+    the interactive review (see utils.hitl for non-interactive policies).
+    Approved artifacts are written to build_dir/runs/<run id>/ through an
+    ArtifactStore (atomic, background writes, deduplicated across runs).
+
+    Every stage is checkpointed under the run id. Passing the id of an earlier
+    run resumes it: approved stages are kept, and only rejected or missing
+    stages are generated. `regenerate` discards one stage and everything
+    downstream of it first.
+
+    When `approve` returns feedback instead of True/False, only the sections
+    or functions it refers to are regenerated (see utils.revision) and the
+    revised artifact is reviewed again. Stages built on a revised one are
+    regenerated from it.
+
+    reuse="ask" or "auto" looks up near-duplicate ideas from earlier runs
+    (see utils.similarity) and, after asking or automatically, seeds the PRD,
+    user stories and code with that run's unrejected outputs instead of
+    generating them: only the parts that mention what changed in the idea
+    are rewritten (see _seed_adapter), and everything still goes through
+    review. Reuse is off for approval steps marked `automatic` (see
+    utils.hitl), since nobody would review the adapted outputs.
+
+    review="inbox" posts stages to a review inbox instead of blocking on each
+    one, so generation continues while reviewers work (see _run_with_inbox).
+
+    The run is traced (see utils.tracing): stages, LLM calls, retries,
+    approval waits and artifact writes are written to .agentified/traces/.
+    """
+    say = print if verbose else _silent
+    store = CheckpointStore(run_id or new_run_id())
+    tracing.name_trace(store.run_id)
+    meta = store.load_meta()
+    if meta:
+        say(f"\n🔁 Resuming run {store.run_id}")
+        requirements = requirements or meta["requirements"]
+        target_user = target_user or meta["target_user"]
+        platform = platform or meta["platform"]
+        pain_point = pain_point or meta["pain_point"]
+    elif requirements is None:
+        raise ValueError(f"No checkpointed run '{store.run_id}' to resume")
+
     idea = requirements
-    target_user = input("🧑 Who is the target user? (optional): ") or "General users"
-    platform = input("💻 Which platform is this for? (optional): ") or "Web"
-    pain_point = input("😩 What pain point does it solve? (optional): ") or "N/A"
+    if target_user is None:
+        target_user = input("🧑 Who is the target user? (optional): ") or "General users"
+    if platform is None:
+        platform = input("💻 Which platform is this for? (optional): ") or "Web"
+    if pain_point is None:
+        pain_point = input("😩 What pain point does it solve? (optional): ") or "N/A"
+    store.save_meta({
+        "requirements": requirements,
+        "target_user": target_user,
+        "platform": platform,
+        "pain_point": pain_point,
+    })
+    if not meta:
+        if getattr(approve, "automatic", False):
+            reuse = "off"
+        prior = _find_prior_run(store, requirements, platform, reuse)
+        if prior is not None:
+            adopted = store.adopt(prior, SEED_STAGES)
+            say(f"\n♻️ Starting from run {prior.run_id} ({len(adopted)} stages reused; only parts about what changed in the idea are rewritten)")
+
+    reused_idea = store.load_meta().get("reused_idea")
+    adapt = _seed_adapter(reused_idea, requirements) if reused_idea else None
 
-    prd = clean_output(prd_agent.invoke({
+    first_token = {}
+    # Streamed tokens would interleave with the reviewer's prompt in inbox mode.
+    stream = stream and review != "inbox"
+    artifacts = ArtifactStore(build_dir, store.run_id)
+    nodes = build_graph(
+        requirements,
+        stream=stream,
+        first_token=first_token,
+        store=store,
+        max_workers=max_workers,
+        build_dir=artifacts.dir,
+        adapt=adapt,
+    )
+    if regenerate:
+        stage_names = ["prd"] + [node.name for node in nodes]
+        if regenerate not in stage_names:
+            raise ValueError(f"Unknown stage '{regenerate}', expected one of {stage_names}")
+        store.invalidate([regenerate] + descendants(nodes, regenerate))
+
+    def rejected(title):
+        artifacts.flush()
+        return f"{title} rejected by human. Resume with: python main.py --resume {store.run_id}"
+
+    def review_stage(stage, title, content, language, show=True):
+        """
+        Asks for approval until the reviewer approves or rejects, revising the
+        targeted parts for each round of feedback. Returns (approved, content, revised).
+        """
+        revised = False
+        while True:
+            with tracing.span(title, "approval", stage=stage):
+                decision = approve(title, content, show=show)
+            feedback = feedback_of(decision)
+            if feedback is None:
+                store.set_approval(stage, decision is True)
+                return decision is True, content, revised
+            with run_scope(store.run_id), stage_scope(f"{stage}_revision"):
+                content, parts = revise(content, feedback, language)
+            say(f"\n✏️ Revised {title}: {', '.join(parts) or 'no matching part, kept as is'}")
+            store.save_revision(stage, content, feedback)
+            revised, show = True, True
+
+    prd_inputs = {
         "idea": idea,
         "target_user": target_user,
         "platform": platform,
         "pain_point": pain_point
-    }))
-    
-    approved = human_approval_step("Product Requirements Document", prd)
-    if not approved:
-        return "PRD rejected by human."
-
-    marketing_outputs = {
-    "Email Copy": email_agent.invoke({"requirements": requirements}),
-    "Slogans": slogan_agent.invoke({"requirements": requirements}),
-    "Social Media Posts": socialmedia_agent.invoke({"requirements": requirements}),
-    "Visual Campaign": visual_agent.invoke({"requirements": requirements}),
-    }
-    output["Marketing"] = marketing_outputs
-
-    print("\n--- User Stories ---")
-    user_stories = clean_output(userstories_agent.invoke({"requirements": requirements}))
-    print("\n--- User Stories ---\n")
-    print(user_stories)
-    if not human_approval_step("User Stories", user_stories):
-        exit()
-
-    with open("build/user_stories.md", "w") as f:
-        f.write(user_stories)
-
-    frontend_code = clean_output(frontend_agent.invoke({"requirements": requirements}))
-    print("\n--- Frontend Code ---\n")
-    print(frontend_code)
-    if not human_approval_step("Frontend Code", frontend_code):
-        exit()
-
-    with open("build/frontend_code.jsx", "w") as f:
-        f.write(frontend_code)
-
-    backend_code = clean_output(backend_agent.invoke({"requirements": requirements}))
-    print("\n--- Backend Code ---\n")
-    print(backend_code)
-    if not human_approval_step("Backend Code", backend_code):
-        exit()
-
-    with open("build/backend_code.py", "w") as f:
-        f.write(backend_code)
-
-    combined_code = f"{frontend_code}\n\n{backend_code}"
-    test_code = clean_output(testing_agent.invoke({"code": combined_code}))
-    print("\n--- Test Code ---\n")
-    print(test_code)
-    if not human_approval_step("Test Code", test_code):
-        exit()
-
-    with open("build/test_code.py", "w") as f:
-        f.write(test_code)
-
-    docs = clean_output(docs_agent.invoke({"frontend": frontend_code, "backend": backend_code}))
-    print("\n--- Documentation ---\n")
-    print(docs)
-    if not human_approval_step("Documentation", docs):
-        exit()
-
-    with open("build/documentation.md", "w") as f:
-        f.write(docs)
-
-    social_copy = clean_output(socialmedia_agent.invoke({"requirements": requirements}))
-    print("\n--- Social Media Copy ---\n")
-    print(social_copy)
-
-    with open("build/social_copy.txt", "w") as f:
-        f.write(social_copy)
-
-    return {
-        "user_stories": user_stories,
-        "frontend_code": frontend_code,
-        "backend_code": backend_code,
-        "test_code": test_code,
-        "docs": docs,
-        "social_copy": social_copy,
     }
+    if review == "inbox":
+        say(f"\n📥 Generating ahead of review; answer with this prompt or: python main.py --inbox {store.run_id}")
+        return _run_with_inbox(store, nodes, prd_inputs, approve, artifacts, max_workers, speculative, max_rejections, say, adapt)
+    prd_record = store.load("prd", input_hash("prd", prd_inputs))
+    prd_seed = store.get("prd")
+    streamed = False
+    if prd_record is not None:
+        prd = prd_record["output"]
+    elif adapt is not None and prd_seed is not None and prd_seed.get("reused_from"):
+        say(f"\n📄 Adapting the PRD of run {prd_seed['reused_from']}...")
+        with run_scope(store.run_id), stage_scope("prd"):
+            prd = adapt("prd", prd_seed["output"])
+        store.save("prd", input_hash("prd", prd_inputs), prd_inputs, prd)
+    else:
+        say("\n📄 Generating Product Requirements Document...")
+        with run_scope(store.run_id), stage_scope("prd"), fresh_responses(store.was_discarded("prd")):
+            if stream:
+                print()
+                text, first_token["prd"] = stream_text(prd_agent, prd_inputs, on_token=lambda t: print(t, end="", flush=True))
+                prd = clean_output(text)
+                streamed = True
+                print(f"\n\n⏱️ PRD first token after {first_token['prd'] or 0:.1f}s")
+            else:
+                prd = clean_output(prd_agent.invoke(prd_inputs))
+        store.save("prd", input_hash("prd", prd_inputs), prd_inputs, prd)
+
+    if prd_record is None or not prd_record.get("approved"):
+        approved, prd, _ = review_stage(
+            "prd", "Product Requirements Document", prd, "markdown", show=not streamed
+        )
+        if not approved:
+            return rejected("PRD")
+
+    say(f"\n⚙️ Generating remaining stages (up to {max_workers} in parallel)...")
+    with run_scope(store.run_id):
+        results, timings = run_graph(
+            nodes,
+            max_workers=max_workers,
+            on_done=lambda name, _: say(f"  ✔ {name} ready"),
+        )
+    say("\n⏱️ Stage timings:")
+    say(format_timings(nodes, timings, first_token))
+
+    for name, title, filename in REVIEWED_STAGES:
+        if (store.get(name) or {}).get("approved"):
+            say(f"\n✅ {title} already approved in run {store.run_id}")
+        else:
+            errors = _failed_checks(store, name)
+            if errors:
+                say(f"\n⚠️ {title} still fails local checks after {MAX_FIX_ROUNDS} fix rounds:\n" + "\n".join(errors))
+            approved, results[name], revised = review_stage(
+                name, _review_title(store, name, title), results[name], language_for(filename)
+            )
+            if not approved:
+                return rejected(title)
+            if revised and descendants(nodes, name):
+                # Unchanged stages come back from their checkpoints; only
+                # stages whose inputs include the revised output are redone.
+                say(f"\n🔁 Regenerating {', '.join(descendants(nodes, name))} from the revised {title}...")
+                with run_scope(store.run_id):
+                    results, _ = run_graph(nodes, max_workers=max_workers)
+        _write_stage_file(artifacts, name, filename, results[name])
+
+    say("\n--- Social Media Copy ---\n")
+    say(_marketing_results(results)["social_copy"])
+
+    return _pipeline_output(prd, results, artifacts)
@@ -0,0 +1,107 @@
+# File: workflows/inbox.py
+
+import os
+import time
+
+from utils import tracing
+from utils.hitl import feedback_of
+from workflows.checkpoints import CHECKPOINT_ROOT, CheckpointStore
+
+POLL_SECONDS = 0.5
+
+
+class ReviewInbox:
+    """
+    Review queue for one run, kept in the run's checkpoints so reviewers in
+    other processes (`python main.py --inbox`, the Streamlit app) see and
+    answer the same items. A stage is pending once the pipeline has posted
+    it and until it is approved, rejected or sent back with feedback.
+    """
+
+    def __init__(self, store: CheckpointStore):
+        self.store = store
+
+    def post(self, stage: str, title: str):
+        self.store.update(stage, title=title, feedback=None, posted=time.time())
+
+    def pending(self):
+        """
+        Returns pending items as dicts (run, stage, title, output, version),
+        oldest first.
+        """
+        items = []
+        for stage in self.store.stages():
+            record = self.store.get(stage)
+            if record and record.get("title") and record.get("approved") is None and not record.get("feedback"):
+                items.append({
+                    "run": self.store.run_id,
+                    "stage": stage,
+                    "title": record["title"],
+                    "output": record["output"],
+                    "version": record["updated"],
+                    "posted": record.get("posted", record["updated"]),
+                })
+        return sorted(items, key=lambda item: item["posted"])
+
+    def decide(self, stage: str, decision, version: float = None) -> bool:
+        """
+        Records True/False or revision feedback for a stage. Returns False
+        (and changes nothing) if the stage was replaced after `version`.
+        """
+        with self.store.lock:
+            record = self.store.get(stage)
+            if record is None or (version is not None and record["updated"] != version):
+                return False
+            feedback = feedback_of(decision)
+            if feedback is not None:
+                self.store.update(stage, feedback=feedback)
+            else:
+                self.store.set_approval(stage, decision is True)
+        return True
+
+    def decision(self, stage: str):
+        """
+        Returns the reviewer's answer for a posted stage: True, False,
+        a feedback string, or None while it is still pending.
+        """
+        record = self.store.get(stage) or {}
+        return record.get("feedback") or record.get("approved")
+
+
+def pending_reviews(root: str = CHECKPOINT_ROOT, run_id: str = None):
+    """
+    Returns the pending items of one run, or of every checkpointed run.
+    """
+    if not os.path.isdir(root):
+        return []
+    runs = [run_id] if run_id else sorted(os.listdir(root))
+    items = []
+    for run in runs:
+        if os.path.isdir(os.path.join(root, run)):
+            items.extend(ReviewInbox(CheckpointStore(run, root)).pending())
+    return items
+
+
+def review_inbox(approve, run_id: str = None, until=None, root: str = CHECKPOINT_ROOT):
+    """
+    Presents pending items to `approve` one at a time and records the answers.
+    With `until`, keeps polling for new items until it returns True;
+    otherwise stops once the inbox is empty. Returns the number reviewed.
+    """
+    reviewed = 0
+    while True:
+        if until is not None and until():
+            return reviewed
+        items = pending_reviews(root, run_id)
+        if not items:
+            if until is None:
+                return reviewed
+            time.sleep(POLL_SECONDS)
+            continue
+        item = items[0]
+        with tracing.span(item["title"], "approval", stage=item["stage"], run=item["run"]):
+            decision = approve(f"{item['title']} (run {item['run']})", item["output"])
+        inbox = ReviewInbox(CheckpointStore(item["run"], root))
+        if not inbox.decide(item["stage"], decision, item["version"]):
+            print(f"\n♻️ {item['title']} changed while you were reviewing it; it will come back to the inbox.")
+        reviewed += 1
@@ -0,0 +1,132 @@
+# File: workflows/scheduler.py
+
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.tracing import longest_path
+
+
+class Node:
+    """A single agent stage in the pipeline graph."""
+
+    def __init__(self, name: str, fn, deps=()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+    def __repr__(self):
+        return f"Node({self.name!r}, deps={list(self.deps)})"
+
+
+def _check_graph(nodes):
+    names = [node.name for node in nodes]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate node names in graph: {names}")
+    for node in nodes:
+        missing = [dep for dep in node.deps if dep not in names]
+        if missing:
+            raise ValueError(f"Node '{node.name}' depends on unknown nodes: {missing}")
+
+
+def run_graph(nodes, max_workers: int = 4, on_done=None):
+    """
+    Runs every node once all of its dependencies have finished, executing
+    independent nodes concurrently on at most `max_workers` threads.
+
+    Each node's fn receives a dict of the results produced so far.
+    Returns (results, timings) where timings maps name -> (start, end).
+    """
+    _check_graph(nodes)
+    pending = {node.name: node for node in nodes}
+    results, timings = {}, {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        while pending or running:
+            ready = [
+                node for node in pending.values()
+                if all(dep in results for dep in node.deps)
+            ]
+            for node in ready:
+                del pending[node.name]
+                snapshot = dict(results)
+                # Copy the caller's context so run/stage tags reach the worker thread.
+                context = contextvars.copy_context()
+                running[pool.submit(context.run, _timed, node, snapshot)] = node
+
+            if not running:
+                raise ValueError(f"Dependency cycle between nodes: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                try:
+                    output, start, end = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                results[node.name] = output
+                timings[node.name] = (start, end)
+                if on_done:
+                    on_done(node.name, output)
+
+    return results, timings
+
+
+def _timed(node, results):
+    start = time.perf_counter()
+    output = node.fn(results)
+    return output, start, time.perf_counter()
+
+
+def critical_path(nodes, timings):
+    """
+    Returns (path, seconds) for the longest chain of dependent nodes,
+    measured with the durations recorded by run_graph.
+    """
+    by_name = {node.name: node for node in nodes}
+    return longest_path(
+        timings,
+        lambda name: timings[name][1] - timings[name][0],
+        lambda name: [dep for dep in by_name[name].deps if dep in timings],
+    )
+
+
+def format_timings(nodes, timings, first_token=None) -> str:
+    """
+    Renders per-node durations and the critical path as a short text report.
+    first_token optionally maps node names to their time to first token.
+    """
+    if not timings:
+        return "No stages ran."
+    origin = min(start for start, _ in timings.values())
+    wall = max(end for _, end in timings.values()) - origin
+    serial = sum(end - start for start, end in timings.values())
+    path, path_seconds = critical_path(nodes, timings)
+
+    lines = []
+    for name, (start, end) in sorted(timings.items(), key=lambda item: item[1][0]):
+        line = f"  {name:<20} {start - origin:6.1f}s → {end - origin:6.1f}s  ({end - start:.1f}s)"
+        if first_token and first_token.get(name) is not None:
+            line += f"  first token {first_token[name]:.1f}s"
+        lines.append(line)
+    lines.append(f"  Wall clock: {wall:.1f}s (sequential would be {serial:.1f}s)")
+    lines.append(f"  Critical path: {' → '.join(path)} ({path_seconds:.1f}s)")
+    return "\n".join(lines)
+
+
+def descendants(nodes, name: str):
+    """
+    Returns the names of every node that depends, directly or transitively, on `name`.
+    """
+    found = []
+    frontier = [name]
+    while frontier:
+        current = frontier.pop()
+        for node in nodes:
+            if current in node.deps and node.name not in found:
+                found.append(node.name)
+                frontier.append(node.name)
+    return found
@@ -0,0 +1,265 @@
+# File: workflows/service.py
+
+import json
+import os
+import re
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from workflows.checkpoints import CHECKPOINT_ROOT, CheckpointStore, new_run_id
+
+DEFAULT_PORT = 8765
+STREAM_CHUNK_BYTES = 64 * 1024
+_JOB_PATH = re.compile(r"^/jobs/([\w-]+)(?:/(stages|artifacts)/([\w.-]+))?$")
+
+
+def _run_job(job_id: str, request: dict, build_root: str, stage_workers: int):
+    """
+    Runs one pipeline request. Top level so it can run in a worker process.
+    """
+    from workflows.batch import APPROVAL_MODES
+    from workflows.full_build import run_full_pipeline
+
+    output = run_full_pipeline(
+        request["idea"],
+        target_user=request.get("target_user") or "General users",
+        platform=request.get("platform") or "Web",
+        pain_point=request.get("pain_point") or "N/A",
+        approve=APPROVAL_MODES[request.get("approval", "auto")](),
+        build_dir=build_root,
+        max_workers=stage_workers,
+        stream=False,
+        verbose=False,
+        run_id=job_id,
+    )
+    if isinstance(output, dict):
+        return {"status": "done", "rejection": None}
+    return {"status": "rejected", "rejection": output}
+
+
+class PipelineService:
+    """
+    Queues pipeline requests and runs them on a pool of `workers` threads or
+    processes. Per-stage progress is read back from each job's checkpoints,
+    which works the same for both pool kinds. At most `max_queued` jobs may
+    wait for a worker; further submissions are refused. The oldest finished
+    jobs are forgotten beyond `max_finished` (their checkpoints stay on disk).
+
+    Thread workers share one rate limiter, response cache and metrics
+    registry. Process workers isolate crashes and the GIL, but each process
+    has its own limiter, so divide AGENTIFIED_RPM/TPM by the worker count.
+    """
+
+    def __init__(self, workers: int = 4, pool: str = "thread", build_root: str = "build/service",
+                 stage_workers: int = 2, max_queued: int = 32, max_finished: int = 256):
+        executor = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+        self.pool = pool
+        self.workers = workers
+        self.build_root = build_root
+        self.stage_workers = stage_workers
+        self.max_queued = max_queued
+        self.max_finished = max_finished
+        self._executor = executor(max_workers=max(1, workers))
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def counts(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        statuses = [self._status(job) for job in jobs]
+        return {status: statuses.count(status) for status in ("queued", "running", "done", "rejected", "failed")}
+
+    def submit(self, request: dict) -> dict:
+        from workflows.batch import APPROVAL_MODES
+
+        if not isinstance(request, dict):
+            raise TypeError("the request body must be a JSON object")
+        if not isinstance(request.get("idea"), str) or not request["idea"].strip():
+            raise ValueError("'idea' is required")
+        if request.get("approval", "auto") not in APPROVAL_MODES:
+            raise ValueError(f"'approval' must be one of {sorted(APPROVAL_MODES)}")
+        if self.counts()["queued"] >= self.max_queued:
+            raise OverflowError(f"{self.max_queued} jobs already queued")
+
+        job_id = new_run_id()
+        future = self._executor.submit(_run_job, job_id, request, self.build_root, self.stage_workers)
+        job = {"id": job_id, "request": request, "submitted": time.time(), "future": future}
+        with self._lock:
+            self._jobs[job_id] = job
+            finished = [other for other, entry in self._jobs.items() if entry["future"].done()]
+            for other in finished[:max(0, len(finished) - self.max_finished)]:
+                del self._jobs[other]
+        return self.describe(job_id)
+
+    def _status(self, job) -> str:
+        future = job["future"]
+        if future.done():
+            if future.exception() is not None:
+                return "failed"
+            return future.result()["status"]
+        # A job is running once its pipeline has written the run metadata.
+        started = os.path.exists(os.path.join(CHECKPOINT_ROOT, job["id"], "run.json"))
+        return "running" if future.running() or started else "queued"
+
+    def describe(self, job_id: str, stages: bool = False):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        future = job["future"]
+        status = self._status(job)
+        description = {
+            "id": job_id,
+            "status": status,
+            "idea": job["request"]["idea"],
+            "submitted": job["submitted"],
+        }
+        if status == "failed":
+            error = future.exception()
+            description["error"] = "".join(traceback.format_exception_only(type(error), error)).strip()
+        elif status == "rejected":
+            description["rejection"] = future.result()["rejection"]
+        if stages:
+            store = CheckpointStore(job_id)
+            description["stages"] = {
+                stage: {
+                    "approved": record.get("approved"),
+                    "checks_passed": (record.get("checks") or {}).get("ok"),
+                    "updated": record.get("updated"),
+                }
+                for stage, record in ((stage, store.get(stage)) for stage in store.stages())
+                if record is not None
+            }
+            run_dir = os.path.join(self.build_root, "runs", job_id)
+            description["artifacts"] = sorted(
+                name for name in os.listdir(run_dir) if not name.endswith(".tmp")
+            ) if os.path.isdir(run_dir) else []
+        return description
+
+    def list(self):
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.describe(job_id) for job_id in job_ids]
+
+    def stage_output(self, job_id: str, stage: str):
+        if job_id not in self._jobs:
+            return None
+        record = CheckpointStore(job_id).get(stage)
+        return None if record is None else record["output"]
+
+    def artifact_path(self, job_id: str, filename: str):
+        if job_id not in self._jobs or os.path.basename(filename) != filename:
+            return None
+        path = os.path.join(self.build_root, "runs", job_id, filename)
+        return path if os.path.isfile(path) else None
+
+    def prometheus(self) -> str:
+        from utils.logger import metrics
+
+        lines = [
+            "# HELP agentified_service_jobs Pipeline jobs by status",
+            "# TYPE agentified_service_jobs gauge",
+        ]
+        lines += [f'agentified_service_jobs{{status="{status}"}} {count}' for status, count in self.counts().items()]
+        lines += [
+            "# HELP agentified_service_workers Size of the worker pool",
+            "# TYPE agentified_service_workers gauge",
+            f'agentified_service_workers{{pool="{self.pool}"}} {self.workers}',
+        ]
+        return "\n".join(lines) + "\n" + (metrics.prometheus() if self.pool == "thread" else "")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _handler(service: PipelineService):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body, content_type: str = "application/json"):
+            if content_type == "application/json":
+                body = json.dumps(body, indent=2, default=str)
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream_file(self, path: str):
+            # Chunked, so large or still-growing artifacts are never held in memory.
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(STREAM_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def do_POST(self):
+            if self.path != "/jobs":
+                return self._send(404, {"error": "not found"})
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                job = service.submit(json.loads(self.rfile.read(length) or b"{}"))
+            except (ValueError, TypeError) as error:
+                return self._send(400, {"error": str(error)})
+            except OverflowError as error:
+                return self._send(503, {"error": str(error)})
+            self._send(202, job)
+
+        def do_GET(self):
+            if self.path == "/health":
+                return self._send(200, {"status": "ok", **service.counts()})
+            if self.path == "/metrics":
+                return self._send(200, service.prometheus(), "text/plain")
+            if self.path == "/jobs":
+                return self._send(200, service.list())
+            match = _JOB_PATH.match(self.path)
+            if not match:
+                return self._send(404, {"error": "not found"})
+            job_id, kind, name = match.groups()
+            if kind is None:
+                job = service.describe(job_id, stages=True)
+                return self._send(200, job) if job else self._send(404, {"error": "unknown job"})
+            if kind == "stages":
+                output = service.stage_output(job_id, name)
+                if output is None:
+                    return self._send(404, {"error": "stage not ready"})
+                # Text stages are sent as is; structured ones (the fused marketing stage) as JSON.
+                return self._send(200, output, "text/plain") if isinstance(output, str) else self._send(200, output)
+            path = service.artifact_path(job_id, name)
+            return self._stream_file(path) if path else self._send(404, {"error": "artifact not ready"})
+
+    return Handler
+
+
+def serve(port: int = DEFAULT_PORT, host: str = "127.0.0.1", **options):
+    """
+    Runs the job API until interrupted:
+
+        POST /jobs                          {"idea", "target_user", "platform", "pain_point", "approval"}
+        GET  /jobs, /jobs/<id>              status, per-stage progress and artifact names
+        GET  /jobs/<id>/stages/<stage>      a stage's output as soon as it is generated
+        GET  /jobs/<id>/artifacts/<file>    a build file (e.g. backend_code.py.part while generating)
+        GET  /health, /metrics
+    """
+    service = PipelineService(**options)
+    server = ThreadingHTTPServer((host, port), _handler(service))
+    print(f"🛰️ Agentified job service on http://{host}:{port} ({service.workers} {service.pool} workers)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        service.shutdown()